@@ -3,17 +3,25 @@ Flask API for Python RAG Service
 
 Exposes endpoints for:
 - Health check
-- Full Paper Generation
+- Full Paper Generation (blocking, streaming and queued jobs)
 
 This service is called by the Node.js Express server.
 """
 
 import os
-from flask import Flask, request, jsonify
+import json
+import queue
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS, cross_origin
 from dotenv import load_dotenv
 
 from core.rag_pipeline import get_rag_pipeline
+from core.jobs import get_job_manager
+from core.llm_client import get_response_cache
+from core.rate_limiter import get_rate_limit_stats
+from core.conference_catalog import get_conference_catalog
+from core.http_cache import get_http_cache
 
 # Load environment variables
 load_dotenv()
@@ -40,17 +48,32 @@ except Exception as e:
     print(f"❌ Failed to initialize RAG pipeline: {e}")
     exit(1)
 
+# Queued jobs are optional: /jobs answers 503 if the job store cannot be opened
+job_manager = None
+try:
+    job_manager = get_job_manager(rag_pipeline)
+    print("✓ Job manager initialized successfully")
+except Exception as e:
+    print(f"⚠️ Failed to initialize job manager, /jobs disabled: {e}")
+
 print("="*60 + "\n")
 
 
 @app.route('/health', methods=['GET', 'OPTIONS'])
 @cross_origin()
 def health_check():
+    cache = get_response_cache()
+    catalog = get_conference_catalog()
+    http_cache = get_http_cache()
     return jsonify({
         'status': 'healthy',
         'service': 'python-rag-service',
         'llm_provider': rag_pipeline.llm_client.provider,
-        'model': rag_pipeline.llm_client.model_name
+        'model': rag_pipeline.llm_client.model_name,
+        'llm_cache': cache.stats() if cache else None,
+        'rate_limits': get_rate_limit_stats(),
+        'conference_catalog': catalog.stats() if catalog else None,
+        'http_cache': http_cache.stats() if http_cache else None
     }), 200
 
 
@@ -90,6 +113,163 @@ def generate_paper():
 
 
 
+class GenerationCancelled(Exception):
+    """
+    Raised from the progress hooks once the streaming client has gone away
+    """
+
+
+def _paper_events(questionnaire, forward_tokens):
+    """
+    Runs generate_full_paper on a background thread and yields its
+    progress as event dicts (section, delta, done, error)
+    
+    Closing the generator (the client disconnected) makes the next progress
+    hook raise GenerationCancelled, so the pipeline stops instead of
+    generating the remaining sections for nobody.
+    """
+    events = queue.Queue()
+    cancelled = threading.Event()
+    
+    def on_section(section, content, elapsed_ms):
+        if cancelled.is_set():
+            raise GenerationCancelled(f"client disconnected after {section}")
+        events.put({'event': 'section', 'section': section, 'content': content, 'elapsed_ms': elapsed_ms})
+    
+    def on_delta(section, delta):
+        if cancelled.is_set():
+            raise GenerationCancelled(f"client disconnected during {section}")
+        events.put({'event': 'delta', 'section': section, 'delta': delta})
+    
+    def run():
+        try:
+            result = rag_pipeline.generate_full_paper(
+                questionnaire,
+                on_section=on_section,
+                on_delta=on_delta if forward_tokens else None
+            )
+            events.put({'event': 'done', 'metadata': result['metadata']})
+        except GenerationCancelled as e:
+            print(f"⏹️ /generate/stream stopped: {e}")
+        except Exception as e:
+            print(f"❌ Error in /generate/stream: {str(e)}")
+            events.put({'event': 'error', 'error': 'GenerationError', 'message': str(e)})
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=run, daemon=True).start()
+    
+    try:
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        cancelled.set()
+
+
+@app.route('/generate/stream', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def generate_paper_stream():
+    """
+    Streaming variant of /generate
+    
+    Emits 'Title and Author' immediately and then each section as it completes.
+    Query params:
+        format: 'ndjson' (default) or 'sse'
+        tokens: 'true' to also forward token-level deltas
+    """
+    questionnaire = request.get_json()
+    
+    if not questionnaire or 'domain' not in questionnaire:
+        return jsonify({
+            'error': 'InvalidRequest',
+            'message': 'Missing domain or questionnaire data'
+        }), 400
+    
+    stream_format = request.args.get('format', 'ndjson').lower()
+    forward_tokens = request.args.get('tokens', 'false').lower() == 'true'
+    
+    print(f"\n📥 Received STREAMING paper request for: {questionnaire.get('research_topic')}")
+    
+    def encode():
+        for event in _paper_events(questionnaire, forward_tokens):
+            if stream_format == 'sse':
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(encode()),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def _jobs_unavailable():
+    return jsonify({
+        'error': 'ServiceUnavailable',
+        'message': 'Job queue is not available'
+    }), 503
+
+
+@app.route('/jobs', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def create_job():
+    """
+    Queue a paper generation job and return its id immediately
+    """
+    if job_manager is None:
+        return _jobs_unavailable()
+    
+    try:
+        questionnaire = request.get_json()
+        
+        if not questionnaire or 'domain' not in questionnaire:
+            return jsonify({
+                'error': 'InvalidRequest',
+                'message': 'Missing domain or questionnaire data'
+            }), 400
+        
+        job_id = job_manager.submit(questionnaire)
+        
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f"/jobs/{job_id}"
+        }), 202
+        
+    except Exception as e:
+        print(f"❌ Error in /jobs: {str(e)}")
+        return jsonify({
+            'error': 'JobError',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET', 'OPTIONS'])
+@cross_origin()
+def get_job(job_id):
+    """
+    Job status with per-section progress (and the paper once completed)
+    """
+    if job_manager is None:
+        return _jobs_unavailable()
+    
+    job = job_manager.get(job_id)
+    
+    if not job:
+        return jsonify({
+            'error': 'NotFound',
+            'message': f"Unknown job: {job_id}"
+        }), 404
+    
+    return jsonify(job), 200
+
+
+
 
 from core.conference_scraper import ConferenceScraper
 
@@ -107,13 +287,14 @@ def get_conferences():
         data = request.get_json()
         domain = data.get('domain', 'General')
         
-        # Scrape
-        results = scraper.get_conferences(domain)
+        # Scrape (all sources in parallel, bounded by CONFERENCE_DEADLINE)
+        results, sources = scraper.get_conferences_with_timings(domain)
         
         return jsonify({
             "status": "success",
             "count": len(results),
-            "data": results
+            "data": results,
+            "sources": sources
         }), 200
     except Exception as e:
         print(f"❌ Error in /conferences: {e}")
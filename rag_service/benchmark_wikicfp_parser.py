@@ -0,0 +1,48 @@
+"""
+WikiCFP Parser Benchmark
+
+Times the lxml and BeautifulSoup extraction paths on a saved results
+page and checks that both return identical event dicts.
+
+Usage:
+    python benchmark_wikicfp_parser.py [--file debug_wikicfp.html] [--runs 50]
+"""
+
+import sys
+import timeit
+import argparse
+from pathlib import Path
+
+# Run this from rag_service/ directory
+from core.conference_scraper import parse_wikicfp_results, lxml_html
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WikiCFP results parsers')
+    parser.add_argument('--file', default='debug_wikicfp.html', help='Saved WikiCFP results page')
+    parser.add_argument('--runs', type=int, default=50, help='Parses per parser')
+    args = parser.parse_args()
+
+    if lxml_html is None:
+        print("❌ lxml is not installed (pip install lxml)")
+        sys.exit(1)
+
+    content = Path(args.file).read_bytes()
+    fast = parse_wikicfp_results(content, parser='lxml')
+    slow = parse_wikicfp_results(content, parser='bs4')
+    if fast != slow:
+        print(f"❌ Parsers disagree: lxml={len(fast)} events, bs4={len(slow)} events")
+        sys.exit(1)
+    print(f"✓ Both parsers return the same {len(fast)} events from {args.file} ({len(content) / 1024:.0f} KB)")
+
+    timings = {}
+    for name in ('bs4', 'lxml'):
+        seconds = min(timeit.repeat(lambda: parse_wikicfp_results(content, parser=name), number=args.runs, repeat=3))
+        timings[name] = seconds / args.runs * 1000
+        print(f"⏱️ {name:<5} {timings[name]:8.2f} ms/parse")
+
+    print(f"🚀 lxml speedup: {timings['bs4'] / timings['lxml']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
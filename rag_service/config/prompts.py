@@ -9,6 +9,15 @@ Enforces strict academic standards:
 - Specific section requirements (e.g., Image Placeholders)
 """
 
+import os
+
+from core.context_packer import PROMPT_TOKEN_BUDGET, count_tokens, pack_chunks
+
+# Prompt layout: prefix (shared block first, for provider prompt caching) | legacy
+PROMPT_LAYOUT = os.getenv('PROMPT_LAYOUT', 'prefix')
+# Tokens kept free for the section-specific tail in the prefix layout
+PROMPT_SECTION_RESERVE = int(os.getenv('PROMPT_SECTION_RESERVE', 256))
+
 # Base System Prompt
 SYSTEM_PROMPT = """You are an expert academic research paper writer specializing in IEEE-style technical writing.
 
@@ -146,66 +155,139 @@ TASK: Generate a robust placeholder Reference list.
     return prompts.get(section_name, "Write this section following IEEE standards.")
 
 
-def build_generation_prompt(questionnaire, retrieved_context, section):
+# Questionnaire block: (heading, [(label, field)]); empty fields are left out
+QUESTIONNAIRE_LAYOUT = [
+    ("RESEARCH DATE FROM USER", [
+        ("Domain", 'domain'), ("Topic", 'research_topic'),
+        ("Type", 'research_type'), ("Status", 'completion_status')]),
+    ("MOTIVATION", [("Importance", 'problem_importance'), ("Contribution", 'key_contribution')]),
+    ("PROBLEM", [("Gap", 'specific_problem'), ("Objectives", 'objectives')]),
+    ("METHODOLOGY", [
+        ("Approach", 'approach_overview'), ("Workflow", 'system_workflow'),
+        ("Algorithms", 'algorithms'), ("Data", 'dataset_details'), ("Tools", 'tools_used')]),
+    ("RESULTS", [
+        ("Key Results", 'key_results'), ("Metrics", 'quantitative_results'),
+        ("Interpretation", 'result_interpretation')]),
+    ("COMPARISON", [("Related Work", 'related_approaches'), ("Baselines", 'comparison_baselines')]),
+    ("LIMITATIONS", [("Limitations", 'current_limitations'), ("Future", 'future_work')]),
+    ("EXTRAS", [("Architecture", 'architecture_details'), ("Formal Def", 'formal_problem_def')])
+]
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if isinstance(value, (list, dict)):
+        return not value
+    return str(value).strip() in ('', 'N/A', 'n/a', 'None')
+
+
+def build_questionnaire_block(questionnaire):
+    """
+    Formats the questionnaire, skipping empty fields and empty groups
+    """
+    groups = []
+    for heading, fields in QUESTIONNAIRE_LAYOUT:
+        lines = [f"{label}: {questionnaire.get(field)}" for label, field in fields
+                 if not _is_empty(questionnaire.get(field))]
+        if lines:
+            groups.append(f"{heading}:\n" + "\n".join(lines))
+    return "\n\n".join(groups)
+
+
+def _build_legacy_questionnaire_block(questionnaire):
+    # Every field, as the original template printed it: missing fields
+    # render as None, except the extras, which default to N/A
+    defaults = {'architecture_details': 'N/A', 'formal_problem_def': 'N/A'}
+    return "\n\n".join(
+        f"{heading}:\n" + "\n".join(f"{label}: {questionnaire.get(field, defaults.get(field))}"
+                                   for label, field in fields)
+        for heading, fields in QUESTIONNAIRE_LAYOUT
+    )
+
+
+def _build_section_block(section, section_guidelines):
+    return f"""SECTION GUIDELINES:
+{section_guidelines}
+
+WRITING INSTRUCTIONS:
+- Write ONLY the content for the {section} section.
+- Do not repeat the section title as a header.
+- Maintain flow and academic tone.
+- If writing "System Architecture", remember the layout requirements.
+"""
+
+
+def _build_body_block(paper_body):
+    if not paper_body:
+        return ""
+    return f"""
+GENERATED PAPER BODY (Summarize and stay consistent with this):
+{paper_body}
+
+---
+"""
+
+
+def build_generation_prompt(questionnaire, retrieved_context, section, paper_body=None,
+                            token_budget=PROMPT_TOKEN_BUDGET, layout=None):
     """
     Constructs the prompt for a specific section
+    
+    If paper_body is given (summary sections written after the body),
+    it is included so the section stays consistent with the paper
+    (prefix layout only).
+    
+    retrieved_context is either ready-made text or a list of ranked chunks;
+    chunks are deduplicated and packed into whatever is left of
+    token_budget after the rest of the prompt.
+    
+    Layouts (PROMPT_LAYOUT):
+    - prefix: questionnaire, context and paper body first, section
+      instructions last, so every section prompt of a paper shares the
+      same prefix (provider prompt caching / KV-cache reuse)
+    - legacy: the original prompt byte for byte (section name first,
+      every questionnaire field, no paper body)
     """
-    section_guidelines = get_section_prompt(section)
+    layout = layout or PROMPT_LAYOUT
+    section_block = _build_section_block(section, get_section_prompt(section))
     
-    prompt = f"""You are writing the **{section}** section of a research paper.
+    if layout == 'prefix':
+        body_block = _build_body_block(paper_body)
+        head = f"""RESEARCH PAPER CONTEXT (shared by all sections of this paper)
 
 ---
-RESEARCH DATE FROM USER:
-Domain: {questionnaire.get('domain')}
-Topic: {questionnaire.get('research_topic')}
-Type: {questionnaire.get('research_type')}
-Status: {questionnaire.get('completion_status')}
-
-MOTIVATION:
-Importance: {questionnaire.get('problem_importance')}
-Contribution: {questionnaire.get('key_contribution')}
-
-PROBLEM:
-Gap: {questionnaire.get('specific_problem')}
-Objectives: {questionnaire.get('objectives')}
-
-METHODOLOGY:
-Approach: {questionnaire.get('approach_overview')}
-Workflow: {questionnaire.get('system_workflow')}
-Algorithms: {questionnaire.get('algorithms')}
-Data: {questionnaire.get('dataset_details')}
-Tools: {questionnaire.get('tools_used')}
-
-RESULTS:
-Key Results: {questionnaire.get('key_results')}
-Metrics: {questionnaire.get('quantitative_results')}
-Interpretation: {questionnaire.get('result_interpretation')}
-
-COMPARISON:
-Related Work: {questionnaire.get('related_approaches')}
-Baselines: {questionnaire.get('comparison_baselines')}
-
-LIMITATIONS:
-Limitations: {questionnaire.get('current_limitations')}
-Future: {questionnaire.get('future_work')}
-
-EXTRAS:
-Architecture: {questionnaire.get('architecture_details', 'N/A')}
-Formal Def: {questionnaire.get('formal_problem_def', 'N/A')}
+{build_questionnaire_block(questionnaire)}
 ---
 
 RETRIEVED CONTEXT (Use for background/style/theory):
-{retrieved_context}
+"""
+        tail = f"""
 
 ---
+{body_block}
+You are writing the **{section}** section of this research paper.
 
-SECTION GUIDELINES:
-{section_guidelines}
+{section_block}"""
+        # The context budget must not depend on the section, or the prefix would differ
+        reserved = count_tokens(head) + count_tokens(body_block) + PROMPT_SECTION_RESERVE
+    else:
+        head = f"""You are writing the **{section}** section of a research paper.
 
-WRITING INSTRUCTIONS:
-- Write ONLY the content for the {section} section.
-- Do not repeat the section title as a header.
-- Maintain flow and academic tone.
-- If writing "System Architecture", remember the layout requirements.
+---
+{_build_legacy_questionnaire_block(questionnaire)}
+---
+
+RETRIEVED CONTEXT (Use for background/style/theory):
 """
-    return prompt
+        tail = f"""
+
+---
+
+{section_block}"""
+        reserved = count_tokens(head) + count_tokens(tail)
+    
+    if not isinstance(retrieved_context, str):
+        retrieved_context, _ = pack_chunks(retrieved_context, max(0, token_budget - reserved))
+    
+    return head + retrieved_context + tail
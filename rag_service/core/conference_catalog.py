@@ -0,0 +1,395 @@
+"""
+Conference Catalog
+
+Local SQLite catalog of scraped and enriched conferences, so repeat
+/conferences requests are answered without re-scraping WikiCFP/OpenAlex
+or re-asking the LLM:
+
+- conferences: one row per conference, keyed by normalized name (with
+  the normalized acronym indexed), holding the scraped fields, the LLM
+  enrichment (impact factor, index) and when each was fetched
+- domains: the ordered conference list last returned for a search
+  domain, with its per-source timings and popularity
+- enrichments: LLM answers memoized per (acronym, name, mode), so a
+  conference is only ever sent to the LLM once per enrichment mode,
+  whichever domain it turns up in ('dates' answers expire after
+  CATALOG_DATES_TTL, since upcoming dates change every edition)
+
+Reads follow stale-while-revalidate: fresh results are served as-is,
+stale ones are served immediately while a background refresh runs, and
+expired or unknown domains are scraped synchronously. A background
+refresher keeps the most requested domains fresh. Refreshes are claimed
+with a lease in the database, so gunicorn workers sharing the file do
+not scrape the same domain at once.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+CATALOG_ENABLED = os.getenv('CATALOG_ENABLED', 'true').lower() == 'true'
+CATALOG_DB_PATH = os.getenv('CATALOG_DB_PATH', './data/conference_catalog.sqlite3')
+CATALOG_FRESH_TTL = int(os.getenv('CATALOG_FRESH_TTL', 24 * 3600))         # Served without refreshing
+CATALOG_STALE_TTL = int(os.getenv('CATALOG_STALE_TTL', 14 * 24 * 3600))    # Served while refreshing
+CATALOG_REFRESHER_ENABLED = os.getenv('CATALOG_REFRESHER_ENABLED', 'true').lower() == 'true'
+CATALOG_REFRESH_INTERVAL = int(os.getenv('CATALOG_REFRESH_INTERVAL', 3600))  # Seconds between refresher runs
+CATALOG_POPULAR_DOMAINS = int(os.getenv('CATALOG_POPULAR_DOMAINS', 10))      # Kept fresh by the refresher
+CATALOG_RETRY_INTERVAL = int(os.getenv('CATALOG_RETRY_INTERVAL', 600))      # Incomplete/failed results: seconds before the next try
+CATALOG_DATES_TTL = int(os.getenv('CATALOG_DATES_TTL', 30 * 24 * 3600))      # 'dates' enrichments: seconds before re-asking the LLM
+CATALOG_REFRESH_LEASE = 300                                                  # Seconds a refresh claim is held
+
+ENRICHMENT_FIELDS = ('impact_factor', 'index')
+SCRAPED_SOURCES = ('wikicfp', 'openalex', 'llm_fallback')
+
+
+def has_scraped_results(sources):
+    """
+    Whether any real source (not the hardcoded fallback list) returned conferences
+    """
+    return any(status.get('status') in ('ok', 'partial') for name, status in sources.items()
+               if name.startswith(SCRAPED_SOURCES))
+
+
+def normalize_domain(domain):
+    return re.sub(r"\s+", " ", (domain or '').strip().lower())
+
+
+def normalize_name(name):
+    """
+    Conference name without years, punctuation or case ("The 2026 Intl. Conf. on X" -> "the intl conf on x")
+    """
+    name = re.sub(r"\b(19|20)\d{2}\b", " ", (name or '').lower())
+    return re.sub(r"[^a-z0-9]+", " ", name).strip()
+
+
+def normalize_acronym(acronym):
+    """
+    Acronym without the edition year ("ICML 2026", "icml-26" -> "ICML")
+    """
+    acronym = re.sub(r"[\s'’-]*((19|20)\d{2}|'?\d{2})$", "", (acronym or '').strip())
+    return re.sub(r"[^A-Z0-9]+", "", acronym.upper())
+
+
+def enrichment_key(event):
+    """
+    Memoization key for an event's LLM enrichment: (acronym, name), both normalized
+    """
+    return normalize_acronym(event.get('acronym')), normalize_name(event.get('name'))
+
+
+class ConferenceCatalog:
+    """
+    SQLite-backed catalog with stale-while-revalidate reads
+    """
+
+    def __init__(self, db_path=CATALOG_DB_PATH, fresh_ttl=CATALOG_FRESH_TTL, stale_ttl=CATALOG_STALE_TTL):
+        self.db_path = db_path
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='catalog-refresh')
+        self._refresher = None
+        self._pending_refreshes = set()     # Domain keys queued or refreshing in this process
+        self._lock = threading.Lock()
+        self._counters = {'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_failures': 0,
+                          'enrichment_hits': 0, 'enrichment_misses': 0}
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conferences (
+                    name_key TEXT PRIMARY KEY,
+                    acronym_key TEXT NOT NULL,
+                    scraped TEXT NOT NULL,
+                    enrichment TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    enriched_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_conferences_acronym ON conferences (acronym_key)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS domains (
+                    domain_key TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    conference_keys TEXT NOT NULL,
+                    sources TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    last_requested_at REAL,
+                    refreshing_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS enrichments (
+                    mode TEXT NOT NULL,
+                    acronym_key TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    enriched_at REAL NOT NULL,
+                    PRIMARY KEY (mode, acronym_key, name_key)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def get_domain(self, domain):
+        """
+        Cached conferences for a domain (also counts the request for popularity)
+
+        Returns:
+            tuple: (events, state, age_seconds) with state 'fresh' or 'stale',
+                   or None if the domain is unknown or expired
+        """
+        now = time.time()
+        domain_key = normalize_domain(domain)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE domains SET hits = hits + 1, last_requested_at = ? WHERE domain_key = ?",
+                (now, domain_key)
+            )
+            row = conn.execute(
+                "SELECT conference_keys, fetched_at FROM domains WHERE domain_key = ?", (domain_key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.stale_ttl:
+                self._count('misses')
+                return None
+
+            keys = json.loads(row[0])
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT name_key, scraped, enrichment FROM conferences WHERE name_key IN ({placeholders})", keys
+            ).fetchall() if keys else []
+
+        by_key = {name_key: dict(json.loads(scraped), **json.loads(enrichment)) for name_key, scraped, enrichment in rows}
+        events = [by_key[key] for key in keys if key in by_key]
+        age = now - row[1]
+        state = 'fresh' if age < self.fresh_ttl else 'stale'
+        self._count('fresh_hits' if state == 'fresh' else 'stale_hits')
+        return events, state, age
+
+    def put_domain(self, domain, events, sources):
+        """
+        Stores a domain's scrape result and upserts its conferences
+
+        A result in which some source failed or missed the deadline turns
+        stale after CATALOG_RETRY_INTERVAL instead of the full fresh TTL, so
+        it is retried soon, but a source that keeps timing out does not
+        cause back-to-back re-scrapes.
+        """
+        now = time.time()
+        complete = all(s.get('status') in ('ok', 'empty') for s in sources.values())
+        fetched_at = now if complete else now - max(0, self.fresh_ttl - CATALOG_RETRY_INTERVAL)
+
+        keys = []
+        with self._connect() as conn:
+            for event in events:
+                name_key = normalize_name(event.get('name'))
+                if not name_key or name_key in keys:
+                    continue
+                keys.append(name_key)
+                scraped = {k: v for k, v in event.items() if k not in ENRICHMENT_FIELDS}
+                enrichment = {k: event[k] for k in ENRICHMENT_FIELDS if event.get(k) is not None}
+                conn.execute("""
+                    INSERT INTO conferences (name_key, acronym_key, scraped, enrichment, fetched_at, enriched_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name_key) DO UPDATE SET
+                        acronym_key = excluded.acronym_key,
+                        scraped = excluded.scraped,
+                        enrichment = CASE WHEN excluded.enriched_at IS NULL THEN enrichment ELSE excluded.enrichment END,
+                        fetched_at = excluded.fetched_at,
+                        enriched_at = COALESCE(excluded.enriched_at, enriched_at)
+                """, (name_key, normalize_acronym(event.get('acronym')), json.dumps(scraped), json.dumps(enrichment),
+                      now, now if enrichment else None))
+            conn.execute("""
+                INSERT INTO domains (domain_key, domain, conference_keys, sources, fetched_at, refreshing_until)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT(domain_key) DO UPDATE SET
+                    conference_keys = excluded.conference_keys,
+                    sources = excluded.sources,
+                    fetched_at = excluded.fetched_at,
+                    refreshing_until = 0
+            """, (normalize_domain(domain), domain, json.dumps(keys), json.dumps(sources), fetched_at))
+
+    def get_enrichments(self, mode, events):
+        """
+        Memoized LLM enrichment for events
+
+        'metadata' answers are kept indefinitely; 'dates' answers are only
+        returned while younger than CATALOG_DATES_TTL.
+
+        Returns:
+            dict: enrichment_key(event) -> enrichment data, for the events
+                  already enriched in this mode
+        """
+        keys = {enrichment_key(e) for e in events}
+        name_keys = sorted({name_key for _, name_key in keys})
+        if not name_keys:
+            return {}
+        placeholders = ",".join("?" * len(name_keys))
+        min_enriched_at = time.time() - CATALOG_DATES_TTL if mode == 'dates' else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT acronym_key, name_key, data FROM enrichments "
+                f"WHERE mode = ? AND enriched_at >= ? AND name_key IN ({placeholders})",
+                [mode, min_enriched_at] + name_keys
+            ).fetchall()
+        found = {(acronym_key, name_key): json.loads(data) for acronym_key, name_key, data in rows
+                 if (acronym_key, name_key) in keys}
+        self._count('enrichment_hits', len(found))
+        self._count('enrichment_misses', len(keys) - len(found))
+        return found
+
+    def put_enrichments(self, mode, items):
+        """
+        Memoizes LLM enrichment
+
+        Args:
+            mode (str): Enrichment mode ('metadata' or 'dates')
+            items (list): (event, data) pairs
+        """
+        now = time.time()
+        rows = [(mode, *enrichment_key(event), json.dumps(data), now) for event, data in items]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO enrichments (mode, acronym_key, name_key, data, enriched_at) "
+                "VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def _claim_refresh(self, domain_key):
+        """
+        Takes the refresh lease for a domain (False if another worker holds it)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            claimed = conn.execute(
+                "UPDATE domains SET refreshing_until = ? WHERE domain_key = ? AND refreshing_until < ?",
+                (now + CATALOG_REFRESH_LEASE, domain_key, now)
+            ).rowcount
+        return claimed == 1
+
+    def refresh(self, domain, fetch):
+        """
+        Re-scrapes a domain now (if no one else is) and stores the result
+
+        Args:
+            fetch (callable): fetch(domain) -> (events, sources)
+        """
+        if not self._claim_refresh(normalize_domain(domain)):
+            return False
+        print(f"🔄 Refreshing conference catalog for: {domain}")
+        try:
+            events, sources = fetch(domain)
+        except Exception as e:
+            print(f"⚠️ Catalog refresh failed for {domain}: {e}")
+            self._count('refresh_failures')
+            # Back off before the next attempt
+            with self._connect() as conn:
+                conn.execute("UPDATE domains SET refreshing_until = ? WHERE domain_key = ?",
+                             (time.time() + CATALOG_RETRY_INTERVAL, normalize_domain(domain)))
+            return False
+        # A failed scrape keeps the lease, so the domain is not retried until it expires
+        if has_scraped_results(sources):
+            self.put_domain(domain, events, sources)
+        self._count('refreshes')
+        return True
+
+    def refresh_async(self, domain, fetch):
+        """
+        Schedules a background refresh (used when serving a stale result),
+        unless one is already queued or running for the domain
+        """
+        domain_key = normalize_domain(domain)
+        with self._lock:
+            if domain_key in self._pending_refreshes:
+                return
+            self._pending_refreshes.add(domain_key)
+
+        def run():
+            try:
+                self.refresh(domain, fetch)
+            finally:
+                with self._lock:
+                    self._pending_refreshes.discard(domain_key)
+
+        self._refresh_executor.submit(run)
+
+    def popular_domains(self, limit=CATALOG_POPULAR_DOMAINS):
+        """
+        Most requested domains still within the stale window
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT domain, fetched_at FROM domains WHERE fetched_at > ? ORDER BY hits DESC LIMIT ?",
+                (time.time() - self.stale_ttl, limit)
+            ).fetchall()
+        return rows
+
+    def start_refresher(self, fetch, interval=CATALOG_REFRESH_INTERVAL):
+        """
+        Starts the background thread that keeps popular domains fresh
+
+        Domains are refreshed ahead of time, once they have used 80% of
+        their fresh TTL, so popular searches rarely see a stale result.
+        """
+        with self._lock:
+            if self._refresher is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        for domain, fetched_at in self.popular_domains():
+                            if time.time() - fetched_at >= self.fresh_ttl * 0.8:
+                                self.refresh(domain, fetch)
+                    except Exception as e:
+                        print(f"⚠️ Catalog refresher error: {e}")
+
+            self._refresher = threading.Thread(target=run, name='catalog-refresher', daemon=True)
+            self._refresher.start()
+            print(f"🗂️ Conference catalog refresher started (every {interval}s, top {CATALOG_POPULAR_DOMAINS} domains)")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            with self._connect() as conn:
+                stats['conferences'] = conn.execute("SELECT COUNT(*) FROM conferences").fetchone()[0]
+                stats['domains'] = conn.execute("SELECT COUNT(*) FROM domains").fetchone()[0]
+                stats['enrichments'] = conn.execute("SELECT COUNT(*) FROM enrichments").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+# Singleton instance
+_catalog_instance = None
+_catalog_lock = threading.Lock()
+
+def get_conference_catalog():
+    """
+    Returns the shared catalog, or None if the catalog is disabled
+    """
+    global _catalog_instance
+    if not CATALOG_ENABLED:
+        return None
+    with _catalog_lock:
+        if _catalog_instance is None:
+            _catalog_instance = ConferenceCatalog()
+    return _catalog_instance
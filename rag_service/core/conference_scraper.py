@@ -1,5 +1,8 @@
-import requests
 from bs4 import BeautifulSoup
+try:
+    from lxml import html as lxml_html
+except ImportError:  # Optional: the BeautifulSoup parser is used instead
+    lxml_html = None
 import urllib.parse
 from datetime import datetime
 import re
@@ -7,87 +10,347 @@ import random
 import time
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import http_transport
+from .http_cache import cached_get
+from .llm_client import ResponseCache, get_response_cache
+from .conference_catalog import (
+    CATALOG_REFRESHER_ENABLED, enrichment_key, get_conference_catalog, has_scraped_results
+)
+
+ENRICHMENT_MODEL = "meta-llama/llama-3-8b-instruct"
+FASTROUTER_CHAT_URL = os.getenv("FASTROUTER_CHAT_URL", "https://fastrouter.302.ai/v1/chat/completions")
+CONFERENCE_DEADLINE = float(os.getenv("CONFERENCE_DEADLINE", 20))           # Seconds per get_conferences call
+CONFERENCE_FETCH_WORKERS = int(os.getenv("CONFERENCE_FETCH_WORKERS", 16))   # Shared by all requests (4 tasks each)
+ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", 10))         # Conferences per LLM prompt
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", 4))                 # Batches in flight, shared by all requests
+ENRICHMENT_RETRIES = int(os.getenv("ENRICHMENT_RETRIES", 1))                 # Extra attempts for a failed batch
+WIKICFP_PAGES = 3
+WIKICFP_PARSER = os.getenv("WIKICFP_PARSER", "lxml")    # lxml | bs4
+
+# Tables whose own rows start a result (acronym cell spanning the name and dates rows)
+WIKICFP_RESULT_TABLES = "//table[(tr|tbody/tr)/td[@rowspan='2']]"
+
+_executor = None
+_enrichment_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Shared source-fetch pool (outlives single requests, so late sources do not block the caller)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CONFERENCE_FETCH_WORKERS, thread_name_prefix='conference-fetch')
+    return _executor
+
+
+def _get_enrichment_executor():
+    """
+    Shared enrichment-batch pool (separate from the fetch pool, whose workers wait on it)
+    """
+    global _enrichment_executor
+    with _executor_lock:
+        if _enrichment_executor is None:
+            _enrichment_executor = ThreadPoolExecutor(max_workers=ENRICHMENT_WORKERS, thread_name_prefix='conference-enrich')
+    return _enrichment_executor
+
+
+def _parse_enrichment(content, mode, ids):
+    """
+    Strictly parses an enrichment reply: one JSON object keyed by item number
+
+    Args:
+        content (str): LLM reply (a surrounding code fence is tolerated, nothing else)
+        mode (str): 'dates' or 'metadata'
+        ids (list): Item numbers that were asked for
+
+    Returns:
+        dict: item number -> event fields, for the well-formed entries only
+
+    Raises:
+        ValueError: If the reply is empty or not a JSON object
+    """
+    content = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", content or "")
+    if not content:
+        raise ValueError("empty reply")
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("reply is not a JSON object")
+
+    parsed = {}
+    for item_id in ids:
+        entry = data.get(item_id)
+        if not isinstance(entry, dict):
+            continue
+        if mode == "dates":
+            fields = {k: entry.get(k) for k in ("dates", "location", "deadline")}
+            if all(isinstance(v, str) and v.strip() for v in fields.values()):
+                parsed[item_id] = {k: v.strip() for k, v in fields.items()}
+        else:
+            impact, index = entry.get("impact"), entry.get("index")
+            if isinstance(impact, (int, float)) and not isinstance(impact, bool) and isinstance(index, str) and index.strip():
+                parsed[item_id] = {"impact_factor": float(impact), "index": index.strip()}
+    return parsed
+
+
+def _future_years_pattern():
+    """
+    Matches any of the next five years (current included) in a dates string
+    """
+    current_year = datetime.now().year
+    return re.compile("|".join(str(y) for y in range(current_year, current_year + 5)))
+
+
+def _wikicfp_event(acronym, url_suffix, full_name, dates, location, deadline):
+    return {
+        "id": url_suffix.split('eventid=')[-1].split('&')[0] if 'eventid=' in url_suffix else str(random.randint(10000,99999)),
+        "acronym": acronym,
+        "name": full_name,
+        "dates": dates,
+        "location": location,
+        "deadline": deadline,
+        "website": f"http://www.wikicfp.com{url_suffix}"
+    }
+
+
+def parse_wikicfp_results(content, parser=None):
+    """
+    Extracts upcoming events from a WikiCFP search results page.
+
+    Each result is two rows: [acronym (rowspan=2) | name] then
+    [dates | location | deadline]; events without a date in the next
+    five years are dropped.
+
+    Args:
+        content (bytes): Page HTML
+        parser (str): 'lxml' (XPath over the results table only) or 'bs4'
+            (full-document walk); defaults to WIKICFP_PARSER, falling back
+            to bs4 when lxml is not installed
+
+    Returns:
+        list: Event dicts (id, acronym, name, dates, location, deadline, website)
+    """
+    parser = parser or WIKICFP_PARSER
+    if parser == 'lxml' and lxml_html is not None:
+        return _parse_wikicfp_lxml(content)
+    return _parse_wikicfp_bs4(content)
+
+
+def _parse_wikicfp_lxml(content):
+    doc = lxml_html.fromstring(content)
+    future_years = _future_years_pattern()
+    rows = [row for table in doc.xpath(WIKICFP_RESULT_TABLES) for row in table.xpath("tr|tbody/tr")]
+
+    events = []
+    skip_next = False
+    for i, row in enumerate(rows):
+        if skip_next:
+            skip_next = False
+            continue
+
+        first_col = next(row.iter('td'), None)
+        if first_col is None or first_col.get('rowspan') != "2":
+            continue
+        link_tag = next(first_col.iter('a'), None)
+        if link_tag is None or link_tag.get('href') is None:
+            continue
+
+        cols = row.xpath('.//td')
+        if len(cols) < 2: continue
+        if i + 1 >= len(rows): break
+        next_cols = rows[i + 1].xpath('.//td')
+        if len(next_cols) < 3: continue
+
+        dates = next_cols[0].text_content().strip()
+        if not future_years.search(dates):
+            continue
+
+        events.append(_wikicfp_event(
+            link_tag.text_content().strip(), link_tag.get('href'), cols[1].text_content().strip(),
+            dates, next_cols[1].text_content().strip(), next_cols[2].text_content().strip()
+        ))
+        skip_next = True
+    return events
+
+
+def _parse_wikicfp_bs4(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    future_years = _future_years_pattern()
+    events = []
+    all_rows = soup.find_all('tr')
+    
+    skip_next = False
+    for i, row in enumerate(all_rows):
+        if skip_next:
+            skip_next = False
+            continue
+        
+        cols = row.find_all('td')
+        if not cols: continue
+        
+        first_col = cols[0]
+        if first_col.has_attr("rowspan") and first_col["rowspan"] == "2":
+            link_tag = first_col.find('a')
+            if not link_tag: continue
+            
+            acronym = link_tag.get_text().strip()
+            url_suffix = link_tag['href']
+            
+            if len(cols) < 2: continue
+            full_name = cols[1].get_text().strip()
+            
+            if i + 1 >= len(all_rows): break
+            next_row = all_rows[i+1]
+            next_cols = next_row.find_all('td')
+            
+            if len(next_cols) < 3: continue
+            dates = next_cols[0].get_text().strip()
+            location = next_cols[1].get_text().strip()
+            deadline = next_cols[2].get_text().strip()
+
+            # Filter for future dates if we scraped "All" years
+            if not future_years.search(dates):
+                continue
+            
+            events.append(_wikicfp_event(acronym, url_suffix, full_name, dates, location, deadline))
+            skip_next = True
+    
+    return events
+
 
 class ConferenceScraper:
     """
     Robust Web Scraper for Academic Conferences with LLM Enrichment.
-    Source: WikiCFP
+    Sources: WikiCFP, OpenAlex (fetched concurrently)
     Enrichment: FastRouter (Llama-3)
     """
 
     BASE_URL = "http://www.wikicfp.com/cfp/servlet/tool.search"
 
-    def get_conferences(self, domain, year=None):
+    def get_conferences(self, domain, year=None, deadline=None):
         """
         Scrape conferences for a specific domain (Multi-page).
         """
+        events, _ = self.get_conferences_with_timings(domain, year, deadline)
+        return events
+
+    def get_conferences_with_timings(self, domain, year=None, deadline=None):
+        """
+        Serves a domain from the conference catalog, scraping on a miss.
+
+        Fresh catalog entries are returned as-is; stale ones are returned
+        immediately and refreshed in the background.
+
+        Returns:
+            tuple: (events, sources), see scrape_conferences; catalog hits
+                   report a single 'catalog' source with its state and age
+        """
+        catalog = get_conference_catalog()
+        if not catalog:
+            events, sources = self.scrape_conferences(domain, year, deadline)
+            return self._with_default_enrichment(events), sources
+        if CATALOG_REFRESHER_ENABLED:
+            catalog.start_refresher(self.scrape_conferences)
+
+        start_time = time.time()
+        cached = catalog.get_domain(domain)
+        if cached:
+            events, state, age = cached
+            print(f"🗂️ Catalog {state} hit for: {domain} ({len(events)} conferences, {age/3600:.1f}h old)")
+            if state == 'stale':
+                catalog.refresh_async(domain, self.scrape_conferences)
+            sources = {'catalog': {'status': state, 'count': len(events), 'age_seconds': age,
+                                   'elapsed_ms': (time.time() - start_time) * 1000}}
+            return self._with_default_enrichment(events), sources
+
+        events, sources = self.scrape_conferences(domain, year, deadline)
+        if has_scraped_results(sources):
+            catalog.put_domain(domain, events, sources)
+        return self._with_default_enrichment(events), sources
+
+    @staticmethod
+    def _with_default_enrichment(events):
+        """
+        Fills impact/index for events whose enrichment did not make the
+        deadline (after caching, so the catalog never stores the guesses)
+        """
+        for e in events:
+            if e.get('impact_factor') is None:
+                e['impact_factor'] = 2.0
+                e.setdefault('index', 'Scopus')
+        return events
+
+    def scrape_conferences(self, domain, year=None, deadline=None):
+        """
+        Fetches all sources concurrently and merges them.
+
+        WikiCFP pages and OpenAlex are requested in parallel (paced per host
+        by http_transport.polite_get); each source's LLM enrichment starts as
+        soon as that source returns. Sources still running at the deadline
+        are left out of the result (or returned unenriched if only their
+        enrichment is late). Late work is wound down at the deadline (see
+        _run_sources) so it does not hold the shared pool for later requests.
+
+        Args:
+            domain (str): Search keywords
+            deadline (float): Seconds for the whole call (defaults to CONFERENCE_DEADLINE)
+
+        Returns:
+            tuple: (events, sources) where sources maps each source to its
+                   status ('ok', 'empty', 'error', 'partial', 'timeout'), event count
+                   and elapsed_ms
+        """
         if not year:
             year = datetime.now().year
+        deadline = deadline or CONFERENCE_DEADLINE
+        start_time = time.time()
+
+        print(f"🔎 Scraping conferences for: {domain} (WikiCFP x{WIKICFP_PAGES} + OpenAlex in parallel)")
+
+        # 1. WikiCFP pages and OpenAlex, each followed by its own enrichment
+        tasks = {}
+        for page in range(1, WIKICFP_PAGES + 1):
+            tasks[f"wikicfp_p{page}"] = (
+                lambda page=page: self._scrape_page(domain, page),
+                lambda events, deadline_at: self._enrich_with_llm(events, domain, mode="metadata",
+                                                                  deadline_at=deadline_at)
+            )
+        tasks["openalex"] = (
+            lambda: self._scrape_openalex(domain),
+            lambda events, deadline_at: self._enrich_openalex(events, domain, deadline_at)
+        )
+        results, sources = self._run_sources(tasks, start_time + deadline)
 
-        query = domain
-        print(f"🔎 Scraping conferences for: {query}")
-        
         all_events = []
-        
-        # 1. WikiCFP Scrape
-        try:
-            for page in range(1, 4):
-                print(f"  - Fetching page {page}...")
-                events = self._scrape_page(query, page)
-                if not events: break
-                all_events.extend(events)
-                time.sleep(0.5)
-
-            if not all_events:
-                print("⚠️ No direct results. Checking Categories...")
-                # Note: `soup` is not available here unless we save it from _scrape_page.
-                # Simplified: Just skip category fallback if direct search fails, 
-                # relying on OpenAlex/LLM instead.
-                pass 
-        except Exception as e:
-            print(f"⚠️ WikiCFP Scrape Error: {e}")
-
-        # 2. OpenAlex Scrape
-        try:
-            print("🌍 Querying OpenAlex for Venues...")
-            openalex_events = self._scrape_openalex(domain)
-            if openalex_events:
-                print(f"✓ OpenAlex found {len(openalex_events)} venues. Estimating dates via LLM...")
-                openalex_events = self._enrich_with_llm(openalex_events, domain, mode="dates")
-                
-                existing_names = {e['name'].lower() for e in all_events}
-                for oe in openalex_events:
-                     if oe['name'].lower() not in existing_names:
-                         all_events.append(oe)
-        except Exception as e:
-            print(f"⚠️ OpenAlex Failed: {e}")
+        for name in tasks:
+            self._merge_events(all_events, results.get(name, []), key='name')
 
-        # 3. LLM Generation Fallback
+        # 2. LLM Generation Fallback
         if len(all_events) < 5:
             print(f"⚠️ Result count low ({len(all_events)}). Activating Generative AI & Fallbacks...")
-            try:
-                llm_events = self._generate_conferences_via_llm(domain)
-                existing_acronyms = {e['acronym'].lower() for e in all_events}
-                for le in llm_events:
-                    if le['acronym'].lower() not in existing_acronyms:
-                        all_events.append(le)
-                
-                # If STILL low, use hardcoded fallback
-                if len(all_events) < 3:
-                     fallback_events = self._get_fallback_conferences(domain)
-                     all_events.extend(fallback_events)
-                     
-            except Exception as e:
-                 print(f"⚠️ Generative Fallback Failed: {e}")
-                 # Emergency fallback
-                 all_events.extend(self._get_fallback_conferences(domain))
+            llm_results, llm_sources = self._run_sources(
+                {"llm_fallback": (lambda: self._generate_conferences_via_llm(domain), None)},
+                start_time + deadline
+            )
+            sources.update(llm_sources)
+            self._merge_events(all_events, llm_results.get("llm_fallback", []), key='acronym')
 
-        print(f"✓ Found {len(all_events)} total conferences via Multi-Source.")
-        
-        # Final Enrichment
-        events_to_enrich = [e for e in all_events if e.get('impact_factor') is None]
-        if events_to_enrich:
-             self._enrich_with_llm(events_to_enrich, domain, mode="metadata")
+            # If STILL low, use hardcoded fallback
+            if len(all_events) < 3:
+                fallback_events = self._get_fallback_conferences(domain)
+                all_events.extend(fallback_events)
+                sources["fallback"] = {'status': 'ok', 'count': len(fallback_events), 'elapsed_ms': 0.0}
+
+        print(f"✓ Found {len(all_events)} total conferences via Multi-Source "
+              f"({(time.time() - start_time):.1f}s).")
+
+        for e in all_events:
+            e.pop('needs_dates', None)
 
         # Deduplication
         unique_events = {}
@@ -95,44 +358,129 @@ class ConferenceScraper:
             key = e['name'].lower().strip()
             if key not in unique_events:
                 unique_events[key] = e
-        
-        return list(unique_events.values())
+
+        return list(unique_events.values()), sources
+
+    def _run_sources(self, tasks, deadline_at):
+        """
+        Runs source tasks on the shared pool until they finish or the deadline passes
+
+        A source whose fetch finished but whose enrichment is still running
+        at the deadline is returned unenriched (status 'partial').
+
+        At the deadline, tasks that have not started are cancelled; running
+        ones skip enrichment if their fetch ends late, and enrichment stops
+        waiting for its LLM batches, so late tasks free their worker soon
+        after the deadline instead of starving later requests.
+
+        Args:
+            tasks (dict): source name -> (fetch, enrich) where fetch() returns
+                events and enrich(events, deadline_at) updates them in place (or None)
+
+        Returns:
+            tuple: (results, sources) with source name -> events, and
+                   source name -> {'status', 'count', 'elapsed_ms'}
+        """
+        submitted = time.time()
+        fetched = {}
+
+        def run(name, fetch, enrich):
+            events = fetch()
+            # Snapshot before enrichment, in case enrichment misses the deadline
+            fetched[name] = ([dict(e) for e in events], (time.time() - submitted) * 1000)
+            # Past the deadline the result is already returned without it: skip enrichment
+            complete = True
+            if events and enrich:
+                if time.time() < deadline_at:
+                    enrich(events, deadline_at)
+                # Enrichment that ran into the deadline returned without its late batches
+                complete = time.time() < deadline_at
+            return events, (time.time() - submitted) * 1000, complete
+
+        futures = {_get_executor().submit(run, name, fetch, enrich): name
+                   for name, (fetch, enrich) in tasks.items()}
+        done, pending = wait(futures, timeout=max(0.0, deadline_at - time.time()))
+        for future in pending:
+            future.cancel()     # Only succeeds for tasks still queued behind other requests
+
+        results, sources = {}, {}
+        for future in done:
+            name = futures[future]
+            try:
+                events, elapsed_ms, complete = future.result()
+                results[name] = events
+                status = ('ok' if complete else 'partial') if events else 'empty'
+                sources[name] = {'status': status, 'count': len(events),
+                                 'elapsed_ms': elapsed_ms}
+            except Exception as e:
+                print(f"⚠️ {name} Failed: {e}")
+                sources[name] = {'status': 'error', 'count': 0, 'error': str(e),
+                                 'elapsed_ms': (time.time() - submitted) * 1000}
+        for future in pending:
+            # Left running in the background; whatever it finishes later is discarded
+            name = futures[future]
+            if name in fetched:
+                events, fetch_ms = fetched[name]
+                print(f"⏱️ {name} enrichment missed the deadline; returning it unenriched")
+                results[name] = events
+                sources[name] = {'status': 'partial', 'count': len(events), 'elapsed_ms': fetch_ms}
+            else:
+                print(f"⏱️ {name} missed the deadline; returning without it")
+                sources[name] = {'status': 'timeout', 'count': 0, 'elapsed_ms': (time.time() - submitted) * 1000}
+        return results, sources
+
+    @staticmethod
+    def _merge_events(all_events, events, key):
+        existing = {e[key].lower() for e in all_events}
+        for e in events:
+            if e[key].lower() not in existing:
+                existing.add(e[key].lower())
+                all_events.append(e)
+
+    def _enrich_openalex(self, events, domain, deadline_at=None):
+        """
+        OpenAlex venues have no dates or impact data: dates first, then impact/index
+        """
+        print(f"✓ OpenAlex found {len(events)} venues. Estimating dates via LLM...")
+        self._enrich_with_llm(events, domain, mode="dates", deadline_at=deadline_at)
+        if deadline_at is None or time.time() < deadline_at:
+            self._enrich_with_llm(events, domain, mode="metadata", deadline_at=deadline_at)
 
 
     def _scrape_openalex(self, domain):
         """
         Query OpenAlex Venues API.
         Returns list of dicts with 'name', 'website', 'id'.
+
+        Network, HTTP and parse errors are raised (the source is reported as
+        'error' and retried soon); [] means OpenAlex answered with no venues.
         """
         url = f"https://api.openalex.org/venues?filter=display_name.search:{domain}&per-page=15"
-        try:
-            resp = requests.get(url, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json()
-                results = []
-                for item in data.get('results', []):
-                    # We need to format them like our events
-                    # We don't have dates yet, LLM will fill them.
-                    name = item.get('display_name', 'Unknown')
-                    # Create fake acronym from caps?
-                    acronym = "".join([c for c in name if c.isupper()])
-                    if len(acronym) < 3: acronym =name[:4].upper()
-                    
-                    results.append({
-                        "id": item.get('id', str(random.randint(10000,99999))),
-                        "acronym": acronym,
-                        "name": name,
-                        "dates": "TBD 2026", # Placeholder
-                        "location": "TBD",
-                        "deadline": "TBD",
-                        "website": item.get('homepage_url', '') or item.get('url', ''),
-                        # Mark for date enrichment
-                        "needs_dates": True
-                    })
-                return results
-        except Exception as e:
-            print(f"OpenAlex Error: {e}")
-        return []
+        resp = cached_get(url, timeout=5)
+        if resp.status_code != 200:
+            raise RuntimeError(f"OpenAlex returned HTTP {resp.status_code}")
+        data = resp.json()
+        results = []
+        for item in data.get('results', []):
+            # We need to format them like our events
+            # We don't have dates yet, LLM will fill them.
+            name = item.get('display_name', 'Unknown')
+            # Create fake acronym from caps?
+            acronym = "".join([c for c in name if c.isupper()])
+            if len(acronym) < 3: acronym =name[:4].upper()
+            
+            results.append({
+                "id": item.get('id', str(random.randint(10000,99999))),
+                "acronym": acronym,
+                "name": name,
+                "dates": "TBD 2026", # Placeholder
+                "location": "TBD",
+                "deadline": "TBD",
+                "website": item.get('homepage_url', '') or item.get('url', ''),
+                # Mark for date enrichment
+                "needs_dates": True
+            })
+        return results
 
 
 
@@ -174,25 +522,14 @@ class ConferenceScraper:
         """
 
         try:
-            payload = {
-                "model": "meta-llama/llama-3-8b-instruct",
-                "messages": [
-                    {"role": "system", "content": "You are a valid JSON generator. Do not output markdown fences or text. Just JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.3 # Low temp for factual accuracy
-            }
-            
-            response = requests.post(
-                "https://fastrouter.302.ai/v1/chat/completions",
-                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                json=payload,
-                timeout=20,
-                verify=False  # Bypass SSL verify for Render
+            content = self._chat_completion(
+                "You are a valid JSON generator. Do not output markdown fences or text. Just JSON.",
+                prompt,
+                temperature=0.3, # Low temp for factual accuracy
+                timeout=20
             )
 
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
+            if content:
                 # Clean markdown
                 content = re.sub(r'```json\s*', '', content)
                 content = re.sub(r'```', '', content)
@@ -232,170 +569,190 @@ class ConferenceScraper:
         return self._scrape_url(full_url)
 
     def _scrape_url(self, url):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code != 200: return []
+        """
+        Fetches and parses one WikiCFP results page
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            events = []
-            all_rows = soup.find_all('tr')
-            
-            skip_next = False
-            for i, row in enumerate(all_rows):
-                if skip_next:
-                    skip_next = False
-                    continue
-                
-                cols = row.find_all('td')
-                if not cols: continue
-                
-                first_col = cols[0]
-                if first_col.has_attr("rowspan") and first_col["rowspan"] == "2":
-                    link_tag = first_col.find('a')
-                    if not link_tag: continue
-                    
-                    acronym = link_tag.get_text().strip()
-                    url_suffix = link_tag['href']
-                    
-                    if len(cols) < 2: continue
-                    full_name = cols[1].get_text().strip()
-                    
-                    if i + 1 >= len(all_rows): break
-                    next_row = all_rows[i+1]
-                    next_cols = next_row.find_all('td')
-                    
-                    if len(next_cols) < 3: continue
-                    dates = next_cols[0].get_text().strip()
-                    location = next_cols[1].get_text().strip()
-                    deadline = next_cols[2].get_text().strip()
-
-                    # Filter for future dates if we scraped "All" years
-                    # Simple heuristic: Check for years 2025, 2026, 2027...
-                    current_year = datetime.now().year
-                    if not any(str(y) in dates for y in range(current_year, current_year + 5)):
-                        continue
-                    
-                    events.append({
-                        "id": url_suffix.split('eventid=')[-1].split('&')[0] if 'eventid=' in url_suffix else str(random.randint(10000,99999)),
-                        "acronym": acronym,
-                        "name": full_name,
-                        "dates": dates,
-                        "location": location,
-                        "deadline": deadline,
-                        "website": f"http://www.wikicfp.com{url_suffix}"
-                    })
-                    skip_next = True
-            
-            return events
+        Network, HTTP and parse errors are raised (the source is reported as
+        'error' and retried soon); [] means the page had no upcoming events.
+        """
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        response = cached_get(url, headers=headers, timeout=10)
+        if response.status_code != 200:
+            raise RuntimeError(f"WikiCFP returned HTTP {response.status_code} for {url}")
 
-        except Exception as e:
-            print(f"❌ Scraping Error for {url}: {e}")
-            return []
+        return parse_wikicfp_results(response.content)
 
 
-    def _enrich_with_llm(self, events, domain, mode="metadata"):
+    def _enrich_with_llm(self, events, domain, mode="metadata", deadline_at=None):
         """
         Uses FastRouter (Llama-3) to enrich data.
         mode="metadata": Guesses impact factor and index.
         mode="dates": Guesses 2025/2026 dates and location (for OpenAlex results).
+
+        Conferences already enriched in this mode (in any domain) are filled
+        from the catalog; the rest go to the LLM in batches of
+        ENRICHMENT_BATCH_SIZE, run in parallel, and the answers are memoized.
+        Events left unenriched keep their fields (impact/index defaults are
+        applied later by _with_default_enrichment).
+
+        With deadline_at, batches still unfinished at the deadline are left
+        out: queued ones are cancelled, running ones finish in the background
+        and memoize their answers for the next request.
         """
         api_key = os.getenv("FASTROUTER_API_KEY")
         if not api_key:
             return events
 
-        # Prepare Prompt
-        event_names = [f"- {e['name']} (Acronym: {e['acronym']})" for e in events]
-        event_list_str = "\n".join(event_names)
-        
-        system_msg = "You are an academic expert JSON generator."
-        
+        catalog = get_conference_catalog()
+        memo = catalog.get_enrichments(mode, events) if catalog else {}
+        pending = {}    # enrichment key -> events sharing it
+        for e in events:
+            key = enrichment_key(e)
+            if key in memo:
+                e.update(memo[key])
+            else:
+                pending.setdefault(key, []).append(e)
+        if memo:
+            print(f"🗂️ LLM enrichment ({mode}): {len(memo)} conferences from the catalog")
+        if not pending:
+            return events
+
+        keys = list(pending)
+        batches = [keys[i:i + ENRICHMENT_BATCH_SIZE] for i in range(0, len(keys), ENRICHMENT_BATCH_SIZE)]
+        futures = [_get_enrichment_executor().submit(self._enrich_batch, [pending[k][0] for k in batch], domain, mode)
+                   for batch in batches]
+        done, late = wait(futures, timeout=None if deadline_at is None else max(0.0, deadline_at - time.time()))
+        for future in late:
+            future.cancel()
+
+        enriched = 0
+        for batch, future in zip(batches, futures):
+            if future not in done:
+                continue
+            for key, data in zip(batch, future.result()):
+                if data is None:
+                    continue
+                for e in pending[key]:
+                    e.update(data)
+                enriched += 1
+        print(f"✓ LLM enrichment ({mode}): {enriched}/{len(keys)} conferences in {len(batches)} batches"
+              + (f" ({len(late)} missed the deadline)" if late else ""))
+        return events
+
+    def _enrich_batch(self, events, domain, mode):
+        """
+        Enriches one batch, retrying (up to ENRICHMENT_RETRIES times) only
+        the events the previous attempt did not return valid data for, and
+        memoizes the answers in the catalog
+
+        Returns:
+            list: Event fields (dict) or None per event, in order
+        """
+        results = [None] * len(events)
+        remaining = list(range(len(events)))
+        for attempt in range(1 + ENRICHMENT_RETRIES):
+            ids = [str(i + 1) for i in remaining]
+            prompt = self._enrichment_prompt([events[i] for i in remaining], ids, domain, mode)
+            try:
+                # Retries skip the response cache, which may hold the reply that failed
+                content = self._chat_completion("You are an academic expert JSON generator.", prompt,
+                                                temperature=0.2, timeout=25, use_cache=attempt == 0)
+                parsed = _parse_enrichment(content, mode, ids)
+            except Exception as e:
+                print(f"⚠️ LLM Enrichment ({mode}) batch of {len(remaining)} failed (attempt {attempt + 1}): {e}")
+                continue
+
+            for i, item_id in zip(remaining, ids):
+                results[i] = parsed.get(item_id)
+            remaining = [i for i in remaining if results[i] is None]
+            if not remaining:
+                break
+
+        catalog = get_conference_catalog()
+        enriched = [(e, data) for e, data in zip(events, results) if data is not None]
+        if catalog and enriched:
+            try:
+                catalog.put_enrichments(mode, enriched)
+            except Exception as e:
+                print(f"⚠️ Could not memoize LLM enrichment ({mode}): {e}")
+        return results
+
+    @staticmethod
+    def _enrichment_prompt(events, ids, domain, mode):
+        event_list_str = "\n".join(f"[{item_id}] {e['name']} (Acronym: {e['acronym']})" for item_id, e in zip(ids, events))
+
         if mode == "dates":
-            prompt = f"""
+            return f"""
             For the following real academic venues in '{domain}', estimate the NEXT likely conference/event details for 2025 or 2026 based on their historical recurring schedule.
             
             Input:
             {event_list_str}
             
-            Return JSON mapping 'Acronym' (or Name if no Acronym) to details.
+            Return ONLY a JSON object mapping each item number to its details, with no other text.
             Format:
             {{
-                "ACRONYM": {{ 
+                "1": {{ 
                     "dates": "June 15-20, 2026", 
                     "location": "Paris, France", 
                     "deadline": "Jan 10, 2026" 
                 }}
             }}
             """
-        else:
-            prompt = f"""
+        return f"""
             For these conferences in '{domain}', estimate Impact Factor (0-20) and Indexing (IEEE, Scopus, etc).
             Input:
             {event_list_str}
+            Return ONLY a JSON object mapping each item number to its estimate, with no other text.
             Format:
-            {{ "ACRONYM": {{ "impact": 5.2, "index": "IEEE" }} }}
+            {{ "1": {{ "impact": 5.2, "index": "IEEE" }} }}
             """
 
-        try:
-            payload = {
-                "model": "meta-llama/llama-3-8b-instruct",
-                "messages": [
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.2
-            }
-            
-            response = requests.post(
-                "https://fastrouter.302.ai/v1/chat/completions",
-                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                json=payload,
-                timeout=25,
-                verify=False # Bypass SSL verify for Render
-            )
-            
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
-                # Clean code blocks
-                content = re.sub(r'```json\s*', '', content)
-                content = re.sub(r'```', '', content)
-                content = content.strip()
-                
-                # Extract JSON
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                if start != -1 and end != -1:
-                    data = json.loads(content[start:end])
-                    
-                    for e in events:
-                        # Try matching by Acronym first, then Name
-                        keys_to_try = [e['acronym'], e['name'], e['name'].split(':')[0]]
-                        matched_data = None
-                        for k in keys_to_try:
-                            if k in data:
-                                matched_data = data[k]
-                                break
-                        
-                        if matched_data:
-                            if mode == "dates":
-                                e['dates'] = matched_data.get('dates', e['dates'])
-                                e['location'] = matched_data.get('location', e['location'])
-                                e['deadline'] = matched_data.get('deadline', e['deadline'])
-                            else:
-                                e['impact_factor'] = matched_data.get('impact', 2.0)
-                                e['index'] = matched_data.get('index', 'Scopus')
-                        else:
-                            # Default if not found in LLM response
-                            if mode == "metadata":
-                                if 'impact_factor' not in e: e['impact_factor'] = 2.0
-                                if 'index' not in e: e['index'] = 'Scopus'
-                                
-        except Exception as e:
-            print(f"⚠️ LLM Enrichment ({mode}) Failed: {e}")
-        
-        return events
+
+    def _chat_completion(self, system_msg, prompt, temperature, timeout, use_cache=True):
+        """
+        Calls FastRouter (Llama-3) and returns the message content, or None.
+        Responses are served from the shared LLM response cache when possible
+        (use_cache=False skips the lookup but still stores the new response).
+        """
+        api_key = os.getenv("FASTROUTER_API_KEY")
+        if not api_key:
+            return None
+
+        cache = get_response_cache()
+        cache_key = None
+        if cache:
+            cache_key = ResponseCache.make_key(ENRICHMENT_MODEL, system_msg, prompt, None, temperature)
+            cached = cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                print("⚡ LLM cache hit (conference enrichment)")
+                return cached
+
+        payload = {
+            "model": ENRICHMENT_MODEL,
+            "messages": [
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature
+        }
+
+        response = http_transport.post(
+            FASTROUTER_CHAT_URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json=payload,
+            timeout=timeout,
+            verify=False # Bypass SSL verify for Render
+        )
+
+        if response.status_code != 200:
+            return None
+
+        content = response.json()['choices'][0]['message']['content']
+        if cache_key and content:
+            cache.set(cache_key, content)
+        return content
 
 
     def _get_fallback_conferences(self, domain):
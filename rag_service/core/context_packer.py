@@ -0,0 +1,145 @@
+"""
+Token-Budgeted Context Packing
+
+Fits retrieved chunks into a per-section token budget before they are
+pasted into a section prompt:
+- Tokens are counted with tiktoken (falls back to ~4 chars/token if the
+  encoding cannot be loaded, e.g. offline)
+- Duplicate chunks, chunks contained in another, and the text shared by
+  consecutive chunks (the splitter's CHUNK_OVERLAP) are removed
+- Chunks are added best-first; the last one is truncated to fit
+"""
+
+import os
+import threading
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 3500))     # Per section user prompt
+PROMPT_TOKENIZER = os.getenv('PROMPT_TOKENIZER', 'cl100k_base')
+MIN_OVERLAP_CHARS = int(os.getenv('MIN_OVERLAP_CHARS', 50))
+MIN_PARTIAL_CHUNK_TOKENS = 64   # Smaller leftovers are dropped instead of truncated
+
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(PROMPT_TOKENIZER)
+            except Exception as e:
+                print(f"   ⚠️ tiktoken encoding '{PROMPT_TOKENIZER}' unavailable ({type(e).__name__}); estimating tokens")
+                _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    """
+    Number of tokens in text
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cuts text to at most max_tokens, on a word boundary where possible
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        truncated = text[:max_tokens * 4]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        truncated = encoding.decode(tokens[:max_tokens])
+    if len(truncated) < len(text) and ' ' in truncated:
+        truncated = truncated.rsplit(' ', 1)[0]
+    return truncated
+
+
+def _overlap(previous, chunk, min_overlap=MIN_OVERLAP_CHARS):
+    """
+    Length of the longest suffix of previous that is a prefix of chunk
+    """
+    if len(previous) < min_overlap or len(chunk) < min_overlap:
+        return 0
+    probe = chunk[:min_overlap]
+    start = previous.find(probe)
+    while start != -1:
+        tail = previous[start:]
+        if chunk.startswith(tail):
+            return len(tail)
+        start = previous.find(probe, start + 1)
+    return 0
+
+
+def dedupe_chunks(chunks, min_overlap=MIN_OVERLAP_CHARS):
+    """
+    Removes repeated text from ranked chunks, keeping their order
+
+    Exact duplicates and chunks contained in an earlier one are dropped;
+    when a chunk starts with the end of an earlier one (splitter overlap),
+    only its new text is kept.
+    """
+    kept = []
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if not chunk or any(chunk in previous for previous in kept):
+            continue
+        for previous in kept:
+            overlap = _overlap(previous, chunk, min_overlap)
+            if overlap:
+                chunk = chunk[overlap:].strip()
+                break
+        if chunk:
+            kept.append(chunk)
+    return kept
+
+
+def pack_chunks(chunks, budget_tokens, separator=CHUNK_SEPARATOR):
+    """
+    Packs ranked chunks into a token budget
+
+    Args:
+        chunks (list): Chunk texts, best first
+        budget_tokens (int): Maximum tokens for the packed context
+
+    Returns:
+        tuple: (context_text, stats) with chunks_in, chunks_used, tokens
+    """
+    deduped = dedupe_chunks(chunks)
+    separator_tokens = count_tokens(separator)
+
+    packed, used_tokens = [], 0
+    for chunk in deduped:
+        remaining = budget_tokens - used_tokens - (separator_tokens if packed else 0)
+        if remaining <= 0:
+            break
+        tokens = count_tokens(chunk)
+        if tokens > remaining:
+            if remaining >= MIN_PARTIAL_CHUNK_TOKENS:
+                chunk = truncate_to_tokens(chunk, remaining - 2) + " ..."
+                tokens = count_tokens(chunk)
+            else:
+                break
+        packed.append(chunk)
+        used_tokens += tokens + (separator_tokens if len(packed) > 1 else 0)
+        if tokens >= remaining:
+            break
+
+    stats = {'chunks_in': len(chunks), 'chunks_used': len(packed), 'tokens': used_tokens}
+    return separator.join(packed), stats
@@ -0,0 +1,273 @@
+"""
+Persistent Embedding Cache
+
+Embeddings are keyed by (model name, normalize flag, sha256 of text):
+- One namespace directory per (model, normalize)
+- vectors.f32: float32 matrix (rows x dim), opened with np.memmap
+- keys.bin: 32-byte sha256 digests, row-aligned with vectors.f32
+
+Rows are appended, so lookups read straight out of the page cache and
+several processes (ingestion, gunicorn workers) can share one cache
+directory. Past EMBEDDING_CACHE_MAX_ENTRIES rows, a write compacts the
+namespace down to its newest 90% (the files are rewritten and swapped
+in under the cache lock; readers see a new oldest key and reload).
+
+Used by ingestion (chunk embeddings) and by RAGPipeline (query embeddings).
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl  # Cross-process append lock (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Load environment
+load_dotenv()
+
+# Configuration
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', './data/embedding_cache')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 500000))  # Per model (0 = unlimited)
+
+DIGEST_SIZE = 32
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-mostly, memory-mapped store of embeddings for one (model, normalize) pair
+    """
+
+    def __init__(self, cache_dir, model_name, normalize, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        namespace = hashlib.sha256(f"{model_name}|{bool(normalize)}".encode('utf-8')).hexdigest()[:16]
+        self.path = Path(cache_dir) / namespace
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.keys_path = self.path / 'keys.bin'
+        self.vectors_path = self.path / 'vectors.f32'
+        self.meta_path = self.path / 'meta.json'
+        self.lock_path = self.path / '.lock'
+
+        self.model_name = model_name
+        self.normalize = bool(normalize)
+        self.max_entries = max_entries
+        self.dim = None
+        self._rows = {}         # digest -> row
+        self._vectors = None    # np.memmap (rows x dim), read-only
+        self._first_key = None  # Oldest digest: changes when a compaction drops rows
+        self._keys_stat = None  # (inode, size, mtime) of keys.bin at the last read
+        self._lock = threading.Lock()
+
+        self._refresh()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _load_meta(self):
+        """
+        Reads dim from meta.json, which may appear after this process started
+        (the first ingest writes it)
+        """
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.dim = json.load(f)['dim']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    @contextmanager
+    def _file_lock(self, shared=False):
+        """
+        Cross-process lock: exclusive for writers, shared for readers catching up
+        """
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, locked=False):
+        """
+        Picks up rows appended since the last read (by this or another
+        process), or reloads everything after a compaction
+
+        Args:
+            locked (bool): The caller already holds the exclusive file lock
+        """
+        if self.dim is None:
+            self._load_meta()
+        if self.dim is None or not self.keys_path.exists():
+            return
+        stat = self.keys_path.stat()
+        if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._keys_stat:
+            return
+        if locked:
+            self._reload()
+        else:
+            # Not while a writer is halfway through appending or compacting
+            with self._file_lock(shared=True):
+                self._reload()
+
+    def _reload(self):
+        stat = self.keys_path.stat()
+        count = stat.st_size // DIGEST_SIZE
+        with open(self.keys_path, 'rb') as f:
+            first_key = f.read(DIGEST_SIZE)
+            if first_key != self._first_key:
+                # New files (first read or a compaction): row numbers start over
+                self._rows = {}
+                self._first_key = first_key
+            f.seek(len(self._rows) * DIGEST_SIZE)
+            data = f.read((count - len(self._rows)) * DIGEST_SIZE)
+        self._keys_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        start = len(self._rows)
+        for i in range(len(data) // DIGEST_SIZE):
+            self._rows[data[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]] = start + i
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                  shape=(len(self._rows), self.dim)) if self._rows else None
+
+    def _prune(self):
+        """
+        Drops the oldest rows down to 90% of max_entries (caller holds the
+        exclusive file lock). Row views handed out earlier stay valid: they
+        map the replaced files, which live on until unmapped.
+        """
+        keep = max(1, self.max_entries * 9 // 10)
+        drop = len(self._rows) - keep
+        for path, row_size in ((self.vectors_path, self.dim * 4), (self.keys_path, DIGEST_SIZE)):
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                src.seek(drop * row_size)
+                shutil.copyfileobj(src, dst)
+                dst.truncate(keep * row_size)
+            # Vectors first, then keys (the keys file is what readers watch)
+            os.replace(tmp_path, path)
+        print(f"🧹 Embedding cache: pruned {drop} oldest entries ({keep} kept)")
+        self._refresh(locked=True)
+
+    def get(self, digests):
+        """
+        Looks up digests
+
+        Returns:
+            tuple: (vectors, missing) where vectors[i] is a read-only row view
+                   (or None) and missing lists the indices not in the cache
+        """
+        with self._lock:
+            self._refresh()
+            vectors, missing = [], []
+            for i, digest in enumerate(digests):
+                row = self._rows.get(digest)
+                if row is None:
+                    vectors.append(None)
+                    missing.append(i)
+                else:
+                    vectors.append(self._vectors[row])
+            return vectors, missing
+
+    def add(self, digests, vectors):
+        """
+        Appends new embeddings (duplicates already present are skipped)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return
+
+        with self._lock, self._file_lock():
+            if self.dim is None:
+                self._load_meta()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({'model_name': self.model_name, 'normalize': self.normalize, 'dim': self.dim}, f)
+            self._refresh(locked=True)
+
+            new_keys, new_rows, seen = [], [], set()
+            for digest, vector in zip(digests, vectors):
+                if digest in self._rows or digest in seen:
+                    continue
+                seen.add(digest)
+                new_keys.append(digest)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # Vectors first, then keys: a row only becomes visible once its key is written
+            row_bytes = self.dim * 4
+            self.vectors_path.touch(exist_ok=True)
+            with open(self.vectors_path, 'r+b') as f:
+                f.seek(len(self._rows) * row_bytes)
+                f.write(np.ascontiguousarray(new_rows, dtype=np.float32).tobytes())
+            with open(self.keys_path, 'ab') as f:
+                f.write(b''.join(new_keys))
+
+            self._refresh(locked=True)
+            if self.max_entries and len(self._rows) > self.max_entries:
+                self._prune()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings wrapper that serves repeated texts from an EmbeddingCache
+    """
+
+    def __init__(self, embeddings, model_name, normalize, cache_dir=EMBEDDING_CACHE_DIR):
+        self.embeddings = embeddings
+        self.cache = EmbeddingCache(cache_dir, model_name, normalize)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts):
+        digests = [text_digest(text) for text in texts]
+        vectors, missing = self.cache.get(digests)
+
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.add([digests[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
+
+    def embed_query(self, text):
+        digest = text_digest(text)
+        vectors, missing = self.cache.get([digest])
+
+        if missing:
+            self.misses += 1
+            vector = self.embeddings.embed_query(text)
+            self.cache.add([digest], [vector])
+            return list(vector)
+
+        self.hits += 1
+        return vectors[0].tolist()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.cache)}
+
+
+def with_embedding_cache(embeddings, model_name, normalize):
+    """
+    Wraps an embeddings model with the persistent cache if enabled
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(embeddings, model_name, normalize)
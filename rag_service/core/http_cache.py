@@ -0,0 +1,332 @@
+"""
+HTTP Response Cache for Scraping
+
+On-disk cache (SQLite, zlib-compressed bodies) in front of the WikiCFP
+and OpenAlex fetches:
+
+- Fresh entries are served locally; freshness comes from Cache-Control
+  max-age / Expires, raised to a per-host minimum (HTTP_CACHE_MIN_FRESH)
+- Stale entries are revalidated with If-None-Match / If-Modified-Since,
+  so an unchanged page costs a 304 instead of a full download
+- no-store responses are never stored; no-cache ones are always revalidated
+- If the network fails, a stale entry is served instead of an error
+- Offline mode (HTTP_CACHE_OFFLINE=true) never touches the network, so
+  tests and benchmarks can replay captured pages
+
+Seed a captured page (e.g. debug_wikicfp.html) for offline replay:
+    python -m core.http_cache seed \
+        "http://www.wikicfp.com/cfp/servlet/tool.search?q=machine+learning&year=a&skip=0" debug_wikicfp.html
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import argparse
+import threading
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+from . import http_transport
+
+# Load environment
+load_dotenv()
+
+# Configuration
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH', './data/http_cache.sqlite3')
+HTTP_CACHE_OFFLINE = os.getenv('HTTP_CACHE_OFFLINE', 'false').lower() == 'true'
+# Minimum freshness per host in seconds ("host=seconds,..."); listings change on a scale of days
+HTTP_CACHE_MIN_FRESH = os.getenv('HTTP_CACHE_MIN_FRESH', 'www.wikicfp.com=21600,api.openalex.org=86400')
+HTTP_CACHE_MAX_MB = float(os.getenv('HTTP_CACHE_MAX_MB', 200))
+
+# Response headers kept with the body
+STORED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control', 'expires', 'date')
+
+
+def parse_min_fresh(spec):
+    """
+    "host=seconds,host=seconds" -> {host: seconds}
+    """
+    hosts = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            host, seconds = item.split('=', 1)
+            hosts[host.strip().lower()] = float(seconds)
+    return hosts
+
+
+def _freshness(headers, now):
+    """
+    Seconds a response may be served without revalidation, from its own headers
+
+    Returns:
+        tuple: (seconds, cacheable)
+    """
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control:
+        return 0, False
+    if 'no-cache' in cache_control:
+        return 0, True
+    match = re.search(r"(?:s-maxage|max-age)\s*=\s*(\d+)", cache_control)
+    if match:
+        return int(match.group(1)), True
+    if headers.get('expires'):
+        try:
+            return max(0.0, parsedate_to_datetime(headers['expires']).timestamp() - now), True
+        except (TypeError, ValueError):
+            return 0, True
+    return 0, True
+
+
+def _build_response(url, status_code, headers, body, source):
+    """
+    requests.Response around a cached body, so callers need not care where it came from
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = source   # 'hit', 'revalidated', 'stale', 'offline' or None (network)
+    return response
+
+
+class HTTPCache:
+    """
+    Conditional-request cache keyed by URL
+    """
+
+    def __init__(self, db_path=HTTP_CACHE_PATH, min_fresh=None, offline=HTTP_CACHE_OFFLINE,
+                 max_mb=HTTP_CACHE_MAX_MB):
+        self.db_path = db_path
+        self.min_fresh = parse_min_fresh(HTTP_CACHE_MIN_FRESH) if min_fresh is None else min_fresh
+        self.offline = offline
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'stale_on_error': 0,
+                          'offline_misses': 0, 'bytes_saved': 0}
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    fresh_until REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_http_fetched ON responses (fetched_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _fresh_seconds(self, url, headers, now):
+        """
+        Freshness from the response headers, raised to the host minimum (unless no-cache)
+
+        Returns:
+            tuple: (seconds, cacheable)
+        """
+        seconds, cacheable = _freshness(headers, now)
+        if 'no-cache' not in headers.get('cache-control', '').lower():
+            seconds = max(seconds, self.min_fresh.get((urllib.parse.urlsplit(url).hostname or '').lower(), 0))
+        return seconds, cacheable
+
+    def _load(self, url):
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT status, headers, body, fresh_until FROM responses WHERE url = ?", (url,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return {'status': row[0], 'headers': json.loads(row[1]), 'body': zlib.decompress(row[2]),
+                'fresh_until': row[3]}
+
+    def _store(self, url, status, headers, body, now):
+        """
+        Stores a 200 response (unless no-store) and returns its fresh-until time
+        """
+        seconds, cacheable = self._fresh_seconds(url, headers, now)
+        if not cacheable:
+            return None
+        fresh_until = now + seconds
+
+        compressed = zlib.compress(body, 6)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, status, headers, body, size, fetched_at, fresh_until) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, status, json.dumps(headers), compressed, len(compressed), now, fresh_until)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache write failed: {e}")
+        return fresh_until
+
+    def _touch(self, url, headers, fresh_until, now):
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET headers = ?, fetched_at = ?, fresh_until = ? WHERE url = ?",
+                         (json.dumps(headers), now, fresh_until, url))
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest fetches first
+        for url, size in conn.execute("SELECT url, size FROM responses ORDER BY fetched_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+
+    def get(self, url, headers=None, **kwargs):
+        """
+        GET through the cache (network calls go through http_transport.polite_get)
+
+        Args:
+            url (str): Full URL including the query string (the cache key)
+            headers (dict): Request headers
+            **kwargs: Passed to requests (e.g. timeout)
+
+        Returns:
+            requests.Response: with from_cache set to 'hit', 'revalidated',
+                'stale', 'offline' or None (downloaded)
+        """
+        now = time.time()
+        entry = self._load(url)
+
+        if entry and (entry['fresh_until'] > now or self.offline):
+            self._count('hits')
+            self._count('bytes_saved', len(entry['body']))
+            return _build_response(url, entry['status'], entry['headers'], entry['body'],
+                                   'hit' if entry['fresh_until'] > now else 'offline')
+        if self.offline:
+            self._count('offline_misses')
+            return _build_response(url, 504, {'content-type': 'text/plain'}, b'Not in HTTP cache (offline mode)', 'offline')
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry['headers'].get('etag'):
+                request_headers['If-None-Match'] = entry['headers']['etag']
+            if entry['headers'].get('last-modified'):
+                request_headers['If-Modified-Since'] = entry['headers']['last-modified']
+
+        try:
+            response = http_transport.polite_get(url, headers=request_headers, **kwargs)
+        except requests.RequestException:
+            if entry:
+                print(f"⚠️ Network error; serving stale copy of {url}")
+                self._count('stale_on_error')
+                return _build_response(url, entry['status'], entry['headers'], entry['body'], 'stale')
+            raise
+
+        stored_headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        if response.status_code == 304 and entry:
+            merged = dict(entry['headers'], **stored_headers)
+            seconds, _ = self._fresh_seconds(url, merged, now)
+            self._touch(url, merged, now + seconds, now)
+            self._count('revalidated')
+            self._count('bytes_saved', len(entry['body']))
+            return _build_response(url, entry['status'], merged, entry['body'], 'revalidated')
+
+        if response.status_code == 200:
+            self._store(url, 200, stored_headers, response.content, now)
+            self._count('downloads')
+        elif entry and response.status_code >= 500:
+            self._count('stale_on_error')
+            return _build_response(url, entry['status'], entry['headers'], entry['body'], 'stale')
+        response.from_cache = None
+        return response
+
+    def seed(self, url, body, content_type='text/html; charset=UTF-8'):
+        """
+        Stores a captured body for url (kept fresh for the host's minimum window)
+        """
+        self._store(url, 200, {'content-type': content_type}, body, time.time())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            with self._connect() as conn:
+                count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            stats['entries'] = count
+            stats['disk_bytes'] = total
+        except sqlite3.Error:
+            pass
+        stats['offline'] = self.offline
+        return stats
+
+
+# Singleton instance
+_http_cache_instance = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache():
+    """
+    Returns the shared HTTP cache, or None if it is disabled
+    """
+    global _http_cache_instance
+    if not HTTP_CACHE_ENABLED and not HTTP_CACHE_OFFLINE:
+        return None
+    with _http_cache_lock:
+        if _http_cache_instance is None:
+            _http_cache_instance = HTTPCache()
+    return _http_cache_instance
+
+
+def cached_get(url, **kwargs):
+    """
+    GET through the HTTP cache if enabled, else straight through polite_get
+    """
+    cache = get_http_cache()
+    if cache is None:
+        return http_transport.polite_get(url, **kwargs)
+    return cache.get(url, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the scraper HTTP cache')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    seed_parser = subparsers.add_parser('seed', help='Store a captured page for a URL')
+    seed_parser.add_argument('url')
+    seed_parser.add_argument('file')
+    subparsers.add_parser('stats', help='Show cache size')
+    args = parser.parse_args()
+
+    cache = HTTPCache()
+    if args.command == 'seed':
+        cache.seed(args.url, Path(args.file).read_bytes())
+        print(f"✓ Seeded {args.url} from {args.file}")
+    else:
+        json.dump(cache.stats(), sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Shared HTTP Transport
+
+One pooled, keep-alive transport for every outbound call:
+- requests.Session for scraping and raw chat-completion calls
+- httpx.Client for the OpenAI SDK used by CloudLLMClient
+- httpx.AsyncClient (one per event loop) for AsyncCloudLLMClient
+
+Connections are reused across calls (no TCP+TLS handshake per request)
+and capped per host. Scraping goes through polite_get, which also spaces
+out request starts per host so parallel fetches stay polite.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import weakref
+import urllib.parse
+from contextlib import contextmanager
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 20))             # Host pools kept alive
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', 120))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 20))
+# Politeness for scraped hosts (polite_get)
+HTTP_HOST_MIN_INTERVAL = float(os.getenv('HTTP_HOST_MIN_INTERVAL', 0.5))   # Seconds between request starts
+HTTP_HOST_MAX_CONCURRENCY = int(os.getenv('HTTP_HOST_MAX_CONCURRENCY', 2))
+
+
+class _PooledSession(requests.Session):
+    """
+    requests.Session that applies the default (connect, read) timeout
+    when the caller does not pass one
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+class HostGate:
+    """
+    Per-host politeness: at most max_concurrency requests in flight and
+    request starts at least min_interval seconds apart
+    """
+
+    def __init__(self, min_interval=HTTP_HOST_MIN_INTERVAL, max_concurrency=HTTP_HOST_MAX_CONCURRENCY):
+        self.min_interval = min_interval
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self):
+        self._semaphore.acquire()
+        try:
+            with self._lock:
+                now = time.time()
+                start = max(now, self._next_start)
+                self._next_start = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            self._semaphore.release()
+
+
+_session_instance = None
+_host_gates = {}
+_httpx_client_instance = None
+_async_httpx_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the shared requests session
+
+    pool_block=True makes HTTP_MAX_CONNECTIONS_PER_HOST a hard per-host
+    limit: extra concurrent calls wait for a free connection.
+    """
+    global _session_instance
+    with _lock:
+        if _session_instance is None:
+            session = _PooledSession()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_HOSTS,
+                pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST,
+                pool_block=True
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session_instance = session
+    return _session_instance
+
+
+def get_httpx_client():
+    """
+    Returns the shared httpx client for OpenAI-compatible LLM providers
+    """
+    global _httpx_client_instance
+    with _lock:
+        if _httpx_client_instance is None:
+            _httpx_client_instance = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS
+                ),
+                timeout=get_llm_timeout()
+            )
+    return _httpx_client_instance
+
+
+def get_async_httpx_client():
+    """
+    Returns the httpx async client for the running event loop
+
+    Async connection pools are bound to the loop that opened them, so each
+    loop gets its own client (normally there is one, the ASGI server's).
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_httpx_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS
+                ),
+                timeout=get_llm_timeout()
+            )
+            _async_httpx_clients[loop] = client
+    return client
+
+
+def get_llm_timeout():
+    """
+    Timeout for LLM calls (long reads, short connects)
+    """
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def get(url, **kwargs):
+    """
+    GET through the shared session
+    """
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    """
+    POST through the shared session
+    """
+    return get_session().post(url, **kwargs)
+
+
+def get_host_gate(host):
+    """
+    Returns the shared politeness gate for host
+    """
+    with _lock:
+        if host not in _host_gates:
+            _host_gates[host] = HostGate()
+        return _host_gates[host]
+
+
+def polite_get(url, **kwargs):
+    """
+    GET through the shared session, paced by the host's politeness gate
+    """
+    with get_host_gate(urllib.parse.urlsplit(url).hostname).slot():
+        return get(url, **kwargs)
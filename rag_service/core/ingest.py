@@ -5,12 +5,41 @@ This script processes all PDFs in the data/pdfs directory,
 chunks them, creates embeddings, and builds a FAISS vector store.
 
 Run this ONCE before starting the RAG service:
-    python core/ingest.py
+    python core/ingest.py [--workers N]
+
+After adding, changing or removing PDFs, update the index in place:
+    python core/ingest.py --incremental
+
+PDF parsing and chunking are fanned out across a process pool;
+results are merged in file-name order so the index is deterministic.
+
+A manifest next to the index (manifest.json) records each PDF's
+content hash, chunk count and vector ids, so incremental runs only
+embed new/changed files and remove vectors of changed/deleted ones.
+
+Embedding runs in length-bucketed batches (--batch-size, --threads)
+that are streamed into the index as they complete.
+
+The index type is selected with FAISS_INDEX_TYPE (flat, ivf_flat,
+ivf_pq, hnsw); see core/vector_index.py.
+
+The store is saved without pickle (index.faiss + docstore.jsonl +
+offsets) so the service can memory-map it; see core/vector_store.py.
+A BM25 keyword index over the same chunks is saved alongside it
+(core/sparse_index.py) for hybrid retrieval.
 """
 
 import os
 import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
@@ -20,6 +49,15 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+
+from core.embedding_cache import with_embedding_cache
+from core.vector_store import load_vector_store, save_vector_store
+from core.sparse_index import build_sparse_index
+from core.vector_index import (
+    FAISS_INDEX_TYPE, FAISS_TRAIN_SAMPLE,
+    build_trained_index, index_type_of, resolve_index_type, supports_removal
+)
 
 # Load environment variables
 load_dotenv()
@@ -30,6 +68,45 @@ FAISS_INDEX_PATH = os.getenv('FAISS_INDEX_PATH', './data/faiss_index')
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
 CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 1000))
 CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 200))
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', os.cpu_count() or 1))
+EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', 64))
+EMBED_THREADS = int(os.getenv('EMBED_THREADS', 0))  # 0 = torch default
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def _load_pdf(pdf_path):
+    """
+    Parse a single PDF into page Documents tagged with their source file
+    """
+    loader = PyPDFLoader(str(pdf_path))
+    documents = loader.load()
+    
+    # Add metadata
+    for doc in documents:
+        doc.metadata['source'] = pdf_path.name
+    
+    return documents
+
+
+def _make_text_splitter(chunk_size, chunk_overlap):
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+
+def _list_pdfs(directory):
+    # Sorted so that chunk order (and therefore the index) is deterministic
+    pdf_files = sorted(Path(directory).glob('*.pdf'), key=lambda p: p.name)
+    
+    if not pdf_files:
+        raise ValueError(f"No PDF files found in {directory}")
+    
+    return pdf_files
 
 
 def load_pdfs(directory):
@@ -44,10 +121,7 @@ def load_pdfs(directory):
     """
     print(f"📂 Loading PDFs from: {directory}")
     
-    pdf_files = list(Path(directory).glob('*.pdf'))
-    
-    if not pdf_files:
-        raise ValueError(f"No PDF files found in {directory}")
+    pdf_files = _list_pdfs(directory)
     
     print(f"   Found {len(pdf_files)} PDF files")
     
@@ -56,13 +130,7 @@ def load_pdfs(directory):
     for pdf_path in pdf_files:
         print(f"   Loading: {pdf_path.name}")
         try:
-            loader = PyPDFLoader(str(pdf_path))
-            documents = loader.load()
-            
-            # Add metadata
-            for doc in documents:
-                doc.metadata['source'] = pdf_path.name
-            
+            documents = _load_pdf(pdf_path)
             all_documents.extend(documents)
             print(f"      ✓ {len(documents)} pages loaded")
             
@@ -88,20 +156,232 @@ def chunk_documents(documents, chunk_size=1000, chunk_overlap=200):
     """
     print(f"\n📝 Chunking documents (size={chunk_size}, overlap={chunk_overlap})")
     
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    
+    text_splitter = _make_text_splitter(chunk_size, chunk_overlap)
     chunks = text_splitter.split_documents(documents)
     
     print(f"✓ Created {len(chunks)} chunks")
     return chunks
 
 
-def create_faiss_index(chunks, embedding_model, index_path):
+def _process_pdf(pdf_path, chunk_size, chunk_overlap):
+    """
+    Worker task: parse and chunk one PDF
+    
+    Errors are returned rather than raised so one bad file
+    cannot abort the whole run.
+    """
+    start = time.time()
+    try:
+        pages = _load_pdf(pdf_path)
+        chunks = _make_text_splitter(chunk_size, chunk_overlap).split_documents(pages)
+        return {'file': pdf_path.name, 'pages': len(pages), 'chunks': chunks,
+                'error': None, 'seconds': time.time() - start}
+    except Exception as e:
+        return {'file': pdf_path.name, 'pages': 0, 'chunks': [],
+                'error': str(e), 'seconds': time.time() - start}
+
+
+def load_and_chunk_pdfs(directory, chunk_size=1000, chunk_overlap=200, workers=INGEST_WORKERS, pdf_files=None):
+    """
+    Parse and chunk every PDF in a directory on a process pool
+    
+    Args:
+        directory (str): Path to PDF directory
+        chunk_size (int): Target size of each chunk
+        chunk_overlap (int): Overlap between chunks
+        workers (int): Number of worker processes (1 = run in-process)
+        pdf_files (list): Optional subset of PDF paths to process
+    
+    Returns:
+        tuple: (chunks, stats) where chunks are in file-name order and
+               stats holds page/chunk counts, failures and throughput
+    """
+    if pdf_files is None:
+        pdf_files = _list_pdfs(directory)
+    workers = max(1, min(workers, len(pdf_files)))
+    
+    print(f"📂 Loading PDFs from: {directory}")
+    print(f"   Found {len(pdf_files)} PDF files, using {workers} worker(s)")
+    print(f"   Chunking (size={chunk_size}, overlap={chunk_overlap})")
+    
+    start = time.time()
+    results = []
+    
+    if workers == 1:
+        results = [_process_pdf(pdf_path, chunk_size, chunk_overlap) for pdf_path in pdf_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_process_pdf, pdf_path, chunk_size, chunk_overlap)
+                for pdf_path in pdf_files
+            ]
+            # Collect in submission order for deterministic output
+            for pdf_path, future in zip(pdf_files, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # e.g. a worker process died while parsing this file
+                    results.append({'file': pdf_path.name, 'pages': 0, 'chunks': [],
+                                    'error': str(e), 'seconds': 0.0})
+    
+    elapsed = time.time() - start
+    
+    all_chunks = []
+    failed = []
+    for result in results:
+        if result['error']:
+            print(f"   ❌ Error loading {result['file']}: {result['error']}")
+            failed.append(result['file'])
+            continue
+        print(f"   ✓ {result['file']}: {result['pages']} pages, {len(result['chunks'])} chunks")
+        all_chunks.extend(result['chunks'])
+    
+    total_pages = sum(r['pages'] for r in results)
+    stats = {
+        'files': len(pdf_files),
+        'pages_by_file': {r['file']: r['pages'] for r in results if not r['error']},
+        'failed_files': failed,
+        'pages': total_pages,
+        'chunks': len(all_chunks),
+        'workers': workers,
+        'seconds': elapsed,
+        'pages_per_second': total_pages / elapsed if elapsed > 0 else 0.0,
+        'chunks_per_second': len(all_chunks) / elapsed if elapsed > 0 else 0.0
+    }
+    
+    print(f"\n✓ Parsed {total_pages} pages into {len(all_chunks)} chunks in {elapsed:.1f}s "
+          f"({stats['pages_per_second']:.1f} pages/s, {stats['chunks_per_second']:.1f} chunks/s)")
+    if failed:
+        print(f"   ⚠️ {len(failed)} file(s) failed: {', '.join(failed)}")
+    
+    return all_chunks, stats
+
+
+def _load_embeddings(embedding_model, batch_size=EMBED_BATCH_SIZE):
+    embeddings = HuggingFaceEmbeddings(
+        model_name=embedding_model,
+        model_kwargs={'device': 'cpu'},  # No GPU required
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': batch_size}
+    )
+    # Chunks that were embedded before (unchanged text) are served from disk
+    return with_embedding_cache(embeddings, embedding_model, normalize=True)
+
+
+def configure_torch_threads(threads):
+    """
+    Sets the intra-op thread count used by CPU embedding (0 keeps the default)
+    """
+    if threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        print(f"   Torch threads: {threads}")
+    except ImportError:
+        print("   ⚠️ torch not available; ignoring --threads")
+
+
+def _token_lengths(texts, embeddings):
+    """
+    Token count per text using the embedding model's tokenizer
+    (falls back to character length)
+    """
+    base = getattr(embeddings, 'embeddings', embeddings)  # unwrap CachedEmbeddings
+    tokenizer = getattr(getattr(base, 'client', None), 'tokenizer', None)
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    
+    lengths = []
+    for start in range(0, len(texts), 1024):
+        encoded = tokenizer(texts[start:start + 1024], add_special_tokens=False, truncation=False)
+        lengths.extend(len(ids) for ids in encoded['input_ids'])
+    return lengths
+
+
+def embed_in_batches(chunks, embeddings, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embeds chunks in batches of similar token length
+    
+    Grouping by length keeps padding (wasted compute) per batch low.
+    
+    Yields:
+        tuple: (chunk_indices, vectors) for each batch
+    """
+    texts = [chunk.page_content for chunk in chunks]
+    lengths = _token_lengths(texts, embeddings)
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        vectors = embeddings.embed_documents([texts[i] for i in indices])
+        yield indices, vectors
+
+
+def add_chunks_to_index(chunks, embeddings, ids, vectorstore=None, batch_size=EMBED_BATCH_SIZE):
+    """
+    Streams batched embeddings into a FAISS store (created from the first
+    batch if vectorstore is None), so vectors are never all held in memory
+    
+    Returns:
+        tuple: (vectorstore, stats) with chunk count, seconds and chunks/s
+    """
+    start = time.time()
+    done = 0
+    report_every = max(1, 1000 // batch_size)
+    
+    for batch_num, (indices, vectors) in enumerate(embed_in_batches(chunks, embeddings, batch_size), 1):
+        text_embeddings = [(chunks[i].page_content, vector) for i, vector in zip(indices, vectors)]
+        metadatas = [chunks[i].metadata for i in indices]
+        batch_ids = [ids[i] for i in indices]
+        
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=batch_ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+        
+        done += len(indices)
+        if batch_num % report_every == 0 or done == len(chunks):
+            elapsed = time.time() - start
+            print(f"   {done}/{len(chunks)} chunks embedded ({done / elapsed if elapsed > 0 else 0:.1f} chunks/s)")
+    
+    elapsed = time.time() - start
+    stats = {'chunks': done, 'seconds': elapsed, 'chunks_per_second': done / elapsed if elapsed > 0 else 0.0}
+    return vectorstore, stats
+
+
+def _create_trained_vectorstore(chunks, embeddings, index_type):
+    """
+    Empty FAISS store around a trained ANN index
+    
+    The training sample is embedded through the embedding cache, so those
+    chunks are not embedded a second time when the corpus is added.
+    """
+    rng = random.Random(0)
+    sample = rng.sample(chunks, min(len(chunks), FAISS_TRAIN_SAMPLE))
+    train_vectors = np.array(embeddings.embed_documents([chunk.page_content for chunk in sample]), dtype=np.float32)
+    
+    index = build_trained_index(index_type, train_vectors, len(chunks))
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+
+
+def save_index(vectorstore, index_path):
+    """
+    Saves the FAISS store and rebuilds the BM25 postings over the same rows
+    """
+    save_vector_store(vectorstore, index_path)
+    texts = (vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+             for i in range(vectorstore.index.ntotal))
+    sparse_stats = build_sparse_index(texts, index_path)
+    print(f"   ✓ BM25 index: {sparse_stats['num_terms']} terms, {sparse_stats['num_postings']} postings")
+
+
+def create_faiss_index(chunks, embedding_model, index_path, ids=None, batch_size=EMBED_BATCH_SIZE,
+                       index_type=FAISS_INDEX_TYPE):
     """
     Create FAISS vector store from document chunks
     
@@ -109,54 +389,294 @@ def create_faiss_index(chunks, embedding_model, index_path):
         chunks (list): List of Document chunks
         embedding_model (str): Name of HuggingFace embedding model
         index_path (str): Path to save the FAISS index
+        ids (list): Optional vector ids, one per chunk
+        batch_size (int): Chunks per embedding batch
+        index_type (str): flat, ivf_flat, ivf_pq or hnsw
+
+    Raises:
+        ValueError: If there are no chunks (FAISS cannot build an empty store)
     """
-    print(f"\n🧠 Creating embeddings with model: {embedding_model}")
+    if not chunks:
+        raise ValueError(f"No chunks to index: no PDF in {PDF_DIR} produced any text")
+
+    print(f"\n🧠 Creating embeddings with model: {embedding_model} (batch size {batch_size})")
     print("   This may take several minutes...")
     
     # Initialize embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name=embedding_model,
-        model_kwargs={'device': 'cpu'},  # No GPU required
-        encode_kwargs={'normalize_embeddings': True}
-    )
+    embeddings = _load_embeddings(embedding_model, batch_size)
+    
+    # Create FAISS index, streaming batches in as they are embedded
+    index_type = resolve_index_type(index_type, len(chunks))
+    print(f"   Building FAISS index ({index_type})...")
+    vectorstore = None
+    if index_type != 'flat':
+        vectorstore = _create_trained_vectorstore(chunks, embeddings, index_type)
     
-    # Create FAISS index
-    print("   Building FAISS index...")
-    vectorstore = FAISS.from_documents(chunks, embeddings)
+    ids = ids or [str(i) for i in range(len(chunks))]
+    vectorstore, embed_stats = add_chunks_to_index(chunks, embeddings, ids, vectorstore, batch_size)
+    print(f"✓ Embedded {embed_stats['chunks']} chunks in {embed_stats['seconds']:.1f}s "
+          f"({embed_stats['chunks_per_second']:.1f} chunks/s)")
     
     # Save to disk
     print(f"💾 Saving index to: {index_path}")
     Path(index_path).parent.mkdir(parents=True, exist_ok=True)
-    vectorstore.save_local(index_path)
+    save_index(vectorstore, index_path)
     
     print("✓ FAISS index created and saved successfully!")
     return vectorstore
 
 
-def main():
+def clear_index(index_path):
+    """
+    Removes the index, its BM25 postings and the manifest (nothing left to serve)
+    """
+    print(f"🗑️  No chunks left; clearing index at: {index_path}")
+    shutil.rmtree(index_path, ignore_errors=True)
+
+
+def file_sha256(path):
+    """
+    Content hash of a file (streamed, so large PDFs are not read into memory)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk_ids(name, file_hash, count):
+    # Stable per-file, per-content ids: unchanged files keep their vectors across runs
+    prefix = hashlib.sha256(f"{name}\0{file_hash}".encode('utf-8')).hexdigest()[:16]
+    return [f"{prefix}-{i:05d}" for i in range(count)]
+
+
+def _group_chunks_by_file(chunks):
+    grouped = {}
+    for chunk in chunks:
+        grouped.setdefault(chunk.metadata['source'], []).append(chunk)
+    return grouped
+
+
+def load_manifest(index_path):
+    """
+    Returns the ingestion manifest stored next to the index, or None
+    """
+    manifest_path = Path(index_path) / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(index_path, files, index_type):
+    """
+    Writes the manifest (per-PDF hash, chunk count and vector ids)
+
+    Args:
+        index_type (str): Type of the index actually built, which is 'flat'
+            when the corpus was too small to train FAISS_INDEX_TYPE
+    """
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'embedding_model': EMBEDDING_MODEL,
+        'requested_index_type': FAISS_INDEX_TYPE,
+        'index_type': index_type,
+        'chunk_size': CHUNK_SIZE,
+        'chunk_overlap': CHUNK_OVERLAP,
+        'files': files
+    }
+    manifest_path = Path(index_path) / MANIFEST_FILENAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _manifest_entries(names, chunks_by_file, hashes, pages_by_file):
+    # Every parsed file gets an entry, including ones that produced no
+    # chunks (scanned or empty), so they are not re-parsed as "new" on every
+    # incremental run. Files that failed to load (pages_by_file has no entry
+    # for them) are left out, so the next run retries them
+    files = {}
+    for name in names:
+        if name not in pages_by_file:
+            continue
+        file_chunks = chunks_by_file.get(name, [])
+        files[name] = {
+            'sha256': hashes[name],
+            'pages': pages_by_file.get(name, 0),
+            'chunks': len(file_chunks),
+            'vector_ids': _chunk_ids(name, hashes[name], len(file_chunks))
+        }
+    return files
+
+
+def _manifest_is_compatible(manifest):
+    return (
+        manifest is not None
+        and (Path(FAISS_INDEX_PATH) / 'index.faiss').exists()
+        and manifest.get('version') == MANIFEST_VERSION
+        and manifest.get('embedding_model') == EMBEDDING_MODEL
+        # Older manifests only recorded the requested type, as 'index_type'
+        and manifest.get('requested_index_type', manifest.get('index_type', 'flat')) == FAISS_INDEX_TYPE
+        and manifest.get('chunk_size') == CHUNK_SIZE
+        and manifest.get('chunk_overlap') == CHUNK_OVERLAP
+    )
+
+
+def _empty_stats():
+    return {'files': 0, 'pages_by_file': {}, 'failed_files': [], 'pages': 0, 'chunks': 0,
+            'workers': 0, 'seconds': 0.0, 'pages_per_second': 0.0, 'chunks_per_second': 0.0}
+
+
+def build_full_index(pdf_files, hashes, workers, batch_size=EMBED_BATCH_SIZE):
+    """
+    Rebuilds the whole index and manifest from every PDF
+    
+    Returns:
+        tuple: (chunks, stats)
+    """
+    chunks, stats = load_and_chunk_pdfs(PDF_DIR, CHUNK_SIZE, CHUNK_OVERLAP, workers, pdf_files)
+    
+    chunks_by_file = _group_chunks_by_file(chunks)
+    ids = [vid for name, file_chunks in chunks_by_file.items()
+           for vid in _chunk_ids(name, hashes[name], len(file_chunks))]
+    ordered_chunks = [chunk for file_chunks in chunks_by_file.values() for chunk in file_chunks]
+    
+    vectorstore = create_faiss_index(ordered_chunks, EMBEDDING_MODEL, FAISS_INDEX_PATH, ids=ids, batch_size=batch_size)
+    save_manifest(FAISS_INDEX_PATH,
+                  _manifest_entries([p.name for p in pdf_files], chunks_by_file, hashes, stats['pages_by_file']),
+                  index_type_of(vectorstore.index))
+    return ordered_chunks, stats
+
+
+def update_index_incrementally(pdf_files, hashes, manifest, workers, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embeds only new/changed PDFs and removes vectors of changed/deleted ones
+    
+    Returns:
+        tuple: (new_chunks, stats)
+    """
+    known = manifest['files']
+    current = {pdf_path.name for pdf_path in pdf_files}
+    
+    added = [p for p in pdf_files if p.name not in known]
+    changed = [p for p in pdf_files if p.name in known and known[p.name]['sha256'] != hashes[p.name]]
+    deleted = sorted(name for name in known if name not in current)
+    
+    print(f"🔁 Incremental update: {len(added)} new, {len(changed)} changed, "
+          f"{len(deleted)} deleted, {len(current) - len(added) - len(changed)} unchanged")
+    
+    files = {name: entry for name, entry in known.items() if name in current}
+    
+    if not added and not changed and not deleted:
+        print("✓ Index is up to date")
+        return [], _empty_stats()
+    
+    embeddings = _load_embeddings(EMBEDDING_MODEL, batch_size)
+    vectorstore = load_vector_store(FAISS_INDEX_PATH, embeddings)
+    
+    stale_ids = [vid for name in deleted for vid in known[name]['vector_ids']]
+    stale_ids += [vid for p in changed for vid in known[p.name]['vector_ids']]
+    for pdf_path in changed:
+        del files[pdf_path.name]
+    
+    # Parse and chunk new/changed files
+    new_chunks, new_ids, stats = [], [], _empty_stats()
+    to_process = added + changed
+    if to_process:
+        new_chunks, stats = load_and_chunk_pdfs(PDF_DIR, CHUNK_SIZE, CHUNK_OVERLAP, workers,
+                                                sorted(to_process, key=lambda p: p.name))
+        chunks_by_file = _group_chunks_by_file(new_chunks)
+        new_ids = [vid for name, file_chunks in chunks_by_file.items()
+                   for vid in _chunk_ids(name, hashes[name], len(file_chunks))]
+        new_chunks = [chunk for file_chunks in chunks_by_file.values() for chunk in file_chunks]
+        files.update(_manifest_entries([p.name for p in to_process], chunks_by_file, hashes, stats['pages_by_file']))
+    
+    stale = set(stale_ids)
+    kept_ids = [vid for vid in vectorstore.index_to_docstore_id.values() if vid not in stale]
+    if not kept_ids and not new_chunks:
+        # Every indexed file was deleted or no longer yields text
+        clear_index(FAISS_INDEX_PATH)
+        return [], stats
+    
+    if stale_ids and not supports_removal(vectorstore.index):
+        # ANN indexes cannot drop vectors in place: rebuild from the surviving
+        # chunks (served from the embedding cache) plus the new ones
+        print(f"🗑️  Rebuilding '{index_type_of(vectorstore.index)}' index without {len(stale_ids)} stale vectors")
+        kept_chunks = [vectorstore.docstore.search(vid) for vid in kept_ids]
+        vectorstore = create_faiss_index(kept_chunks + new_chunks, EMBEDDING_MODEL, FAISS_INDEX_PATH,
+                                         ids=kept_ids + new_ids, batch_size=batch_size)
+    else:
+        # Remove vectors of changed and deleted files
+        if stale_ids:
+            print(f"🗑️  Removing {len(stale_ids)} stale vectors")
+            vectorstore.delete(stale_ids)
+        
+        # Embed and add new/changed files
+        if new_chunks:
+            print(f"\n🧠 Embedding {len(new_chunks)} new chunks...")
+            vectorstore, _ = add_chunks_to_index(new_chunks, embeddings, new_ids, vectorstore, batch_size)
+        
+        print(f"💾 Saving index to: {FAISS_INDEX_PATH}")
+        save_index(vectorstore, FAISS_INDEX_PATH)
+    
+    save_manifest(FAISS_INDEX_PATH, dict(sorted(files.items())), index_type_of(vectorstore.index))
+    return new_chunks, stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the FAISS index from the PDF corpus")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS,
+                        help=f"Worker processes for PDF parsing/chunking (default: {INGEST_WORKERS})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only embed new/changed PDFs and drop vectors of changed/deleted ones")
+    parser.add_argument('--batch-size', type=int, default=EMBED_BATCH_SIZE,
+                        help=f"Chunks per embedding batch (default: {EMBED_BATCH_SIZE})")
+    parser.add_argument('--threads', type=int, default=EMBED_THREADS,
+                        help="Torch threads for CPU embedding (default: torch's own choice)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Main ingestion pipeline
     """
+    args = parse_args(argv)
+    
     print("="*60)
     print("PDF INGESTION & FAISS INDEX CREATION")
     print("="*60)
     
     try:
-        # Step 1: Load PDFs
-        documents = load_pdfs(PDF_DIR)
+        configure_torch_threads(args.threads)
+        
+        pdf_files = _list_pdfs(PDF_DIR)
+        hashes = {pdf_path.name: file_sha256(pdf_path) for pdf_path in pdf_files}
         
-        # Step 2: Chunk documents
-        chunks = chunk_documents(documents, CHUNK_SIZE, CHUNK_OVERLAP)
+        manifest = load_manifest(FAISS_INDEX_PATH) if args.incremental else None
+        if args.incremental and not _manifest_is_compatible(manifest):
+            print("⚠️ No compatible manifest (first run, or model/chunking changed). Doing a full rebuild.")
         
-        # Step 3: Create FAISS index
-        vectorstore = create_faiss_index(chunks, EMBEDDING_MODEL, FAISS_INDEX_PATH)
+        # Steps 1-3: Load and chunk PDFs (in parallel), embed, build/update FAISS index
+        start = time.time()
+        if _manifest_is_compatible(manifest):
+            chunks, stats = update_index_incrementally(pdf_files, hashes, manifest, args.workers, args.batch_size)
+        else:
+            chunks, stats = build_full_index(pdf_files, hashes, args.workers, args.batch_size)
+        embed_elapsed = time.time() - start - stats['seconds']
         
         # Summary
         print("\n" + "="*60)
         print("INGESTION COMPLETE!")
         print("="*60)
-        print(f"✓ Processed PDFs: {len(documents)} pages")
-        print(f"✓ Total chunks: {len(chunks)}")
+        print(f"✓ Processed PDFs: {stats['files'] - len(stats['failed_files'])}/{stats['files']} ({stats['pages']} pages)")
+        print(f"✓ Chunks embedded: {len(chunks)}")
+        print(f"✓ Parse + chunk: {stats['seconds']:.1f}s with {stats['workers']} worker(s) "
+              f"({stats['pages_per_second']:.1f} pages/s, {stats['chunks_per_second']:.1f} chunks/s)")
+        if chunks and embed_elapsed > 0:
+            print(f"✓ Embed + index: {embed_elapsed:.1f}s ({len(chunks) / embed_elapsed:.1f} chunks/s)")
         print(f"✓ Index saved to: {FAISS_INDEX_PATH}")
         print("\nYou can now start the Flask server:")
         print("  python app.py")
@@ -0,0 +1,351 @@
+"""
+Paper Generation Jobs
+
+Runs RAGPipeline.generate_full_paper in a local worker pool so that
+HTTP workers can return immediately and clients poll for progress.
+
+Job state lives in a pluggable store:
+- SQLiteJobStore (default): persisted, shared by all gunicorn workers
+- MemoryJobStore: in-process only, for development and tests
+
+Each job manager heartbeats the jobs it owns (queued or running). Jobs
+whose heartbeat stops, because their process restarted or crashed, are
+marked failed instead of staying in progress forever.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from .rag_pipeline import PAPER_SECTIONS
+
+# Load environment
+load_dotenv()
+
+# Configuration
+JOB_STORE = os.getenv('JOB_STORE', 'sqlite')
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', './data/jobs.sqlite3')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', 30))    # Seconds
+JOB_ORPHAN_TIMEOUT = float(os.getenv('JOB_ORPHAN_TIMEOUT', 120))          # No heartbeat for this long: failed
+
+ORPHANED_JOB_ERROR = "Interrupted by restart"
+
+JOB_SECTIONS = ['Title and Author'] + PAPER_SECTIONS
+
+
+def _new_progress():
+    return {
+        'completed': 0,
+        'total': len(JOB_SECTIONS),
+        'sections': {section: {'status': 'pending'} for section in JOB_SECTIONS}
+    }
+
+
+class JobStore(ABC):
+    """
+    Interface for job persistence
+
+    A job is a dict with: job_id, status (queued/running/completed/failed),
+    created_at, started_at, finished_at, progress, result, error.
+    """
+
+    @abstractmethod
+    def create(self, questionnaire):
+        ...
+
+    @abstractmethod
+    def mark_running(self, job_id):
+        ...
+
+    @abstractmethod
+    def mark_section(self, job_id, section, elapsed_ms):
+        ...
+
+    @abstractmethod
+    def mark_finished(self, job_id, result=None, error=None):
+        ...
+
+    @abstractmethod
+    def get(self, job_id):
+        ...
+
+    def heartbeat(self, job_ids):
+        """
+        Records that the given unfinished jobs are still owned by a live process
+        (only needed by stores that outlive the process)
+        """
+
+    def fail_orphaned(self, timeout=JOB_ORPHAN_TIMEOUT):
+        """
+        Marks queued/running jobs without a heartbeat for timeout seconds as failed
+
+        Returns:
+            int: Number of jobs marked failed
+        """
+        return 0
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-process job store (not shared between gunicorn workers)
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, questionnaire):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'progress': _new_progress(),
+                'result': None,
+                'error': None
+            }
+        return job_id
+
+    def mark_running(self, job_id):
+        with self._lock:
+            self._jobs[job_id]['status'] = 'running'
+            self._jobs[job_id]['started_at'] = time.time()
+
+    def mark_section(self, job_id, section, elapsed_ms):
+        with self._lock:
+            progress = self._jobs[job_id]['progress']
+            progress['sections'][section] = {'status': 'completed', 'elapsed_ms': elapsed_ms}
+            progress['completed'] = sum(1 for s in progress['sections'].values() if s['status'] == 'completed')
+
+    def mark_finished(self, job_id, result=None, error=None):
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'failed' if error else 'completed'
+            job['finished_at'] = time.time()
+            job['result'] = result
+            job['error'] = error
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed job store
+
+    Finished papers are persisted, and the database file can be shared by
+    several worker processes on the same host (WAL mode).
+    """
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Serializes read-modify-write of progress within this process
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    questionnaire TEXT,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    heartbeat_at REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'heartbeat_at' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create(self, questionnaire):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, created_at, questionnaire, progress, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, 'queued', now, json.dumps(questionnaire), json.dumps(_new_progress()), now)
+            )
+        return job_id
+
+    def mark_running(self, job_id):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+                (time.time(), job_id)
+            )
+
+    def mark_section(self, job_id, section, elapsed_ms):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT progress FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                return
+            progress = json.loads(row[0])
+            progress['sections'][section] = {'status': 'completed', 'elapsed_ms': elapsed_ms}
+            progress['completed'] = sum(1 for s in progress['sections'].values() if s['status'] == 'completed')
+            conn.execute("UPDATE jobs SET progress = ? WHERE job_id = ?", (json.dumps(progress), job_id))
+
+    def mark_finished(self, job_id, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE job_id = ?",
+                ('failed' if error else 'completed', time.time(),
+                 json.dumps(result) if result is not None else None, error, job_id)
+            )
+
+    def heartbeat(self, job_ids):
+        if not job_ids:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND status IN ('queued', 'running')",
+                [(now, job_id) for job_id in job_ids]
+            )
+
+    def fail_orphaned(self, timeout=JOB_ORPHAN_TIMEOUT):
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE status IN ('queued', 'running') "
+                "AND COALESCE(heartbeat_at, started_at, created_at) < ?",
+                (now, ORPHANED_JOB_ERROR, now - timeout)
+            ).rowcount
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id, status, created_at, started_at, finished_at, progress, result, error "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'job_id': row[0],
+            'status': row[1],
+            'created_at': row[2],
+            'started_at': row[3],
+            'finished_at': row[4],
+            'progress': json.loads(row[5]) if row[5] else _new_progress(),
+            'result': json.loads(row[6]) if row[6] else None,
+            'error': row[7]
+        }
+
+
+class JobManager:
+    """
+    Runs paper generation jobs on a bounded local worker pool
+    """
+
+    def __init__(self, pipeline, store=None, max_workers=JOB_WORKERS):
+        self.pipeline = pipeline
+        self.store = store or create_job_store()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='paper-job')
+        # Unfinished jobs owned by this process (heartbeated until they finish)
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+        orphaned = self.store.fail_orphaned()
+        if orphaned:
+            print(f"⚠️ Marked {orphaned} interrupted job(s) as failed")
+        threading.Thread(target=self._heartbeat_loop, name='paper-job-heartbeat', daemon=True).start()
+        print(f"🗂️  Job manager ready: {type(self.store).__name__} ({max_workers} workers)")
+
+    def _heartbeat_loop(self):
+        """
+        Keeps this process's jobs alive and fails jobs orphaned by other
+        processes (e.g. a gunicorn worker that crashed mid-paper)
+        """
+        while True:
+            time.sleep(JOB_HEARTBEAT_INTERVAL)
+            try:
+                with self._active_lock:
+                    active = list(self._active)
+                self.store.heartbeat(active)
+                orphaned = self.store.fail_orphaned()
+                if orphaned:
+                    print(f"⚠️ Marked {orphaned} orphaned job(s) as failed")
+            except Exception as e:
+                print(f"⚠️ Job heartbeat failed: {e}")
+
+    def submit(self, questionnaire):
+        """
+        Queues a paper generation job
+
+        Returns:
+            str: Job id
+        """
+        job_id = self.store.create(questionnaire)
+        with self._active_lock:
+            self._active.add(job_id)
+        self.executor.submit(self._run, job_id, questionnaire)
+        print(f"📨 Queued job {job_id} for: {questionnaire.get('research_topic')}")
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _run(self, job_id, questionnaire):
+        self.store.mark_running(job_id)
+
+        def on_section(section, content, elapsed_ms):
+            self.store.mark_section(job_id, section, elapsed_ms)
+
+        try:
+            result = self.pipeline.generate_full_paper(questionnaire, on_section=on_section)
+            self.store.mark_finished(job_id, result=result)
+            print(f"✓ Job {job_id} completed")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            self.store.mark_finished(job_id, error=str(e))
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+
+def create_job_store(kind=JOB_STORE):
+    """
+    Builds the configured job store ('sqlite' or 'memory')
+    """
+    if kind == 'memory':
+        return MemoryJobStore()
+    if kind == 'sqlite':
+        return SQLiteJobStore()
+    raise ValueError(f"Unsupported job store: {kind}")
+
+
+# Singleton instance
+_job_manager_instance = None
+
+def get_job_manager(pipeline):
+    """
+    Returns a singleton instance of the job manager
+    """
+    global _job_manager_instance
+    if _job_manager_instance is None:
+        _job_manager_instance = JobManager(pipeline)
+    return _job_manager_instance
@@ -2,95 +2,431 @@
 Cloud LLM Client Abstraction
 
 Provides a unified interface for different cloud LLM providers.
-Supports: Groq, Together AI, Fireworks AI, and OpenAI.
+Supports: Groq, Together AI, Fireworks AI, and OpenAI, plus a local
+mock server (mock_llm_server.py) for offline benchmarks.
 
 All providers use OpenAI-compatible API format for LLaMA 3.
+
+Responses are cached by content hash of the request (in-memory LRU
+in front of an on-disk SQLite tier), so identical prompts are only
+paid for once.
 """
 
 import os
-from openai import OpenAI
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+import openai
+from openai import OpenAI, AsyncOpenAI
+
+from .http_transport import get_httpx_client, get_async_httpx_client, get_llm_timeout
+from .context_packer import count_tokens
+from .rate_limiter import get_rate_limiter
+
+# Providers (all OpenAI-compatible); base_url None = default OpenAI endpoint
+PROVIDER_CONFIGS = {
+    'groq': {'api_key_env': 'GROQ_API_KEY', 'base_url': 'https://api.groq.com/openai/v1'},
+    'together': {'api_key_env': 'TOGETHER_API_KEY', 'base_url': 'https://api.together.xyz/v1'},
+    'fireworks': {'api_key_env': 'FIREWORKS_API_KEY', 'base_url': 'https://api.fireworks.ai/inference/v1'},
+    'openai': {'api_key_env': 'OPENAI_API_KEY', 'base_url': None},
+    'fastrouter': {'api_key_env': 'FASTROUTER_API_KEY', 'base_url': 'https://go.fastrouter.ai/api/v1'},
+    # Local stand-in (python mock_llm_server.py); no API key needed
+    'mock': {'api_key_env': 'MOCK_LLM_API_KEY', 'base_url': os.getenv('MOCK_LLM_URL', 'http://127.0.0.1:8089/v1'),
+             'default_api_key': 'mock'}
+}
+
+# Default models for each provider (LLaMA 3 8B)
+DEFAULT_MODELS = {
+    'groq': 'llama-3.1-8b-instant',
+    'together': 'meta-llama/Llama-3-8b-chat-hf',
+    'fireworks': 'accounts/fireworks/models/llama-v3-8b-instruct',
+    'openai': 'gpt-3.5-turbo',
+    'fastrouter': 'meta-llama/llama-3.1-8b-instant',
+    'mock': 'mock-llama-3-8b'
+}
+
+# Response cache configuration
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', './data/llm_cache.sqlite3')
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))
+LLM_CACHE_MAX_MB = float(os.getenv('LLM_CACHE_MAX_MB', 100))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 256))
+# Failover/retry/hedging across LLM_PROVIDERS (see core/llm_router.py)
+LLM_ROUTING_ENABLED = os.getenv('LLM_ROUTING_ENABLED', 'true').lower() == 'true'
+# Ask for a usage block at the end of streams (not every provider supports it)
+LLM_STREAM_USAGE = os.getenv('LLM_STREAM_USAGE', 'false').lower() == 'true'
+
 
-class CloudLLMClient:
+def extract_usage(usage):
     """
-    Abstraction layer for cloud LLM APIs
+    Normalizes a provider usage block, including prompt tokens served from
+    the provider's prompt cache
     
-    This class handles API key management and provides a consistent
-    interface regardless of the provider.
+    Returns:
+        dict: prompt_tokens, completion_tokens, total_tokens, cached_tokens
     """
+    if usage is None:
+        return empty_usage()
     
-    def __init__(self, provider=None):
+    cached_tokens = 0
+    details = getattr(usage, 'prompt_tokens_details', None)
+    if details is not None:
+        cached_tokens = getattr(details, 'cached_tokens', None) or 0
+    if not cached_tokens:
+        # Providers that report cache hits outside prompt_tokens_details
+        extra = getattr(usage, 'model_extra', None) or {}
+        cached_tokens = extra.get('prompt_cache_hit_tokens') or extra.get('cached_tokens') or 0
+    
+    return {
+        'prompt_tokens': usage.prompt_tokens or 0,
+        'completion_tokens': usage.completion_tokens or 0,
+        'total_tokens': usage.total_tokens or 0,
+        'cached_tokens': int(cached_tokens)
+    }
+
+
+def empty_usage():
+    return {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'cached_tokens': 0}
+
+
+class LLMProviderError(Exception):
+    """
+    A failed provider call
+    
+    retryable is True for rate limits (429), server errors (5xx), timeouts
+    and connection errors; retry_after is the provider's Retry-After hint
+    in seconds, if any.
+    """
+    
+    def __init__(self, message, provider, status_code=None, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def _provider_error(provider, action, error):
+    status_code = getattr(error, 'status_code', None)
+    retryable = (
+        isinstance(error, (openai.APITimeoutError, openai.APIConnectionError))
+        or status_code == 429
+        or (status_code is not None and status_code >= 500)
+    )
+    retry_after = None
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    return LLMProviderError(f"Failed to {action} from {provider}: {str(error)}", provider,
+                            status_code=status_code, retryable=retryable, retry_after=retry_after)
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses
+    
+    Two tiers:
+    - Memory: LRU of the most recent entries
+    - Disk: SQLite table with TTL and size-based (least recently used) eviction
+    
+    Safe to share between threads; the disk tier can also be shared
+    between processes.
+    """
+    
+    def __init__(self, db_path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL,
+                 max_mb=LLM_CACHE_MAX_MB, memory_entries=LLM_CACHE_MEMORY_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.memory_entries = memory_entries
+        
+        self._memory = OrderedDict()  # key -> (text, expires_at)
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt, max_tokens, temperature):
+        """
+        Hash of everything that determines the response
+        """
+        payload = json.dumps([model, system_prompt, user_prompt, max_tokens, temperature])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """
+        Returns the cached response text, or None on a miss
+        """
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+        
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] + self.ttl > now:
+                    conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                else:
+                    row = None
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache read failed: {e}")
+            row = None
+        
+        with self._lock:
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, row[0], row[1] + self.ttl)
+        return row[0]
+    
+    def set(self, key, text):
+        """
+        Stores a response in both tiers and evicts from disk if over budget
+        """
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        
+        with self._lock:
+            self._remember(key, text, now + self.ttl)
+            self._counters['writes'] += 1
+        
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, text, size, now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache write failed: {e}")
+    
+    def _remember(self, key, text, expires_at):
+        # Caller holds self._lock
+        self._memory[key] = (text, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _evict(self, conn, now):
+        evicted = conn.execute("DELETE FROM responses WHERE created_at + ? <= ?", (self.ttl, now)).rowcount
+        
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop least recently used entries until under budget
+            for key, size in conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        
+        if evicted:
+            with self._lock:
+                self._counters['evictions'] += evicted
+    
+    def stats(self):
+        """
+        Hit/miss counters and tier sizes
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        try:
+            with self._connect() as conn:
+                count, total = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            stats['disk_entries'] = count
+            stats['disk_bytes'] = total
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+# Singleton cache (shared by every client in the process)
+_response_cache_instance = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Returns the shared response cache, or None if caching is disabled
+    """
+    global _response_cache_instance
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache_instance is None:
+            _response_cache_instance = ResponseCache()
+    return _response_cache_instance
+
+
+class _LLMClientBase:
+    """
+    Provider setup shared by CloudLLMClient and AsyncCloudLLMClient
+    (API key, base URL, model name, response cache and rate limits)
+    """
+    
+    def __init__(self, provider=None, model_name=None, max_retries=None):
         """
         Initialize the LLM client
         
         Args:
-            provider (str): One of 'groq', 'together', 'fireworks', 'openai'
+            provider (str): One of PROVIDER_CONFIGS ('groq', 'together', 'fireworks', 'openai', 'fastrouter', 'mock')
+            model_name (str): Model override (defaults to <PROVIDER>_MODEL_NAME, MODEL_NAME, or the provider default)
+            max_retries (int): SDK-level retries (None = SDK default; the routing client uses 0)
         """
         self.provider = provider or os.getenv('LLM_PROVIDER', 'groq')
+        self.max_retries = max_retries
         self.client = self._initialize_client()
-        self.model_name = self._get_model_name()
+        self.model_name = model_name or self._get_model_name()
+        self.cache = get_response_cache()
+        self.rate_limiter = get_rate_limiter(self.provider)
         
         print(f"🤖 LLM Client initialized: {self.provider} ({self.model_name})")
     
-    def _initialize_client(self):
+    def _client_kwargs(self):
         """
-        Initialize the OpenAI-compatible client based on provider
+        Provider-specific OpenAI SDK arguments (API key, base URL, retries)
         """
-        provider_configs = {
-            'groq': {
-                'api_key': os.getenv('GROQ_API_KEY'),
-                'base_url': 'https://api.groq.com/openai/v1'
-            },
-            'together': {
-                'api_key': os.getenv('TOGETHER_API_KEY'),
-                'base_url': 'https://api.together.xyz/v1'
-            },
-            'fireworks': {
-                'api_key': os.getenv('FIREWORKS_API_KEY'),
-                'base_url': 'https://api.fireworks.ai/inference/v1'
-            },
-            'openai': {
-                'api_key': os.getenv('OPENAI_API_KEY'),
-                'base_url': None  # Uses default OpenAI endpoint
-            },
-            'fastrouter': {
-                'api_key': os.getenv('FASTROUTER_API_KEY'),
-                'base_url': 'https://go.fastrouter.ai/api/v1'
-            }
-        }
-        
-        if self.provider not in provider_configs:
+        if self.provider not in PROVIDER_CONFIGS:
             raise ValueError(f"Unsupported provider: {self.provider}")
         
-        config = provider_configs[self.provider]
+        config = PROVIDER_CONFIGS[self.provider]
+        api_key = os.getenv(config['api_key_env'], config.get('default_api_key'))
         
-        if not config['api_key']:
-            raise ValueError(f"API key not found for {self.provider}. Set {self.provider.upper()}_API_KEY in .env")
+        if not api_key:
+            raise ValueError(f"API key not found for {self.provider}. Set {config['api_key_env']} in .env")
         
-        # Initialize OpenAI client with provider-specific config
+        kwargs = {'api_key': api_key, 'timeout': get_llm_timeout()}
         if config['base_url']:
-            return OpenAI(api_key=config['api_key'], base_url=config['base_url'])
-        else:
-            return OpenAI(api_key=config['api_key'])
+            kwargs['base_url'] = config['base_url']
+        if self.max_retries is not None:
+            kwargs['max_retries'] = self.max_retries
+        return kwargs
     
     def _get_model_name(self):
         """
         Get the model identifier for the provider
         """
-        # Allow override from env variable
+        # Per-provider override (needed when several providers are routed)
+        provider_model = os.getenv(f'{self.provider.upper()}_MODEL_NAME')
+        if provider_model:
+            return provider_model
+        
+        # Allow override from env variable (applies to the primary provider)
         custom_model = os.getenv('MODEL_NAME')
-        if custom_model:
+        if custom_model and self.provider == os.getenv('LLM_PROVIDER', 'groq'):
             return custom_model
         
-        # Default models for each provider (LLaMA 3 8B)
-        default_models = {
-            'groq': 'llama-3.1-8b-instant',
-            'together': 'meta-llama/Llama-3-8b-chat-hf',
-            'fireworks': 'accounts/fireworks/models/llama-v3-8b-instruct',
-            'openai': 'gpt-3.5-turbo',
-            'fastrouter': 'meta-llama/llama-3.1-8b-instant'
+        return DEFAULT_MODELS.get(self.provider, 'llama3-8b-8192')
+    
+    def _estimate_tokens(self, system_prompt, user_prompt, max_tokens):
+        """
+        Tokens reserved up front for one call (prompt estimate + max_tokens)
+        """
+        return count_tokens(system_prompt) + count_tokens(user_prompt) + max_tokens
+    
+    @staticmethod
+    def _actual_tokens(estimated, max_tokens, usage, text):
+        """
+        Tokens a call used: the provider's usage, or a local count (prompt +
+        generated text) when there is none, e.g. a stream without a usage
+        block or a failed call
+        """
+        return (usage or {}).get('total_tokens') or (estimated - max_tokens) + count_tokens(text)
+    
+    def _completion_kwargs(self, system_prompt, user_prompt, max_tokens, temperature):
+        """
+        Builds the chat completion request shared by generate and generate_stream
+        """
+        return {
+            'model': self.model_name,
+            'messages': [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'top_p': 0.9,
+            'frequency_penalty': 0.0,
+            'presence_penalty': 0.0
         }
+
+
+class CloudLLMClient(_LLMClientBase):
+    """
+    Abstraction layer for cloud LLM APIs
+    
+    This class handles API key management and provides a consistent
+    interface regardless of the provider.
+    """
+    
+    def _initialize_client(self):
+        """
+        Initialize the OpenAI-compatible client based on provider
+        """
+        # All clients share one pooled keep-alive transport
+        return OpenAI(http_client=get_httpx_client(), **self._client_kwargs())
+    
+    def _rate_slot(self, system_prompt, user_prompt, max_tokens):
+        """
+        Rate-limit slot for one call (no-op without configured limits)
         
-        return default_models.get(self.provider, 'llama3-8b-8192')
+        Returns:
+            tuple: (context manager, estimated tokens reserved)
+        """
+        if not self.rate_limiter:
+            return nullcontext(), 0
+        estimated = self._estimate_tokens(system_prompt, user_prompt, max_tokens)
+        return self.rate_limiter.slot(estimated), estimated
+    
+    def _settle(self, estimated, max_tokens, usage, text):
+        """
+        Settles a rate-limit reservation (see _actual_tokens)
+        """
+        if self.rate_limiter:
+            self.rate_limiter.settle(estimated, self._actual_tokens(estimated, max_tokens, usage, text))
     
     def generate(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
         """
@@ -105,38 +441,124 @@ class CloudLLMClient:
         Returns:
             str: Generated text
         """
+        generated_text, _ = self.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+        return generated_text
+    
+    def generate_with_usage(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        """
+        Like generate(), but also returns the provider's token usage
+        
+        Returns:
+            tuple: (generated_text, usage) where usage has prompt_tokens,
+                   completion_tokens, total_tokens, cached_tokens (prompt
+                   tokens served from the provider's prompt cache) and
+                   response_cache_hit (answered from the local cache)
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model_name, system_prompt, user_prompt, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit ({self.provider})")
+                return cached, dict(empty_usage(), response_cache_hit=True)
+        
         try:
             print(f"🔄 Calling {self.provider} API...")
             print(f"   Model: {self.model_name}")
             print(f"   Max tokens: {max_tokens}")
             print(f"   Temperature: {temperature}")
             
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=0.9,
-                frequency_penalty=0.0,
-                presence_penalty=0.0
-            )
-            
-            generated_text = response.choices[0].message.content
+            slot, estimated = self._rate_slot(system_prompt, user_prompt, max_tokens)
+            usage, generated_text = None, None
+            try:
+                with slot:
+                    response = self.client.chat.completions.create(
+                        **self._completion_kwargs(system_prompt, user_prompt, max_tokens, temperature)
+                    )
+                generated_text = response.choices[0].message.content
+                usage = extract_usage(getattr(response, 'usage', None))
+            finally:
+                # Failed calls return their reservation too
+                self._settle(estimated, max_tokens, usage, generated_text)
             
             # Log usage statistics if available
-            if hasattr(response, 'usage'):
-                print(f"✓ Tokens used: {response.usage.total_tokens}")
-                print(f"   - Prompt: {response.usage.prompt_tokens}")
-                print(f"   - Completion: {response.usage.completion_tokens}")
+            if getattr(response, 'usage', None):
+                print(f"✓ Tokens used: {usage['total_tokens']}")
+                print(f"   - Prompt: {usage['prompt_tokens']} ({usage['cached_tokens']} cached)")
+                print(f"   - Completion: {usage['completion_tokens']}")
+            
+            if cache_key and generated_text:
+                self.cache.set(cache_key, generated_text)
+            
+            return generated_text, dict(usage, response_cache_hit=False)
+            
+        except Exception as e:
+            print(f"❌ LLM API Error: {str(e)}")
+            raise _provider_error(self.provider, "generate text", e) from e
+    
+    def generate_stream(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3, usage=None):
+        """
+        Generate text incrementally using the provider's stream=True mode
+        
+        Args:
+            Same as generate()
+            usage (dict): Optional dict updated with the token usage once the
+                stream ends (provider figures need LLM_STREAM_USAGE=true)
+        
+        Yields:
+            str: Text deltas as they arrive from the provider
+        """
+        if usage is not None:
+            usage.update(empty_usage(), response_cache_hit=False)
+        
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model_name, system_prompt, user_prompt, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit ({self.provider})")
+                if usage is not None:
+                    usage['response_cache_hit'] = True
+                yield cached
+                return
+        
+        try:
+            print(f"🔄 Streaming from {self.provider} API ({self.model_name})...")
             
-            return generated_text
+            extra = {'stream_options': {'include_usage': True}} if LLM_STREAM_USAGE else {}
+            stream_usage = {}
+            parts = []
+            slot, estimated = self._rate_slot(system_prompt, user_prompt, max_tokens)
+            try:
+                # The slot is held for the whole stream: it counts as in flight until it ends
+                with slot:
+                    stream = self.client.chat.completions.create(
+                        stream=True,
+                        **extra,
+                        **self._completion_kwargs(system_prompt, user_prompt, max_tokens, temperature)
+                    )
+                    for chunk in stream:
+                        if getattr(chunk, 'usage', None):
+                            stream_usage = extract_usage(chunk.usage)
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+            finally:
+                # Also on errors and abandoned streams
+                self._settle(estimated, max_tokens, stream_usage, "".join(parts))
+            
+            if usage is not None and stream_usage:
+                usage.update(stream_usage)
+            
+            if cache_key and parts:
+                self.cache.set(cache_key, "".join(parts))
             
         except Exception as e:
             print(f"❌ LLM API Error: {str(e)}")
-            raise Exception(f"Failed to generate text from {self.provider}: {str(e)}")
+            raise _provider_error(self.provider, "stream text", e) from e
     
     def get_provider_info(self):
         """
@@ -145,12 +567,172 @@ class CloudLLMClient:
         return {
             'provider': self.provider,
             'model': self.model_name,
-            'base_url': getattr(self.client, 'base_url', 'default')
+            'base_url': getattr(self.client, 'base_url', 'default'),
+            'cache': self.cache.stats() if self.cache else None,
+            'rate_limit': self.rate_limiter.stats() if self.rate_limiter else None
+        }
+
+
+class AsyncCloudLLMClient(_LLMClientBase):
+    """
+    asyncio counterpart of CloudLLMClient, built on AsyncOpenAI
+    
+    Same provider config, response cache and rate limits; each call is a
+    coroutine, so one event loop can keep many section calls in flight
+    without a thread per call (e.g. under an ASGI server). It is not a
+    CloudLLMClient: generate/generate_with_usage/generate_stream must be
+    awaited (or iterated with async for). The SQLite response cache and
+    rate-limit store are used from worker threads, off the event loop.
+    """
+    
+    def _initialize_client(self):
+        # Validate the provider now; AsyncOpenAI clients are created per event loop
+        self._kwargs = self._client_kwargs()
+        self._clients = weakref.WeakKeyDictionary()
+        return None
+    
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(http_client=get_async_httpx_client(), **self._kwargs)
+            self._clients[loop] = client
+        return client
+    
+    def _rate_slot(self, system_prompt, user_prompt, max_tokens):
+        if not self.rate_limiter:
+            return nullcontext(), 0
+        estimated = self._estimate_tokens(system_prompt, user_prompt, max_tokens)
+        return self.rate_limiter.aslot(estimated), estimated
+    
+    async def _asettle(self, estimated, max_tokens, usage, text):
+        if self.rate_limiter:
+            await self.rate_limiter.asettle(estimated, self._actual_tokens(estimated, max_tokens, usage, text))
+    
+    async def _cache_get(self, cache_key):
+        return await asyncio.to_thread(self.cache.get, cache_key)
+    
+    async def _cache_set(self, cache_key, text):
+        await asyncio.to_thread(self.cache.set, cache_key, text)
+    
+    async def generate(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        """
+        Same as CloudLLMClient.generate, awaitable
+        """
+        text, _ = await self.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+        return text
+    
+    async def generate_with_usage(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        """
+        Same as CloudLLMClient.generate_with_usage, awaitable
+        
+        Returns:
+            tuple: (generated_text, usage)
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model_name, system_prompt, user_prompt, max_tokens, temperature)
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit ({self.provider})")
+                return cached, dict(empty_usage(), response_cache_hit=True)
+        
+        try:
+            print(f"🔄 Calling {self.provider} API (async, {self.model_name})...")
+            
+            slot, estimated = self._rate_slot(system_prompt, user_prompt, max_tokens)
+            usage, generated_text = None, None
+            try:
+                async with slot:
+                    response = await self._get_client().chat.completions.create(
+                        **self._completion_kwargs(system_prompt, user_prompt, max_tokens, temperature)
+                    )
+                generated_text = response.choices[0].message.content
+                usage = extract_usage(getattr(response, 'usage', None))
+            finally:
+                # Failed calls return their reservation too
+                await self._asettle(estimated, max_tokens, usage, generated_text)
+            
+            if cache_key and generated_text:
+                await self._cache_set(cache_key, generated_text)
+            
+            return generated_text, dict(usage, response_cache_hit=False)
+            
+        except Exception as e:
+            print(f"❌ LLM API Error: {str(e)}")
+            raise _provider_error(self.provider, "generate text", e) from e
+    
+    async def generate_stream(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3, usage=None):
+        """
+        Same as CloudLLMClient.generate_stream, as an async generator
+        
+        Yields:
+            str: Text deltas as they arrive from the provider
+        """
+        if usage is not None:
+            usage.update(empty_usage(), response_cache_hit=False)
+        
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model_name, system_prompt, user_prompt, max_tokens, temperature)
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit ({self.provider})")
+                if usage is not None:
+                    usage['response_cache_hit'] = True
+                yield cached
+                return
+        
+        try:
+            print(f"🔄 Streaming from {self.provider} API (async, {self.model_name})...")
+            
+            extra = {'stream_options': {'include_usage': True}} if LLM_STREAM_USAGE else {}
+            stream_usage = {}
+            parts = []
+            slot, estimated = self._rate_slot(system_prompt, user_prompt, max_tokens)
+            try:
+                async with slot:
+                    stream = await self._get_client().chat.completions.create(
+                        stream=True,
+                        **extra,
+                        **self._completion_kwargs(system_prompt, user_prompt, max_tokens, temperature)
+                    )
+                    async for chunk in stream:
+                        if getattr(chunk, 'usage', None):
+                            stream_usage = extract_usage(chunk.usage)
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+            finally:
+                # Also on errors and abandoned streams
+                await self._asettle(estimated, max_tokens, stream_usage, "".join(parts))
+            
+            if usage is not None and stream_usage:
+                usage.update(stream_usage)
+            
+            if cache_key and parts:
+                await self._cache_set(cache_key, "".join(parts))
+            
+        except Exception as e:
+            print(f"❌ LLM API Error: {str(e)}")
+            raise _provider_error(self.provider, "stream text", e) from e
+    
+    def get_provider_info(self):
+        return {
+            'provider': self.provider,
+            'model': self.model_name,
+            'base_url': self._kwargs.get('base_url', 'default'),
+            'cache': self.cache.stats() if self.cache else None,
+            'rate_limit': self.rate_limiter.stats() if self.rate_limiter else None
         }
 
 
 # Singleton instance (optional, for efficiency)
 _llm_client_instance = None
+_async_llm_client_instance = None
 
 def get_llm_client():
     """
@@ -158,5 +740,29 @@ def get_llm_client():
     """
     global _llm_client_instance
     if _llm_client_instance is None:
-        _llm_client_instance = CloudLLMClient()
+        if LLM_ROUTING_ENABLED:
+            from .llm_router import RoutingLLMClient
+            _llm_client_instance = RoutingLLMClient()
+        else:
+            _llm_client_instance = CloudLLMClient()
     return _llm_client_instance
+
+
+def get_async_llm_client():
+    """
+    Returns a singleton async LLM client
+    
+    With routing enabled this is an AsyncRoutingLLMClient sharing the sync
+    router's circuit breakers (failover, retries and hedging over
+    LLM_PROVIDERS); otherwise an AsyncCloudLLMClient for LLM_PROVIDER.
+    """
+    global _async_llm_client_instance
+    if _async_llm_client_instance is None:
+        if LLM_ROUTING_ENABLED:
+            from .llm_router import AsyncRoutingLLMClient, RoutingLLMClient
+            router = get_llm_client()
+            if isinstance(router, RoutingLLMClient):
+                _async_llm_client_instance = AsyncRoutingLLMClient(router)
+        if _async_llm_client_instance is None:
+            _async_llm_client_instance = AsyncCloudLLMClient()
+    return _async_llm_client_instance
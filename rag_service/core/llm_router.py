@@ -0,0 +1,552 @@
+"""
+Routing LLM Client
+
+Spreads calls over several providers from the provider table
+(LLM_PROVIDERS, in priority order) so one slow or failing provider does
+not fail a whole paper:
+- Retries: exponential backoff with full jitter on 429/5xx/timeouts
+  (the provider's Retry-After is honoured when given)
+- Failover: the next provider is tried when one gives up
+- Circuit breakers: a provider that keeps failing is skipped for a
+  cooldown, then probed with a single trial call
+- Hedging (optional): if the first provider has not answered within its
+  observed p95 latency, the same request is fired at the next provider
+  and the first successful answer wins
+
+AsyncRoutingLLMClient does the same for coroutines, over the sync
+router's routes, so both paths share one set of breakers and stats.
+"""
+
+import os
+import asyncio
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .llm_client import AsyncCloudLLMClient, CloudLLMClient, LLMProviderError
+
+# Load environment
+load_dotenv()
+
+# Configuration
+LLM_PROVIDERS = [p.strip() for p in os.getenv('LLM_PROVIDERS', os.getenv('LLM_PROVIDER', 'groq')).split(',') if p.strip()]
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))                  # Per provider, after the first attempt
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))            # Seconds
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 8))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 5))        # Consecutive failures to open
+LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', 30))     # Seconds before a trial call
+LLM_HEDGING_ENABLED = os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true'
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))     # Latencies needed for a p95
+LLM_HEDGE_DEFAULT_MS = float(os.getenv('LLM_HEDGE_DEFAULT_MS', 15000))  # Deadline until then
+LLM_HEDGE_MIN_MS = float(os.getenv('LLM_HEDGE_MIN_MS', 1000))
+LLM_HEDGE_WORKERS = int(os.getenv('LLM_HEDGE_WORKERS', 8))
+
+LATENCY_WINDOW = 200
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half-open)
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.time() - self.opened_at >= self.cooldown:
+                return 'half_open'
+            return 'open'
+
+    def available(self):
+        """
+        Whether the provider is worth trying (closed, or cooldown elapsed)
+        """
+        return self.state != 'open'
+
+    def allow(self):
+        """
+        Admits a call now (half-open admits a single trial call)
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        Ends a call that says nothing about the provider's health (e.g. a
+        non-retryable 4xx caused by the request itself)
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+
+class LatencyTracker:
+    """
+    Sliding window of successful call latencies
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms):
+        with self._lock:
+            self._samples.append(latency_ms)
+
+    def percentile(self, q):
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(list(self._samples), q))
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class _Route:
+    """
+    One provider with its client, breaker and latency stats
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.name = client.provider
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.failures = 0
+        self.hedges_won = 0
+
+    def hedge_deadline(self):
+        """
+        Seconds to wait before hedging: observed p95, or a default until enough samples
+        """
+        if len(self.latency) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_MS / 1000
+        return max(LLM_HEDGE_MIN_MS, self.latency.percentile(95)) / 1000
+
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Full-jitter exponential backoff (or the provider's Retry-After, capped)
+    """
+    if retry_after is not None:
+        return min(retry_after, LLM_BACKOFF_MAX)
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+class RoutingLLMClient:
+    """
+    Drop-in replacement for CloudLLMClient that routes over several providers
+    """
+
+    def __init__(self, providers=None, hedging=LLM_HEDGING_ENABLED, max_retries=LLM_MAX_RETRIES):
+        """
+        Args:
+            providers (list): Provider names in priority order (defaults to LLM_PROVIDERS)
+            hedging (bool): Fire a second provider after the first one's p95 latency
+            max_retries (int): Retries per provider on retryable errors
+        """
+        self.routes = []
+        for name in providers or LLM_PROVIDERS:
+            try:
+                # Retries are handled here, not inside the SDK
+                self.routes.append(_Route(CloudLLMClient(name, max_retries=0)))
+            except ValueError as e:
+                print(f"⚠️ Skipping LLM provider {name}: {e}")
+        if not self.routes:
+            raise ValueError(f"No usable LLM provider in {', '.join(providers or LLM_PROVIDERS)}")
+
+        self.hedging = hedging and len(self.routes) > 1
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_WORKERS, thread_name_prefix='llm-hedge') \
+            if self.hedging else None
+
+        # Primary provider, for callers that report a single provider/model
+        self.provider = self.routes[0].name
+        self.model_name = self.routes[0].client.model_name
+        self.cache = self.routes[0].client.cache
+
+        print(f"🔀 LLM routing: {' -> '.join(r.name for r in self.routes)}"
+              + (" (hedging on)" if self.hedging else ""))
+
+    def _available_routes(self):
+        routes = [route for route in self.routes if route.breaker.available()]
+        if not routes:
+            raise LLMProviderError("All LLM providers are unavailable (circuit breakers open)", 'routing')
+        return routes
+
+    def _call_route(self, route, system_prompt, user_prompt, max_tokens, temperature, cancelled=None):
+        """
+        Calls one provider, retrying retryable errors with backoff
+
+        The breaker counts one failure per call, once retries are exhausted,
+        and only for retryable errors: a non-retryable 4xx (bad request,
+        context too long, auth) is the request's fault, not the provider's.
+        """
+        if not route.breaker.allow():
+            raise LLMProviderError(f"Circuit breaker open for {route.name}", route.name)
+        attempt = 0
+        resolved = False
+        try:
+            while True:
+                start = time.time()
+                route.calls += 1
+                try:
+                    text, usage = route.client.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+                except LLMProviderError as e:
+                    route.failures += 1
+                    if not e.retryable:
+                        raise
+                    if attempt >= self.max_retries or (cancelled and cancelled.is_set()):
+                        route.breaker.record_failure()
+                        resolved = True
+                        raise
+                    delay = backoff_delay(attempt, e.retry_after)
+                    print(f"   ↻ {route.name} failed ({e.status_code or 'network'}); retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+                route.breaker.record_success()
+                resolved = True
+                if not usage.get('response_cache_hit'):
+                    route.latency.record((time.time() - start) * 1000)
+                return text, dict(usage, provider=route.name, model=route.client.model_name)
+        finally:
+            if not resolved:
+                # Non-retryable or unexpected errors say nothing about the provider
+                route.breaker.release()
+
+    def _call_with_failover(self, routes, system_prompt, user_prompt, max_tokens, temperature, cancelled=None):
+        last_error = None
+        for route in routes:
+            if cancelled and cancelled.is_set():
+                break
+            try:
+                return self._call_route(route, system_prompt, user_prompt, max_tokens, temperature, cancelled)
+            except LLMProviderError as e:
+                last_error = e
+                print(f"   ⚠️ {route.name} gave up: {e}")
+        raise last_error or LLMProviderError("Request cancelled", 'routing')
+
+    def _call_hedged(self, routes, system_prompt, user_prompt, max_tokens, temperature):
+        """
+        Primary provider first; after its p95 a hedge goes to the remaining
+        providers (in failover order). The primary never fails over itself,
+        so no provider is called twice for one request.
+        """
+        cancelled = threading.Event()
+        args = (system_prompt, user_prompt, max_tokens, temperature)
+        primary = self._executor.submit(self._call_with_failover, routes[:1], *args, cancelled)
+
+        done, _ = wait([primary], timeout=routes[0].hedge_deadline())
+        if done:
+            try:
+                return primary.result()
+            except LLMProviderError:
+                # Failed before the hedge deadline: plain failover to the rest
+                return self._call_with_failover(routes[1:], *args)
+
+        print(f"   ⏱️ {routes[0].name} slower than its p95; hedging to {routes[1].name}")
+        hedge = self._executor.submit(self._call_with_failover, routes[1:], *args, cancelled)
+        pending = {primary, hedge}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except LLMProviderError as e:
+                    last_error = e
+                    continue
+                # The losing call cannot be interrupted; stop it from retrying
+                cancelled.set()
+                if future is hedge:
+                    routes[1].hedges_won += 1
+                return result
+        raise last_error
+
+    def generate_with_usage(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        """
+        Same as CloudLLMClient.generate_with_usage; usage also names the
+        provider and model that answered
+        """
+        routes = self._available_routes()
+        if self.hedging and len(routes) > 1:
+            return self._call_hedged(routes, system_prompt, user_prompt, max_tokens, temperature)
+        return self._call_with_failover(routes, system_prompt, user_prompt, max_tokens, temperature)
+
+    def generate(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        text, _ = self.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+        return text
+
+    def generate_stream(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3, usage=None):
+        """
+        Streams from the first healthy provider; fails over only until the
+        first delta has been yielded (streams are not hedged)
+
+        A stream the consumer abandons (GeneratorExit, e.g. a client
+        disconnect) or that ends in an unexpected error releases the breaker
+        without counting for or against the provider.
+        """
+        last_error = None
+        for route in self._available_routes():
+            if not route.breaker.allow():
+                continue
+            started = False
+            resolved = False
+            route.calls += 1
+            try:
+                for delta in route.client.generate_stream(system_prompt, user_prompt, max_tokens,
+                                                          temperature, usage=usage):
+                    started = True
+                    yield delta
+                route.breaker.record_success()
+                resolved = True
+                if usage is not None:
+                    usage.update(provider=route.name, model=route.client.model_name)
+                return
+            except LLMProviderError as e:
+                route.failures += 1
+                if e.retryable:
+                    route.breaker.record_failure()
+                    resolved = True
+                if started:
+                    raise
+                last_error = e
+                print(f"   ⚠️ {route.name} stream failed before output; failing over")
+            finally:
+                if not resolved:
+                    # Frees a half-open trial slot so the provider is not excluded for good
+                    route.breaker.release()
+        raise last_error or LLMProviderError("All LLM providers are unavailable (circuit breakers open)", 'routing')
+
+    def get_provider_info(self):
+        """
+        Routing order with per-provider health and latency
+        """
+        return {
+            'provider': self.provider,
+            'model': self.model_name,
+            'hedging': self.hedging,
+            'routes': [{
+                'provider': route.name,
+                'model': route.client.model_name,
+                'breaker': route.breaker.state,
+                'calls': route.calls,
+                'failures': route.failures,
+                'hedges_won': route.hedges_won,
+                'p50_ms': route.latency.percentile(50),
+                'p95_ms': route.latency.percentile(95),
+                'rate_limit': route.client.rate_limiter.stats() if route.client.rate_limiter else None
+            } for route in self.routes],
+            'cache': self.cache.stats() if self.cache else None
+        }
+
+
+
+class AsyncRoutingLLMClient:
+    """
+    asyncio counterpart of RoutingLLMClient
+
+    Routes over the given sync router's routes, so a provider's circuit
+    breaker, latency stats and counters are shared by sync and async
+    callers; each route gets an AsyncCloudLLMClient for the same provider
+    and model. Unlike the thread pool version, a losing hedge is cancelled
+    instead of being left to finish.
+    """
+
+    def __init__(self, router):
+        """
+        Args:
+            router (RoutingLLMClient): Sync router whose routes are shared
+        """
+        self.router = router
+        self.routes = router.routes
+        self.hedging = router.hedging
+        self.max_retries = router.max_retries
+        # Retries are handled here, not inside the SDK
+        self._clients = {route.name: AsyncCloudLLMClient(route.name, route.client.model_name, max_retries=0)
+                         for route in self.routes}
+
+        self.provider = router.provider
+        self.model_name = router.model_name
+        self.cache = router.cache
+
+    async def _call_route(self, route, system_prompt, user_prompt, max_tokens, temperature):
+        """
+        Same as RoutingLLMClient._call_route, awaitable (a cancelled call
+        releases the breaker without counting for or against the provider)
+        """
+        if not route.breaker.allow():
+            raise LLMProviderError(f"Circuit breaker open for {route.name}", route.name)
+        client = self._clients[route.name]
+        attempt = 0
+        resolved = False
+        try:
+            while True:
+                start = time.time()
+                route.calls += 1
+                try:
+                    text, usage = await client.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+                except LLMProviderError as e:
+                    route.failures += 1
+                    if not e.retryable:
+                        raise
+                    if attempt >= self.max_retries:
+                        route.breaker.record_failure()
+                        resolved = True
+                        raise
+                    delay = backoff_delay(attempt, e.retry_after)
+                    print(f"   ↻ {route.name} failed ({e.status_code or 'network'}); retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+
+                route.breaker.record_success()
+                resolved = True
+                if not usage.get('response_cache_hit'):
+                    route.latency.record((time.time() - start) * 1000)
+                return text, dict(usage, provider=route.name, model=client.model_name)
+        finally:
+            if not resolved:
+                # Non-retryable, unexpected or cancelled calls say nothing about the provider
+                route.breaker.release()
+
+    async def _call_with_failover(self, routes, system_prompt, user_prompt, max_tokens, temperature):
+        last_error = None
+        for route in routes:
+            try:
+                return await self._call_route(route, system_prompt, user_prompt, max_tokens, temperature)
+            except LLMProviderError as e:
+                last_error = e
+                print(f"   ⚠️ {route.name} gave up: {e}")
+        raise last_error or LLMProviderError("All LLM providers are unavailable (circuit breakers open)", 'routing')
+
+    async def _call_hedged(self, routes, system_prompt, user_prompt, max_tokens, temperature):
+        """
+        Same as RoutingLLMClient._call_hedged; the loser is cancelled
+        """
+        args = (system_prompt, user_prompt, max_tokens, temperature)
+        primary = asyncio.ensure_future(self._call_with_failover(routes[:1], *args))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=routes[0].hedge_deadline())
+            if done:
+                try:
+                    return primary.result()
+                except LLMProviderError:
+                    # Failed before the hedge deadline: plain failover to the rest
+                    return await self._call_with_failover(routes[1:], *args)
+
+            print(f"   ⏱️ {routes[0].name} slower than its p95; hedging to {routes[1].name}")
+            hedge = asyncio.ensure_future(self._call_with_failover(routes[1:], *args))
+            tasks.append(hedge)
+            pending = set(tasks)
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except LLMProviderError as e:
+                        last_error = e
+                        continue
+                    if task is hedge:
+                        routes[1].hedges_won += 1
+                    return result
+            raise last_error
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            # Let the losers unwind (releasing their breaker slots) before returning
+            await asyncio.gather(*losers, return_exceptions=True)
+
+    async def generate_with_usage(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        """
+        Same as RoutingLLMClient.generate_with_usage, awaitable
+        """
+        routes = self.router._available_routes()
+        if self.hedging and len(routes) > 1:
+            return await self._call_hedged(routes, system_prompt, user_prompt, max_tokens, temperature)
+        return await self._call_with_failover(routes, system_prompt, user_prompt, max_tokens, temperature)
+
+    async def generate(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3):
+        text, _ = await self.generate_with_usage(system_prompt, user_prompt, max_tokens, temperature)
+        return text
+
+    async def generate_stream(self, system_prompt, user_prompt, max_tokens=1000, temperature=0.3, usage=None):
+        """
+        Same as RoutingLLMClient.generate_stream, as an async generator
+        """
+        last_error = None
+        for route in self.router._available_routes():
+            if not route.breaker.allow():
+                continue
+            client = self._clients[route.name]
+            started = False
+            resolved = False
+            route.calls += 1
+            try:
+                async for delta in client.generate_stream(system_prompt, user_prompt, max_tokens,
+                                                          temperature, usage=usage):
+                    started = True
+                    yield delta
+                route.breaker.record_success()
+                resolved = True
+                if usage is not None:
+                    usage.update(provider=route.name, model=client.model_name)
+                return
+            except LLMProviderError as e:
+                route.failures += 1
+                if e.retryable:
+                    route.breaker.record_failure()
+                    resolved = True
+                if started:
+                    raise
+                last_error = e
+                print(f"   ⚠️ {route.name} stream failed before output; failing over")
+            finally:
+                if not resolved:
+                    # Frees a half-open trial slot so the provider is not excluded for good
+                    route.breaker.release()
+        raise last_error or LLMProviderError("All LLM providers are unavailable (circuit breakers open)", 'routing')
+
+    def get_provider_info(self):
+        """
+        Routing order with per-provider health and latency (shared with the sync router)
+        """
+        return self.router.get_provider_info()
@@ -10,14 +10,23 @@ Core logic for:
 
 import os
 import time
+import asyncio
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
-from .llm_client import get_llm_client
-from config.prompts import SYSTEM_PROMPT, build_generation_prompt
+from .llm_client import get_llm_client, get_async_llm_client
+from .embedding_cache import with_embedding_cache
+from .vector_index import FAISS_NPROBE, FAISS_EF_SEARCH, apply_search_params, index_type_of
+from .vector_store import MmapVectorStore, has_vector_store
+from .sparse_index import SparseIndex, has_sparse_index, reciprocal_rank_fusion
+from .reranker import RERANK_CANDIDATES, get_reranker
+from .context_packer import CHUNK_SEPARATOR, count_tokens
+from config.prompts import PROMPT_LAYOUT, SYSTEM_PROMPT, build_generation_prompt
 
 # Load environment
 load_dotenv()
@@ -26,6 +35,65 @@ load_dotenv()
 FAISS_INDEX_PATH = os.getenv('FAISS_INDEX_PATH', './data/faiss_index')
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
 TOP_K = int(os.getenv('TOP_K_RETRIEVAL', 5))
+CONCURRENT_GENERATION = os.getenv('CONCURRENT_GENERATION', 'true').lower() == 'true'
+GENERATION_WORKERS = int(os.getenv('GENERATION_WORKERS', 4))
+SUMMARIZE_FROM_BODY = os.getenv('SUMMARIZE_FROM_BODY', 'false').lower() == 'true'
+BODY_EXCERPT_CHARS = int(os.getenv('BODY_EXCERPT_CHARS', 600))
+# Generate one section before fanning out, so the rest hit the provider's prompt cache
+PROMPT_CACHE_WARMUP = os.getenv('PROMPT_CACHE_WARMUP', 'false').lower() == 'true'
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid')                # dense | hybrid
+HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', 20))          # Per retriever, before fusion
+RETRIEVAL_SCOPE = os.getenv('RETRIEVAL_SCOPE', 'global')             # global | section
+
+# Questionnaire fields that make up the retrieval query
+RETRIEVAL_FIELDS = ['domain', 'research_topic', 'specific_problem', 'approach_overview']
+
+# Per-section retrieval: fields added to the query (on top of domain and topic)
+SECTION_QUERY_FIELDS = {
+    "Abstract": ['key_contribution', 'key_results'],
+    "Keywords": ['approach_overview', 'algorithms'],
+    "Introduction": ['problem_importance', 'specific_problem', 'objectives'],
+    "Related Work": ['related_approaches', 'comparison_baselines'],
+    "Problem Formulation": ['specific_problem', 'formal_problem_def'],
+    "Methodology": ['approach_overview', 'algorithms', 'system_workflow'],
+    "Experimental Setup": ['dataset_details', 'tools_used', 'comparison_baselines'],
+    "Results and Discussion": ['key_results', 'quantitative_results', 'result_interpretation'],
+    "System Architecture": ['architecture_details', 'system_workflow', 'tools_used'],
+    "Limitations and Future Scope": ['current_limitations', 'future_work'],
+    "Conclusion": ['key_contribution', 'key_results', 'future_work'],
+    "References": ['related_approaches', 'algorithms', 'comparison_baselines']
+}
+
+NO_CONTEXT_MESSAGE = ("NO_RETRIEVED_CONTEXT. The user's research topic was not found in the local database. "
+                      "You MUST generate the content based entirely on your internal academic knowledge. "
+                      "Maintain strict IEEE formatting and professional tone as if you had access to sources.")
+
+# Sections to generate (EXACT ORDER PER USER SPEC)
+PAPER_SECTIONS = [
+    # Front Matter (Title/Author done manually)
+    "Abstract",
+    "Keywords",
+    
+    # Main Paper Body
+    "Introduction",
+    "Related Work",                  # Section 2
+    "Problem Formulation",           # Section 3 (equations here)
+    "Methodology",                   # Section 4 (Proposed Methodology)
+    "Experimental Setup",            # Section 5 (CRITICAL for reviewers)
+    "Results and Discussion",        # Section 6
+    "System Architecture",           # Section 7 (Optional, after results)
+    "Limitations and Future Scope",  # Section 8
+    "Conclusion",                    # Section 9
+    
+    # Back Matter
+    "References"
+]
+
+# Sections that summarise the paper and can be written from the generated body
+SUMMARY_SECTIONS = ["Abstract", "Keywords", "Conclusion"]
+
+# Content-heavy sections get a larger token allowance
+LONG_SECTIONS = ["Introduction", "Methodology", "Results and Discussion"]
 
 
 class RAGPipeline:
@@ -33,30 +101,47 @@ class RAGPipeline:
     Main RAG pipeline for academic text generation
     """
     
-    def __init__(self):
+    def __init__(self, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH, retrieval_mode=RETRIEVAL_MODE):
         """
         Initialize the RAG pipeline with vector store and LLM client
+        
+        Args:
+            nprobe (int): IVF lists probed per search (IVF indexes only)
+            ef_search (int): HNSW search breadth (HNSW indexes only)
+            retrieval_mode (str): 'dense' (FAISS only) or 'hybrid' (FAISS + BM25, fused)
         """
         print("🔧 Initializing RAG Pipeline...")
         
         # Load embeddings model
         print(f"   Loading embeddings: {EMBEDDING_MODEL}")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=EMBEDDING_MODEL,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
+        self.embeddings = with_embedding_cache(
+            HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL,
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            ),
+            EMBEDDING_MODEL,
+            normalize=True
         )
         
         # Load FAISS index
         print(f"   Loading FAISS index: {FAISS_INDEX_PATH}")
         if Path(FAISS_INDEX_PATH).exists():
             try:
-                self.vectorstore = FAISS.load_local(
-                    FAISS_INDEX_PATH, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                print("   ✓ FAISS index loaded successfully")
+                if has_vector_store(FAISS_INDEX_PATH):
+                    # Memory-mapped index, chunk texts read on demand
+                    self.vectorstore = MmapVectorStore(FAISS_INDEX_PATH, self.embeddings)
+                else:
+                    print("   ⚠️ Legacy pickled index; re-run python core/ingest.py for fast mmap loading")
+                    self.vectorstore = FAISS.load_local(
+                        FAISS_INDEX_PATH, 
+                        self.embeddings,
+                        allow_dangerous_deserialization=True
+                    )
+                search_params = apply_search_params(self.vectorstore.index, nprobe, ef_search)
+                print(f"   ✓ FAISS index loaded successfully "
+                      f"({index_type_of(self.vectorstore.index)}, {self.vectorstore.index.ntotal} vectors"
+                      + "".join(f", {k}={v}" for k, v in search_params.items()) + ")")
             except Exception as e:
                 print(f"   ⚠️ Failed to load FAISS index: {e}")
                 self.vectorstore = None
@@ -64,6 +149,25 @@ class RAGPipeline:
             print(f"   ⚠️ FAISS index not found at {FAISS_INDEX_PATH}. Starting in pure LLM mode (no RAG).")
             self.vectorstore = None
         
+        # Load BM25 index (hybrid mode)
+        self.sparse_index = None
+        if retrieval_mode == 'hybrid' and isinstance(self.vectorstore, MmapVectorStore):
+            if has_sparse_index(FAISS_INDEX_PATH):
+                sparse_index = SparseIndex(FAISS_INDEX_PATH)
+                if len(sparse_index) == len(self.vectorstore):
+                    self.sparse_index = sparse_index
+                    print(f"   ✓ BM25 index loaded ({len(sparse_index.terms)} terms)")
+                else:
+                    print("   ⚠️ BM25 index does not match the FAISS index; using dense retrieval")
+            else:
+                print("   ⚠️ BM25 index not found (re-run python core/ingest.py); using dense retrieval")
+        self.retrieval_mode = 'hybrid' if self.sparse_index else 'dense'
+        
+        # Optional cross-encoder rerank stage
+        self.reranker = get_reranker() if self.vectorstore else None
+        if self.reranker:
+            self.retrieval_mode += '+rerank'
+        
         # Initialize LLM client
         self.llm_client = get_llm_client()
         
@@ -80,6 +184,18 @@ class RAGPipeline:
         Returns:
             tuple: (context_text, metadata_list)
         """
+        chunks, metadata_list = self.retrieve_chunks(questionnaire, top_k)
+        if not chunks:
+            return NO_CONTEXT_MESSAGE, []
+        return CHUNK_SEPARATOR.join(chunks), metadata_list
+    
+    def retrieve_chunks(self, questionnaire, top_k=TOP_K):
+        """
+        Retrieve relevant chunks as a ranked list (for token-budgeted packing)
+        
+        Returns:
+            tuple: (chunk_texts, metadata_list), both empty if nothing was found
+        """
         print(f"\n🔍 Retrieving relevant context (top-{top_k})...")
         
         # Build retrieval query using the NEW keys
@@ -89,12 +205,20 @@ class RAGPipeline:
         Problem: {questionnaire.get('specific_problem')}
         Method: {questionnaire.get('approach_overview')}
         """
+        keyword_query = " ".join(str(questionnaire.get(field) or '') for field in RETRIEVAL_FIELDS)
         
         # Perform similarity search
         docs = []
         if self.vectorstore:
             try:
-                docs = self.vectorstore.similarity_search(query, k=top_k)
+                candidates = self._candidate_count(top_k)
+                if self.sparse_index:
+                    docs = self._hybrid_search(query, keyword_query, candidates)
+                else:
+                    docs = self.vectorstore.similarity_search(query, k=candidates)
+                if self.reranker and docs:
+                    docs = self._rerank([(keyword_query, docs)], top_k)[0]
+                docs = docs[:top_k]
             except Exception as e:
                 print(f"   ⚠️ Vector search error: {e}")
         else:
@@ -102,68 +226,170 @@ class RAGPipeline:
         
         if not docs:
             print("   ⚠️ No relevant documents found. Switching to KNOWLEDGE-BASED generation.")
-            return ("NO_RETRIEVED_CONTEXT. The user's research topic was not found in the local database. "
-                    "You MUST generate the content based entirely on your internal academic knowledge. "
-                    "Maintain strict IEEE formatting and professional tone as if you had access to sources."), []
+            return [], []
+        
+        print(f"✓ Retrieved {len(docs)} relevant chunks ({self.retrieval_mode})")
+        return self._collect_chunks(docs)
+    
+    def _candidate_count(self, top_k):
+        """
+        Chunks fetched per query before fusion/reranking cut them to top_k
+        """
+        candidates = top_k
+        if self.sparse_index:
+            candidates = max(candidates, HYBRID_CANDIDATES)
+        if self.reranker:
+            candidates = max(candidates, RERANK_CANDIDATES)
+        return candidates
+    
+    def _rerank(self, requests, top_k):
+        """
+        Rescores candidate documents with the cross-encoder
+        
+        Args:
+            requests (list): (query, docs) pairs, docs in retrieval order
+            top_k (int): Documents to keep per request
         
-        # Extract text and metadata
+        Returns:
+            list: Reranked documents per request
+        """
+        orders, stats = self.reranker.rerank_many(
+            [(query, [doc.page_content for doc in docs]) for query, docs in requests], top_k
+        )
+        print(f"   ✓ Reranked {stats['scored']}/{stats['candidates']} candidates in {stats['elapsed_ms']:.0f}ms"
+              + (f" ({stats['cache_hits']} cached)" if stats['cache_hits'] else "")
+              + (" (budget reached)" if stats['truncated'] else ""))
+        return [[docs[i] for i in order] for (_, docs), order in zip(requests, orders)]
+    
+    @staticmethod
+    def _collect_chunks(docs):
+        """
+        Splits documents into chunk texts and their sources
+        
+        Returns:
+            tuple: (chunk_texts, metadata_list)
+        """
         retrieved_chunks = []
         metadata_list = []
         
-        for i, doc in enumerate(docs):
-            # print(f"   [{i+1}] Source: {doc.metadata.get('source', 'unknown')}")
+        for doc in docs:
             retrieved_chunks.append(doc.page_content)
             metadata_list.append({
                 'source': doc.metadata.get('source', 'unknown'),
                 'page': doc.metadata.get('page', 'N/A')
             })
         
-        # Combine chunks into single context
-        context_text = "\n\n---\n\n".join(retrieved_chunks)
+        return retrieved_chunks, metadata_list
+    
+    @staticmethod
+    def _section_queries(questionnaire, section):
+        """
+        Dense and keyword queries for one section
+        
+        Returns:
+            tuple: (query, keyword_query)
+        """
+        fields = ['domain', 'research_topic'] + SECTION_QUERY_FIELDS.get(section, RETRIEVAL_FIELDS[2:])
+        values = [(field, questionnaire.get(field)) for field in fields]
+        values = [(field, str(value)) for field, value in values if value]
         
-        print(f"✓ Retrieved {len(docs)} relevant chunks")
-        return context_text, metadata_list
+        query = f"Section: {section}\n" + "\n".join(
+            f"{field.replace('_', ' ').title()}: {value}" for field, value in values
+        )
+        keyword_query = " ".join(value for _, value in values)
+        return query, keyword_query
     
-    def generate_full_paper(self, questionnaire):
+    def retrieve_section_contexts(self, questionnaire, sections, top_k=TOP_K):
         """
-        Generates a complete research paper by iterating through sections
+        Retrieves a separate context for each section
+        
+        All section queries are embedded in one batched call and searched
+        with one batched FAISS query (plus per-section BM25 in hybrid mode).
+        
+        Args:
+            questionnaire (dict): User's research details
+            sections (list): Section names
+            top_k (int): Chunks per section
+        
+        Returns:
+            dict: section -> (chunk_texts, metadata_list); chunk_texts is
+                  empty for sections without retrieved context
         """
-        print("\n" + "="*60)
-        print("STARTING FULL PAPER GENERATION")
-        print("="*60)
+        print(f"\n🔍 Retrieving per-section context for {len(sections)} sections (top-{top_k})...")
         
-        start_time = time.time()
+        if not isinstance(self.vectorstore, MmapVectorStore):
+            if self.vectorstore:
+                print("   ℹ️ Per-section retrieval needs the mmap index; using global context")
+            retrieved = self.retrieve_chunks(questionnaire, top_k)
+            return {section: retrieved for section in sections}
         
-        # Step 1: Retrieve context (Global context for consistency)
-        context, metadata = self.retrieve_context(questionnaire)
+        queries = [self._section_queries(questionnaire, section) for section in sections]
+        candidates = self._candidate_count(top_k)
         
-        # Step 2: Define Sections to Generate (EXACT ORDER PER USER SPEC)
-        sections_to_generate = [
-            # Front Matter (Title/Author done manually above)
-            "Abstract",
-            "Keywords",
+        rankings = {}
+        try:
+            start = time.time()
+            vectors = np.asarray(self.embeddings.embed_documents([query for query, _ in queries]), dtype=np.float32)
+            _, dense = self.vectorstore.search_vectors(vectors, candidates)
             
-            # Main Paper Body
-            "Introduction",
-            "Related Work",                  # Section 2
-            "Problem Formulation",           # Section 3 (equations here)
-            "Methodology",                   # Section 4 (Proposed Methodology)
-            "Experimental Setup",            # Section 5 (CRITICAL for reviewers)
-            "Results and Discussion",        # Section 6
-            "System Architecture",           # Section 7 (Optional, after results)
-            "Limitations and Future Scope",  # Section 8
-            "Conclusion",                    # Section 9
-            
-            # Back Matter
-            "References"
-        ]
+            for row, (section, (_, keyword_query)) in enumerate(zip(sections, queries)):
+                ranking = [p for p in dense[row] if p != -1]
+                if self.sparse_index:
+                    _, sparse = self.sparse_index.search(keyword_query, candidates)
+                    ranking = [p for p, _ in reciprocal_rank_fusion([ranking, sparse])]
+                rankings[section] = ranking[:candidates]
+            print(f"   ✓ Searched in {(time.time() - start) * 1000:.0f}ms ({self.retrieval_mode})")
+        except Exception as e:
+            print(f"   ⚠️ Vector search error: {e}")
         
-        paper_content = {}
+        # Read each distinct chunk once
+        positions = sorted({int(p) for ranking in rankings.values() for p in ranking})
+        documents = dict(zip(positions, self.vectorstore.get_documents(positions)))
         
-        # --- FRONT MATTER (Manual Construction) ---
-        print("\n📝 formatting Front Matter...")
+        section_docs = {section: [documents[int(p)] for p in rankings.get(section, [])] for section in sections}
+        if self.reranker:
+            ranked = [section for section in sections if section_docs[section]]
+            reranked = self._rerank([(queries[sections.index(section)][1], section_docs[section])
+                                     for section in ranked], top_k)
+            section_docs.update(zip(ranked, reranked))
         
-        # --- FRONT MATTER (Manual Construction) ---
+        contexts = {}
+        for section in sections:
+            docs = section_docs[section][:top_k]
+            contexts[section] = self._collect_chunks(docs)
+        
+        print(f"✓ Retrieved context for {len(sections)} sections ({len(positions)} distinct candidate chunks)")
+        return contexts
+    
+    def _hybrid_search(self, query, keyword_query, top_k):
+        """
+        Dense (FAISS) and BM25 candidates fused with reciprocal rank fusion
+        
+        Args:
+            query (str): Text embedded for the dense search
+            keyword_query (str): Text tokenized for the BM25 search
+            top_k (int): Number of chunks to return
+        
+        Returns:
+            list: Documents, best first
+        """
+        candidates = max(top_k, HYBRID_CANDIDATES)
+        _, dense = self.vectorstore.search_vectors(self.embeddings.embed_query(query), candidates)
+        _, sparse = self.sparse_index.search(keyword_query, candidates)
+        
+        fused = reciprocal_rank_fusion([[p for p in dense[0] if p != -1], sparse])[:top_k]
+        return self.vectorstore.get_documents([position for position, _ in fused])
+    
+    def _build_front_matter(self, questionnaire):
+        """
+        Formats the Title and Author block from the questionnaire
+        
+        Args:
+            questionnaire (dict): User's research details
+        
+        Returns:
+            str: Front matter text
+        """
         print("\n📝 formatting Front Matter...")
         
         authors = questionnaire.get('authors', [])
@@ -201,29 +427,370 @@ class RAGPipeline:
 
 {author_block}
 """
-        paper_content['Title and Author'] = front_matter.strip()
         print(f"   ✓ Title and Author formatted for {len(authors)} author(s)")
-
-        # Step 3: Iterate and Generate
-        for section in sections_to_generate:
-            print(f"\n📝 Generating Section: {section}...")
-            
-            # Construct prompt for this specific section
-            user_prompt = build_generation_prompt(questionnaire, context, section)
-            
-            # Generate text
-            # Use slightly higher max_tokens for content-heavy sections
-            max_tokens = 1500 if section in ["Introduction", "Methodology", "Results and Discussion"] else 800
-            
-            generated_text = self.llm_client.generate(
+        return front_matter.strip()
+    
+    def _generate_section(self, questionnaire, context, section, paper_body=None,
+                          on_section=None, on_delta=None):
+        """
+        Generates a single paper section
+        
+        Args:
+            questionnaire (dict): User's research details
+            context (list|str): Ranked chunks for this section (packed into
+                the prompt's token budget), or ready-made context text
+            section (str): Section name
+            paper_body (str): Optional excerpt of already generated sections
+            on_section (callable): Called as on_section(section, text, elapsed_ms) when done
+            on_delta (callable): If given, the section is streamed and each
+                token delta is forwarded as on_delta(section, delta)
+        
+        Returns:
+            tuple: (generated_text, elapsed_ms, prompt_tokens, usage) where
+                   prompt_tokens is the local tiktoken count and usage the
+                   provider-reported usage (including cached_tokens)
+        """
+        section_start = time.time()
+        user_prompt, prompt_tokens, max_tokens = self._prepare_section(questionnaire, context, section, paper_body)
+        
+        if on_delta:
+            parts = []
+            usage = {}
+            for delta in self.llm_client.generate_stream(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                usage=usage
+            ):
+                parts.append(delta)
+                on_delta(section, delta)
+            generated_text = "".join(parts)
+        else:
+            generated_text, usage = self.llm_client.generate_with_usage(
                 system_prompt=SYSTEM_PROMPT,
                 user_prompt=user_prompt,
                 max_tokens=max_tokens,
                 temperature=0.3
             )
-            
-            paper_content[section] = generated_text
-            print(f"   ✓ {section} completed ({len(generated_text)} chars)")
+        
+        return self._finish_section(section, generated_text, section_start, prompt_tokens, usage, on_section)
+    
+    async def _agenerate_section(self, questionnaire, context, section, paper_body=None,
+                                 on_section=None, on_delta=None):
+        """
+        Async _generate_section, using the async LLM client (routed over LLM_PROVIDERS)
+        
+        Returns:
+            tuple: (generated_text, elapsed_ms, prompt_tokens, usage)
+        """
+        section_start = time.time()
+        user_prompt, prompt_tokens, max_tokens = self._prepare_section(questionnaire, context, section, paper_body)
+        llm_client = get_async_llm_client()
+        
+        if on_delta:
+            parts = []
+            usage = {}
+            async for delta in llm_client.generate_stream(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                usage=usage
+            ):
+                parts.append(delta)
+                on_delta(section, delta)
+            generated_text = "".join(parts)
+        else:
+            generated_text, usage = await llm_client.generate_with_usage(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+                temperature=0.3
+            )
+        
+        return self._finish_section(section, generated_text, section_start, prompt_tokens, usage, on_section)
+    
+    @staticmethod
+    def _prepare_section(questionnaire, context, section, paper_body=None):
+        """
+        Builds one section's prompt
+        
+        Returns:
+            tuple: (user_prompt, prompt_tokens, max_tokens)
+        """
+        print(f"\n📝 Generating Section: {section}...")
+        
+        # Construct prompt for this specific section
+        user_prompt = build_generation_prompt(questionnaire, context, section, paper_body=paper_body)
+        prompt_tokens = count_tokens(SYSTEM_PROMPT) + count_tokens(user_prompt)
+        
+        # Use slightly higher max_tokens for content-heavy sections
+        max_tokens = 1500 if section in LONG_SECTIONS else 800
+        return user_prompt, prompt_tokens, max_tokens
+    
+    @staticmethod
+    def _finish_section(section, generated_text, section_start, prompt_tokens, usage, on_section=None):
+        elapsed_ms = (time.time() - section_start) * 1000
+        print(f"   ✓ {section} completed ({prompt_tokens} prompt tokens, {len(generated_text)} chars, "
+              f"{elapsed_ms/1000:.1f}s)")
+        if on_section:
+            on_section(section, generated_text, elapsed_ms)
+        return generated_text, elapsed_ms, prompt_tokens, usage
+    
+    def _generate_sections_parallel(self, questionnaire, contexts, sections, max_workers,
+                                    paper_body=None, on_section=None, on_delta=None):
+        """
+        Generates independent sections on a bounded thread pool
+        
+        The first failing section fails the call at once: sections still
+        queued are cancelled, and ones already in flight finish in the
+        background with their results discarded.
+        
+        Args:
+            contexts (dict): section -> ranked chunks (or context text)
+        
+        Returns:
+            dict: section -> (generated_text, elapsed_ms, prompt_tokens, usage)
+        """
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(
+                    self._generate_section, questionnaire, contexts[section], section,
+                    paper_body, on_section, on_delta
+                ): section
+                for section in sections
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
+    def generate_full_paper(self, questionnaire, concurrent=None, max_workers=None, summarize_from_body=None,
+                            retrieval_scope=None, on_section=None, on_delta=None):
+        """
+        Generates a complete research paper by iterating through sections
+        
+        Args:
+            questionnaire (dict): User's research details
+            concurrent (bool): Issue independent sections in parallel
+                (defaults to CONCURRENT_GENERATION)
+            max_workers (int): Size of the section worker pool
+                (defaults to GENERATION_WORKERS)
+            summarize_from_body (bool): Write Abstract/Keywords/Conclusion last,
+                using the generated body (defaults to SUMMARIZE_FROM_BODY)
+            retrieval_scope (str): 'global' (one context for all sections) or
+                'section' (targeted context per section; defaults to RETRIEVAL_SCOPE)
+            on_section (callable): Progress hook, called as
+                on_section(section, text, elapsed_ms) as each section completes
+                ('Title and Author' is reported first, before retrieval)
+            on_delta (callable): Token hook, called as on_delta(section, delta);
+                switches section calls to the provider's streaming mode
+        
+        Returns:
+            dict: {'paper_sections': ..., 'metadata': ...}
+        """
+        concurrent = CONCURRENT_GENERATION if concurrent is None else concurrent
+        max_workers = max(1, max_workers or GENERATION_WORKERS)
+        summarize_from_body = SUMMARIZE_FROM_BODY if summarize_from_body is None else summarize_from_body
+        retrieval_scope = retrieval_scope or RETRIEVAL_SCOPE
+        
+        print("\n" + "="*60)
+        print("STARTING FULL PAPER GENERATION")
+        print(f"   Mode: {'concurrent' if concurrent else 'sequential'}"
+              + (f" ({max_workers} workers)" if concurrent else ""))
+        print("="*60)
+        
+        start_time = time.time()
+        
+        # --- FRONT MATTER (Manual Construction) ---
+        paper_content = {'Title and Author': self._build_front_matter(questionnaire)}
+        if on_section:
+            on_section('Title and Author', paper_content['Title and Author'], 0.0)
+        
+        # Step 1: Retrieve context (global for consistency, or targeted per section)
+        contexts, metadata = self._retrieve_paper_contexts(questionnaire, retrieval_scope)
+        
+        # Step 2: Split sections into the body and the summary pass
+        body_sections, summary_sections = self._split_sections(summarize_from_body)
+        
+        # Step 3: Generate (section -> (text, elapsed_ms, prompt_tokens, usage))
+        generated = {}
+        if concurrent:
+            parallel_sections = body_sections
+            if PROMPT_CACHE_WARMUP and body_sections:
+                # Prime the provider's prompt cache with the shared prefix
+                first = body_sections[0]
+                generated[first] = self._generate_section(
+                    questionnaire, contexts[first], first,
+                    on_section=on_section, on_delta=on_delta
+                )
+                parallel_sections = body_sections[1:]
+            generated.update(self._generate_sections_parallel(
+                questionnaire, contexts, parallel_sections, max_workers,
+                on_section=on_section, on_delta=on_delta
+            ))
+        else:
+            for section in body_sections:
+                generated[section] = self._generate_section(
+                    questionnaire, contexts[section], section,
+                    on_section=on_section, on_delta=on_delta
+                )
+        
+        if summary_sections:
+            paper_body = self._build_body_excerpt(generated, body_sections)
+            if concurrent:
+                generated.update(self._generate_sections_parallel(
+                    questionnaire, contexts, summary_sections, max_workers, paper_body,
+                    on_section=on_section, on_delta=on_delta
+                ))
+            else:
+                for section in summary_sections:
+                    generated[section] = self._generate_section(
+                        questionnaire, contexts[section], section, paper_body,
+                        on_section=on_section, on_delta=on_delta
+                    )
+        
+        return self._assemble_paper(
+            paper_content, generated, metadata, start_time, retrieval_scope,
+            generation_mode='concurrent' if concurrent else 'sequential',
+            max_workers=max_workers if concurrent else 1
+        )
+    
+    async def agenerate_full_paper(self, questionnaire, max_concurrency=None, summarize_from_body=None,
+                                   retrieval_scope=None, on_section=None, on_delta=None):
+        """
+        Async generate_full_paper: sections are coroutines on the running
+        event loop (get_async_llm_client) instead of pool threads
+        
+        Retrieval (CPU-bound embedding and FAISS search) runs in a worker
+        thread so the loop stays responsive.
+        
+        Args:
+            max_concurrency (int): Sections in flight at once for this paper
+                (defaults to GENERATION_WORKERS; provider-wide limits are
+                enforced by the rate limiter)
+            Others: same as generate_full_paper
+        
+        Returns:
+            dict: {'paper_sections': ..., 'metadata': ...}
+        """
+        max_concurrency = max(1, max_concurrency or GENERATION_WORKERS)
+        summarize_from_body = SUMMARIZE_FROM_BODY if summarize_from_body is None else summarize_from_body
+        retrieval_scope = retrieval_scope or RETRIEVAL_SCOPE
+        
+        print("\n" + "="*60)
+        print(f"STARTING FULL PAPER GENERATION (async, {max_concurrency} in flight)")
+        print("="*60)
+        
+        start_time = time.time()
+        
+        paper_content = {'Title and Author': self._build_front_matter(questionnaire)}
+        if on_section:
+            on_section('Title and Author', paper_content['Title and Author'], 0.0)
+        
+        contexts, metadata = await asyncio.to_thread(self._retrieve_paper_contexts, questionnaire, retrieval_scope)
+        body_sections, summary_sections = self._split_sections(summarize_from_body)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate(section, paper_body=None):
+            async with semaphore:
+                return section, await self._agenerate_section(
+                    questionnaire, contexts[section], section, paper_body,
+                    on_section=on_section, on_delta=on_delta
+                )
+        
+        async def generate_all(sections, paper_body=None):
+            # The first failure cancels the sibling sections (in flight or waiting)
+            tasks = [asyncio.ensure_future(generate(section, paper_body)) for section in sections]
+            try:
+                return await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+        
+        generated = {}
+        parallel_sections = body_sections
+        if PROMPT_CACHE_WARMUP and body_sections:
+            # Prime the provider's prompt cache with the shared prefix
+            generated.update([await generate(body_sections[0])])
+            parallel_sections = body_sections[1:]
+        generated.update(await generate_all(parallel_sections))
+        
+        if summary_sections:
+            paper_body = self._build_body_excerpt(generated, body_sections)
+            generated.update(await generate_all(summary_sections, paper_body))
+        
+        return self._assemble_paper(
+            paper_content, generated, metadata, start_time, retrieval_scope,
+            generation_mode='async', max_workers=max_concurrency,
+            llm_client=get_async_llm_client()
+        )
+    
+    def _retrieve_paper_contexts(self, questionnaire, retrieval_scope):
+        """
+        Retrieves the context of every section
+        
+        Returns:
+            tuple: (contexts, metadata) with section -> ranked chunks (or
+                   NO_CONTEXT_MESSAGE) and the distinct sources used
+        """
+        if retrieval_scope == 'section':
+            section_contexts = self.retrieve_section_contexts(questionnaire, PAPER_SECTIONS)
+        else:
+            retrieved = self.retrieve_chunks(questionnaire)
+            section_contexts = {section: retrieved for section in PAPER_SECTIONS}
+        # Ranked chunks are packed into each section's token budget by the prompt builder
+        contexts = {section: chunks or NO_CONTEXT_MESSAGE for section, (chunks, _) in section_contexts.items()}
+        
+        # Distinct sources across all sections
+        metadata = []
+        for _, section_metadata in section_contexts.values():
+            metadata.extend(m for m in section_metadata if m not in metadata)
+        return contexts, metadata
+    
+    @staticmethod
+    def _split_sections(summarize_from_body):
+        """
+        Splits sections into the body and the summary pass
+        
+        Returns:
+            tuple: (body_sections, summary_sections)
+        """
+        if summarize_from_body:
+            body_sections = [s for s in PAPER_SECTIONS if s not in SUMMARY_SECTIONS]
+            summary_sections = [s for s in PAPER_SECTIONS if s in SUMMARY_SECTIONS]
+        else:
+            body_sections = list(PAPER_SECTIONS)
+            summary_sections = []
+        return body_sections, summary_sections
+    
+    def _assemble_paper(self, paper_content, generated, metadata, start_time, retrieval_scope,
+                        generation_mode, max_workers, llm_client=None):
+        """
+        Puts generated sections in canonical order and builds the response metadata
+        
+        Args:
+            generated (dict): section -> (text, elapsed_ms, prompt_tokens, usage)
+        """
+        llm_client = llm_client or self.llm_client
+        
+        # Assemble in canonical order
+        section_timings = {}
+        prompt_tokens = {}
+        section_usage = {}
+        for section in PAPER_SECTIONS:
+            (paper_content[section], section_timings[section],
+             prompt_tokens[section], section_usage[section]) = generated[section]
+        usage = self._total_usage(section_usage.values())
+        print(f"   Provider usage: {usage['prompt_tokens']} prompt tokens "
+              f"({usage['cached_tokens']} cached, {usage['cached_ratio']:.0%}), "
+              f"{usage['completion_tokens']} completion tokens")
             
         total_time = (time.time() - start_time) * 1000
         print("\n" + "="*60)
@@ -235,11 +802,53 @@ class RAGPipeline:
             'metadata': {
                 'retrieved_chunks': len(metadata),
                 'sources': metadata,
-                'model_used': self.llm_client.model_name,
-                'provider': self.llm_client.provider,
-                'processing_time_ms': total_time
+                'model_used': llm_client.model_name,
+                'provider': llm_client.provider,
+                'processing_time_ms': total_time,
+                'retrieval_mode': self.retrieval_mode,
+                'retrieval_scope': retrieval_scope,
+                'generation_mode': generation_mode,
+                'max_workers': max_workers,
+                'section_timings_ms': section_timings,
+                'section_prompt_tokens': prompt_tokens,
+                'total_prompt_tokens': sum(prompt_tokens.values()),
+                'prompt_layout': PROMPT_LAYOUT,
+                'section_usage': section_usage,
+                'usage': usage
             }
         }
+    
+    @staticmethod
+    def _total_usage(usages):
+        """
+        Sums provider usage over sections
+        
+        Returns:
+            dict: Token totals plus cached_ratio (share of prompt tokens served
+                  from the provider's prompt cache) and response_cache_hits
+        """
+        total = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'cached_tokens': 0,
+                 'response_cache_hits': 0}
+        for usage in usages:
+            for key in ('prompt_tokens', 'completion_tokens', 'total_tokens', 'cached_tokens'):
+                total[key] += usage.get(key, 0)
+            total['response_cache_hits'] += 1 if usage.get('response_cache_hit') else 0
+        total['cached_ratio'] = total['cached_tokens'] / total['prompt_tokens'] if total['prompt_tokens'] else 0.0
+        return total
+    
+    @staticmethod
+    def _build_body_excerpt(generated, body_sections, max_chars=BODY_EXCERPT_CHARS):
+        """
+        Condenses generated body sections into an excerpt for the summary pass
+        """
+        parts = []
+        for section in body_sections:
+            text = generated[section][0]
+            excerpt = text.strip()
+            if len(excerpt) > max_chars:
+                excerpt = excerpt[:max_chars].rsplit(' ', 1)[0] + " ..."
+            parts.append(f"[{section}]\n{excerpt}")
+        return "\n\n".join(parts)
 
 
 # Singleton instance
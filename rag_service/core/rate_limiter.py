@@ -0,0 +1,293 @@
+"""
+Client-Side LLM Rate Limiting
+
+Per-provider token buckets for requests/min (RPM) and tokens/min (TPM),
+plus a cap on in-flight calls, so bursts of parallel section calls are
+smoothed out instead of producing 429 storms.
+
+- Limits come from <PROVIDER>_RPM, <PROVIDER>_TPM and
+  <PROVIDER>_MAX_CONCURRENCY (0 = unlimited)
+- Tokens are reserved up front (prompt estimate + max_tokens) and
+  settled against the provider's reported usage afterwards
+- Reservations may drive a bucket negative: later callers queue behind
+  earlier ones (FIFO-like) instead of all retrying at once
+- Backends: 'memory' (per process) or 'sqlite' (one budget shared by all
+  gunicorn workers on the host)
+
+reserve() only books capacity and returns the wait, so async callers can
+await asyncio.sleep(delay) instead of blocking a thread. Async callers
+book and settle off the event loop when the store is SQLite, and wait
+for a concurrency slot on an asyncio.Semaphore (one per event loop, so
+the in-flight cap applies to threaded callers and to each loop separately).
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager, asynccontextmanager
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')                 # memory | sqlite
+RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', './data/rate_limits.sqlite3')
+
+
+class MemoryBucketStore:
+    """
+    Token buckets held in this process
+    """
+
+    blocking = False    # Cheap enough to call on an event loop
+
+    def __init__(self):
+        self._buckets = {}  # key -> (level, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, cost, now=None):
+        """
+        Refills the bucket, removes cost, and returns the resulting level
+        """
+        now = now or time.time()
+        rate = capacity / 60.0
+        with self._lock:
+            level, updated_at = self._buckets.get(key, (capacity, now))
+            level = min(capacity, level + (now - updated_at) * rate) - cost
+            self._buckets[key] = (level, now)
+        return level
+
+    def give(self, key, capacity, amount):
+        self.take(key, capacity, -amount)
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in SQLite, shared by every process using the same file
+    """
+
+    blocking = True     # Disk I/O and lock waits: async callers run it in a thread
+
+    def __init__(self, db_path=RATE_LIMIT_DB_PATH):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    level REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def take(self, key, capacity, cost, now=None):
+        now = now or time.time()
+        rate = capacity / 60.0
+        conn = self._connect()
+        try:
+            # IMMEDIATE: the read-modify-write is serialized across processes
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT level, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            level, updated_at = row if row else (capacity, now)
+            level = min(capacity, level + (now - updated_at) * rate) - cost
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, level, updated_at) VALUES (?, ?, ?)",
+                (key, level, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return level
+
+    def give(self, key, capacity, amount):
+        self.take(key, capacity, -amount)
+
+
+class ProviderRateLimiter:
+    """
+    RPM/TPM buckets and an in-flight cap for one provider
+    """
+
+    def __init__(self, provider, rpm=0, tpm=0, max_concurrency=0, store=None):
+        self.provider = provider
+        self.rpm = rpm
+        self.tpm = tpm
+        self.store = store or MemoryBucketStore()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._async_semaphores = weakref.WeakKeyDictionary()   # event loop -> asyncio.Semaphore
+        self.max_concurrency = max_concurrency
+
+        self._lock = threading.Lock()
+        self._metrics = {'calls': 0, 'delayed_calls': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+                         'slot_wait_seconds': 0.0, 'reserved_tokens': 0, 'settled_tokens': 0}
+
+    def reserve(self, estimated_tokens):
+        """
+        Books one request and estimated_tokens in the buckets
+
+        Returns:
+            float: Seconds the caller must wait before sending
+        """
+        delay = 0.0
+        if self.rpm:
+            level = self.store.take(f'{self.provider}:rpm', self.rpm, 1)
+            delay = max(delay, -level / (self.rpm / 60.0))
+        if self.tpm:
+            cost = min(estimated_tokens, self.tpm)  # A single call can never exceed one minute's budget
+            level = self.store.take(f'{self.provider}:tpm', self.tpm, cost)
+            delay = max(delay, -level / (self.tpm / 60.0))
+        delay = max(0.0, delay)
+
+        with self._lock:
+            self._metrics['calls'] += 1
+            self._metrics['reserved_tokens'] += estimated_tokens
+            if delay > 0:
+                self._metrics['delayed_calls'] += 1
+                self._metrics['wait_seconds'] += delay
+                self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], delay)
+        return delay
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """
+        Returns over-reserved tokens to the TPM bucket (or charges the shortfall)
+        """
+        if not actual_tokens:
+            return
+        with self._lock:
+            self._metrics['settled_tokens'] += actual_tokens
+        if self.tpm:
+            self.store.give(f'{self.provider}:tpm', self.tpm, min(estimated_tokens, self.tpm) - actual_tokens)
+
+    @contextmanager
+    def slot(self, estimated_tokens):
+        """
+        Waits for rate budget and a concurrency slot, then holds the slot
+        """
+        delay = self.reserve(estimated_tokens)
+        if delay > 0:
+            print(f"   ⏳ {self.provider} rate limit: waiting {delay:.1f}s")
+            time.sleep(delay)
+
+        if self._semaphore:
+            start = time.time()
+            self._semaphore.acquire()
+            waited = time.time() - start
+            if waited > 0.01:
+                with self._lock:
+                    self._metrics['slot_wait_seconds'] += waited
+        try:
+            yield
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+    async def _offload(self, func, *args):
+        """
+        Runs a bucket operation in a thread if the store blocks, else inline
+        """
+        if self.store.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def _async_semaphore(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._async_semaphores[loop] = semaphore
+        return semaphore
+
+    async def asettle(self, estimated_tokens, actual_tokens):
+        """
+        Async settle() (off the event loop for the SQLite store)
+        """
+        await self._offload(self.settle, estimated_tokens, actual_tokens)
+
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens):
+        """
+        Async slot(): waits with asyncio.sleep and an asyncio.Semaphore so
+        the event loop keeps running
+        """
+        delay = await self._offload(self.reserve, estimated_tokens)
+        if delay > 0:
+            print(f"   ⏳ {self.provider} rate limit: waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        if not self.max_concurrency:
+            yield
+            return
+
+        semaphore = self._async_semaphore()
+        start = time.time()
+        async with semaphore:
+            waited = time.time() - start
+            if waited > 0.01:
+                with self._lock:
+                    self._metrics['slot_wait_seconds'] += waited
+            yield
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats.update(rpm=self.rpm, tpm=self.tpm, max_concurrency=self.max_concurrency)
+        stats['mean_wait_seconds'] = stats['wait_seconds'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
+
+
+# Shared limiters (one per provider per process; the sqlite store also spans processes)
+_limiters = {}
+_store_instance = None
+_limiters_lock = threading.Lock()
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = SQLiteBucketStore() if RATE_LIMIT_BACKEND == 'sqlite' else MemoryBucketStore()
+    return _store_instance
+
+
+def get_rate_limiter(provider):
+    """
+    Returns the shared limiter for provider, or None if it has no limits configured
+    """
+    if not RATE_LIMIT_ENABLED:
+        return None
+    prefix = provider.upper()
+    rpm = int(os.getenv(f'{prefix}_RPM', 0))
+    tpm = int(os.getenv(f'{prefix}_TPM', 0))
+    max_concurrency = int(os.getenv(f'{prefix}_MAX_CONCURRENCY', 0))
+    if not (rpm or tpm or max_concurrency):
+        return None
+
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderRateLimiter(provider, rpm, tpm, max_concurrency, _get_store())
+            print(f"🚦 Rate limits for {provider}: {rpm or '∞'} RPM, {tpm or '∞'} TPM, "
+                  f"{max_concurrency or '∞'} concurrent ({RATE_LIMIT_BACKEND})")
+        return _limiters[provider]
+
+
+def get_rate_limit_stats():
+    """
+    Queue-wait metrics of every active limiter
+    """
+    with _limiters_lock:
+        return {provider: limiter.stats() for provider, limiter in _limiters.items()}
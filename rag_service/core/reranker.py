@@ -0,0 +1,178 @@
+"""
+Cross-Encoder Reranker
+
+Optional second retrieval stage: RAGPipeline fetches a larger candidate
+set, a small CPU cross-encoder rescores (query, chunk) pairs, and the best
+k are kept.
+
+- Pairs are scored in batches; when the latency budget runs out, the
+  remaining candidates keep their retrieval order after the scored ones
+- An LRU keyed by (normalized query, candidate set) stores the reranked
+  order, so repeated questionnaires skip the cross-encoder
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+RERANK_ENABLED = os.getenv('RERANK_ENABLED', 'false').lower() == 'true'
+RERANK_MODEL = os.getenv('RERANK_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+RERANK_CANDIDATES = int(os.getenv('RERANK_CANDIDATES', 30))
+RERANK_BATCH_SIZE = int(os.getenv('RERANK_BATCH_SIZE', 16))
+RERANK_BUDGET_MS = float(os.getenv('RERANK_BUDGET_MS', 300))
+RERANK_CACHE_SIZE = int(os.getenv('RERANK_CACHE_SIZE', 256))
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class Reranker:
+    """
+    Batched cross-encoder scoring with a latency budget and an LRU of results
+    """
+
+    def __init__(self, model_name=RERANK_MODEL, batch_size=RERANK_BATCH_SIZE,
+                 budget_ms=RERANK_BUDGET_MS, cache_size=RERANK_CACHE_SIZE):
+        from sentence_transformers import CrossEncoder
+
+        print(f"   Loading reranker: {model_name}")
+        self.model = CrossEncoder(model_name, max_length=512, device='cpu')
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()     # key -> reranked candidate indices
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _cache_key(query, texts):
+        digest = hashlib.sha256(normalize_query(query).encode('utf-8'))
+        for text in texts:
+            digest.update(b'\0' + hashlib.sha1(text.encode('utf-8')).digest())
+        return digest.hexdigest()
+
+    def _cache_get(self, key):
+        with self._lock:
+            order = self._cache.get(key)
+            if order is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return order
+
+    def _cache_set(self, key, order):
+        with self._lock:
+            self._cache[key] = order
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def rerank_many(self, requests, top_k):
+        """
+        Reranks several candidate lists under one shared latency budget
+
+        Pairs are scored rank-by-rank across requests, so when the budget
+        runs out every request has had its best candidates rescored.
+
+        Args:
+            requests (list): (query, candidate_texts) pairs, candidates in retrieval order
+            top_k (int): Candidates to keep per request
+
+        Returns:
+            tuple: (orders, stats) where orders[i] lists indices into the
+                   i-th request's candidates, best first
+        """
+        start = time.time()
+        orders = [None] * len(requests)
+        keys = [self._cache_key(query, texts) for query, texts in requests]
+
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(key)
+            if cached is not None:
+                orders[i] = cached
+            else:
+                pending.append(i)
+
+        # (request, candidate) pairs, interleaved by retrieval rank
+        max_len = max((len(requests[i][1]) for i in pending), default=0)
+        pairs = [(i, rank) for rank in range(max_len) for i in pending if rank < len(requests[i][1])]
+
+        scores = {i: {} for i in pending}
+        truncated = False
+        for batch_start in range(0, len(pairs), self.batch_size):
+            if (time.time() - start) * 1000 > self.budget_ms:
+                truncated = True
+                break
+            batch = pairs[batch_start:batch_start + self.batch_size]
+            batch_scores = self.model.predict(
+                [(requests[i][0], requests[i][1][rank]) for i, rank in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            for (i, rank), score in zip(batch, batch_scores):
+                scores[i][rank] = float(score)
+
+        for i in pending:
+            scored = sorted(scores[i], key=lambda rank: -scores[i][rank])
+            unscored = [rank for rank in range(len(requests[i][1])) if rank not in scores[i]]
+            orders[i] = scored + unscored
+            if not unscored:
+                self._cache_set(keys[i], orders[i])
+
+        stats = {
+            'candidates': sum(len(texts) for _, texts in requests),
+            'scored': sum(len(s) for s in scores.values()),
+            'cache_hits': len(requests) - len(pending),
+            'truncated': truncated,
+            'elapsed_ms': (time.time() - start) * 1000
+        }
+        return [order[:top_k] for order in orders], stats
+
+    def rerank(self, query, texts, top_k):
+        """
+        Reranks one candidate list
+
+        Returns:
+            tuple: (order, stats), order = indices into texts, best first
+        """
+        orders, stats = self.rerank_many([(query, texts)], top_k)
+        return orders[0], stats
+
+    def stats(self):
+        return {'model': self.model_name, 'cache_hits': self.hits, 'cache_misses': self.misses,
+                'cache_entries': len(self._cache)}
+
+
+# Singleton instance
+_reranker_instance = None
+_reranker_lock = threading.Lock()
+
+def get_reranker():
+    """
+    Returns the shared reranker, or None if reranking is disabled or unavailable
+    """
+    global _reranker_instance
+    if not RERANK_ENABLED:
+        return None
+    with _reranker_lock:
+        if _reranker_instance is None:
+            try:
+                _reranker_instance = Reranker()
+            except Exception as e:
+                print(f"   ⚠️ Reranker unavailable ({e}); continuing without reranking")
+                _reranker_instance = False
+    return _reranker_instance or None
@@ -0,0 +1,221 @@
+"""
+BM25 Sparse Index
+
+Keyword index over the same chunks as the FAISS store (doc id = FAISS
+row), so exact technical terms ("RCNN", "LDA") are found even when the
+dense embedding misses them.
+
+On-disk layout (FAISS_INDEX_PATH/bm25/), all plain numpy arrays opened
+with mmap_mode='r' so nothing is rebuilt at startup:
+- terms.npy:         sorted vocabulary (fixed-width bytes)
+- term_offsets.npy:  int64, postings range of term i is [off[i], off[i+1])
+- postings_docs.npy: int32 doc ids, ascending within a term
+- postings_tf.npy:   uint16 term frequencies
+- doc_lengths.npy:   int32 tokens per doc
+- meta.json:         num_docs, avg_doc_length, k1, b
+
+The index is rebuilt from the docstore at each ingestion run.
+"""
+
+import os
+import re
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+BM25_K1 = float(os.getenv('BM25_K1', 1.2))
+BM25_B = float(os.getenv('BM25_B', 0.75))
+RRF_K = int(os.getenv('RRF_K', 60))
+
+SPARSE_DIRNAME = 'bm25'
+MAX_TERM_BYTES = 48     # Longer tokens are truncated (consistently at build and query time)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+PART_PATTERN = re.compile(r"[-_]")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their
+this to was were which with we our can also using used based these those such than then
+""".split())
+
+
+def _expand(token):
+    """
+    A hyphenated/underscored token plus its joined and split forms, so
+    "R-CNN", "RCNN" and "R CNN" all match ("r-cnn" -> r-cnn, rcnn, r, cnn)
+    """
+    parts = PART_PATTERN.split(token)
+    if len(parts) == 1:
+        return [token]
+    return [token, "".join(parts)] + parts
+
+
+def tokenize(text):
+    """
+    Lowercased alphanumeric tokens without stopwords (hyphenated terms are
+    kept whole and also emitted joined and split, see _expand)
+    """
+    return [
+        term.encode('utf-8')[:MAX_TERM_BYTES]
+        for token in TOKEN_PATTERN.findall(text.lower())
+        for term in _expand(token)
+        if term not in STOPWORDS
+    ]
+
+
+def sparse_index_path(index_path):
+    return Path(index_path) / SPARSE_DIRNAME
+
+
+def has_sparse_index(index_path):
+    return (sparse_index_path(index_path) / 'meta.json').exists()
+
+
+def build_sparse_index(texts, index_path, k1=BM25_K1, b=BM25_B):
+    """
+    Builds the BM25 postings for texts (position i = FAISS row i) and saves them
+
+    Args:
+        texts (iterable): Chunk texts in index order
+        index_path (str): FAISS index directory (postings go in its bm25/ subdirectory)
+
+    Returns:
+        dict: num_docs, num_terms, num_postings
+    """
+    term_docs = {}      # term -> list of (doc, tf)
+    doc_lengths = []
+
+    for doc_id, text in enumerate(texts):
+        tokens = tokenize(text)
+        doc_lengths.append(len(tokens))
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            term_docs.setdefault(token, []).append((doc_id, tf))
+
+    terms = sorted(term_docs)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    for i, term in enumerate(terms):
+        offsets[i + 1] = offsets[i] + len(term_docs[term])
+
+    postings_docs = np.empty(offsets[-1], dtype=np.int32)
+    postings_tf = np.empty(offsets[-1], dtype=np.uint16)
+    for i, term in enumerate(terms):
+        postings = np.array(term_docs[term], dtype=np.int64).reshape(-1, 2)
+        postings_docs[offsets[i]:offsets[i + 1]] = postings[:, 0]
+        postings_tf[offsets[i]:offsets[i + 1]] = np.minimum(postings[:, 1], np.iinfo(np.uint16).max)
+
+    width = max((len(term) for term in terms), default=1)
+    arrays = {
+        'terms': np.array(terms, dtype=f'S{width}'),
+        'term_offsets': offsets,
+        'postings_docs': postings_docs,
+        'postings_tf': postings_tf,
+        'doc_lengths': np.array(doc_lengths, dtype=np.int32)
+    }
+    meta = {
+        'num_docs': len(doc_lengths),
+        'avg_doc_length': float(np.mean(doc_lengths)) if doc_lengths else 0.0,
+        'k1': k1,
+        'b': b
+    }
+
+    path = sparse_index_path(index_path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        tmp = path / f'{name}.tmp.npy'
+        np.save(tmp, array)
+        os.replace(tmp, path / f'{name}.npy')
+    # meta.json last: readers only open an index whose meta exists
+    with open(path / 'meta.json.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(path / 'meta.json.tmp', path / 'meta.json')
+
+    return {'num_docs': meta['num_docs'], 'num_terms': len(terms), 'num_postings': int(offsets[-1])}
+
+
+class SparseIndex:
+    """
+    Read-only, memory-mapped BM25 index
+    """
+
+    def __init__(self, index_path):
+        path = sparse_index_path(index_path)
+        with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.num_docs = meta['num_docs']
+        self.avg_doc_length = meta['avg_doc_length'] or 1.0
+        self.k1 = meta['k1']
+        self.b = meta['b']
+
+        self.terms = np.load(path / 'terms.npy', mmap_mode='r')
+        self.term_offsets = np.load(path / 'term_offsets.npy', mmap_mode='r')
+        self.postings_docs = np.load(path / 'postings_docs.npy', mmap_mode='r')
+        self.postings_tf = np.load(path / 'postings_tf.npy', mmap_mode='r')
+        self.doc_lengths = np.load(path / 'doc_lengths.npy', mmap_mode='r')
+
+    def __len__(self):
+        return self.num_docs
+
+    def _term_id(self, term):
+        i = int(np.searchsorted(self.terms, term))
+        if i < len(self.terms) and self.terms[i] == term:
+            return i
+        return None
+
+    def search(self, query, k):
+        """
+        Top-k docs by BM25 score
+
+        Returns:
+            tuple: (scores, positions) as 1-D arrays, best first
+        """
+        doc_parts, score_parts = [], []
+        for term in set(tokenize(query)):
+            term_id = self._term_id(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = np.asarray(self.postings_docs[start:end])
+            tf = np.asarray(self.postings_tf[start:end], dtype=np.float32)
+
+            df = end - start
+            idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avg_doc_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not doc_parts:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        top = np.argsort(-scores, kind='stable')[:k]
+        return scores[top].astype(np.float32), docs[top].astype(np.int64)
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Fuses ranked lists of positions: score(d) = sum 1 / (k + rank)
+
+    Args:
+        rankings (list): Ranked position lists (best first)
+        k (int): RRF damping constant
+
+    Returns:
+        list: (position, score) pairs, best first
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, position in enumerate(ranking, start=1):
+            position = int(position)
+            scores[position] = scores.get(position, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,278 @@
+"""
+FAISS Index Types
+
+Builds the vector index used by the FAISS store:
+- flat:     exact search (IndexFlatL2), the baseline
+- ivf_flat: inverted lists over full vectors (IndexIVFFlat)
+- ivf_pq:   inverted lists over product-quantized codes (IndexIVFPQ, least RAM)
+- hnsw:     graph search (IndexHNSWFlat)
+
+IVF indexes are trained on a sample of the corpus. Search-time knobs
+(nprobe, efSearch) are applied after loading, see apply_search_params().
+
+Recall-vs-latency report against the flat baseline:
+    python core/vector_index.py --benchmark
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import faiss
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration
+FAISS_INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'flat')
+FAISS_NLIST = int(os.getenv('FAISS_NLIST', 0))              # 0 = auto (~4 * sqrt(n))
+FAISS_PQ_M = int(os.getenv('FAISS_PQ_M', 16))               # PQ sub-quantizers (must divide dim)
+FAISS_PQ_BITS = int(os.getenv('FAISS_PQ_BITS', 8))
+FAISS_HNSW_M = int(os.getenv('FAISS_HNSW_M', 32))
+FAISS_EF_CONSTRUCTION = int(os.getenv('FAISS_EF_CONSTRUCTION', 200))
+FAISS_TRAIN_SAMPLE = int(os.getenv('FAISS_TRAIN_SAMPLE', 50000))
+FAISS_NPROBE = int(os.getenv('FAISS_NPROBE', 16))
+FAISS_EF_SEARCH = int(os.getenv('FAISS_EF_SEARCH', 64))
+
+INDEX_TYPES = ['flat', 'ivf_flat', 'ivf_pq', 'hnsw']
+
+# FAISS recommends ~39 training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def _auto_nlist(num_vectors):
+    nlist = FAISS_NLIST or int(4 * np.sqrt(max(num_vectors, 1)))
+    return max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def requires_training(index_type):
+    return index_type in ('ivf_flat', 'ivf_pq')
+
+
+def min_training_points(index_type):
+    """
+    Smallest corpus for which index_type can be trained sensibly
+    """
+    if index_type == 'ivf_pq':
+        return MIN_POINTS_PER_CENTROID * (2 ** FAISS_PQ_BITS)
+    if index_type == 'ivf_flat':
+        return MIN_POINTS_PER_CENTROID
+    return 0
+
+
+def resolve_index_type(index_type, num_vectors):
+    """
+    Falls back to flat when the corpus is too small to train index_type
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported FAISS index type: {index_type} (choose from {', '.join(INDEX_TYPES)})")
+    if num_vectors < min_training_points(index_type):
+        print(f"   ⚠️ {num_vectors} vectors is too few to train '{index_type}'; using 'flat'")
+        return 'flat'
+    return index_type
+
+
+def create_index(index_type, dim, num_vectors):
+    """
+    Creates an (untrained) empty index of the requested type
+
+    Args:
+        index_type (str): One of INDEX_TYPES
+        dim (int): Vector dimension
+        num_vectors (int): Expected corpus size (sizes the IVF lists)
+    """
+    if index_type == 'flat':
+        return faiss.IndexFlatL2(dim)
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, FAISS_HNSW_M)
+        index.hnsw.efConstruction = FAISS_EF_CONSTRUCTION
+        return index
+
+    nlist = _auto_nlist(num_vectors)
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == 'ivf_flat':
+        return faiss.IndexIVFFlat(quantizer, dim, nlist)
+    if index_type == 'ivf_pq':
+        if dim % FAISS_PQ_M != 0:
+            raise ValueError(f"FAISS_PQ_M={FAISS_PQ_M} must divide the embedding dimension {dim}")
+        return faiss.IndexIVFPQ(quantizer, dim, nlist, FAISS_PQ_M, FAISS_PQ_BITS)
+    raise ValueError(f"Unsupported FAISS index type: {index_type}")
+
+
+def build_trained_index(index_type, train_vectors, num_vectors):
+    """
+    Creates an index and trains it (if needed) on a sample of the corpus
+
+    Args:
+        index_type (str): One of INDEX_TYPES
+        train_vectors (np.ndarray): Sample of corpus vectors (float32, n x dim)
+        num_vectors (int): Full corpus size
+
+    Returns:
+        faiss.Index: Empty, trained index ready for add()
+    """
+    train_vectors = np.ascontiguousarray(train_vectors, dtype=np.float32)
+    index = create_index(index_type, train_vectors.shape[1], num_vectors)
+
+    if requires_training(index_type):
+        print(f"   Training '{index_type}' on {len(train_vectors)} sample vectors...")
+        start = time.time()
+        index.train(train_vectors)
+        print(f"   ✓ Trained in {time.time() - start:.1f}s")
+
+    return index
+
+
+def index_type_of(index):
+    """
+    Name of an index's type (one of INDEX_TYPES, or the FAISS class name)
+    """
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(index, faiss.IndexIVFFlat):
+        return 'ivf_flat'
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexFlat):
+        return 'flat'
+    return type(index).__name__
+
+
+def supports_removal(index):
+    """
+    Whether vectors can be removed while keeping positions compact
+    (which LangChain's FAISS.delete assumes)
+    """
+    return index_type_of(index) == 'flat'
+
+
+def apply_search_params(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH):
+    """
+    Applies search-time knobs: nprobe for IVF, efSearch for HNSW
+    """
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+        return {'nprobe': index.nprobe}
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+        return {'efSearch': ef_search}
+    return {}
+
+
+def _search_latency(index, queries, k):
+    latencies = []
+    all_ids = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        all_ids.append(ids[0])
+    return np.array(all_ids), np.array(latencies)
+
+
+def evaluate_index_types(vectors, queries, k=5, index_types=INDEX_TYPES,
+                         nprobes=(1, 4, 16, 64), ef_searches=(16, 32, 64, 128)):
+    """
+    Recall@k and per-query latency of each index type against exact flat search
+
+    Returns:
+        list: Report rows (dicts) with index_type, params, recall, latency and size
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), FAISS_TRAIN_SAMPLE), replace=False)]
+
+    baseline = faiss.IndexFlatL2(vectors.shape[1])
+    baseline.add(vectors)
+    truth, _ = _search_latency(baseline, queries, k)
+
+    report = []
+    for index_type in index_types:
+        resolved = resolve_index_type(index_type, len(vectors))
+        if resolved != index_type:
+            continue
+
+        start = time.time()
+        index = build_trained_index(index_type, sample, len(vectors))
+        index.add(vectors)
+        build_seconds = time.time() - start
+        size_mb = len(faiss.serialize_index(index)) / (1024 * 1024)
+
+        if isinstance(faiss.downcast_index(index), faiss.IndexIVF):
+            settings = [{'nprobe': n} for n in nprobes]
+        elif index_type == 'hnsw':
+            settings = [{'ef_search': ef} for ef in ef_searches]
+        else:
+            settings = [{}]
+
+        for params in settings:
+            applied = apply_search_params(index, **params)
+            found, latencies = _search_latency(index, queries, k)
+            recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+            report.append({
+                'index_type': index_type,
+                'params': applied,
+                'recall_at_k': float(recall),
+                'mean_ms': float(latencies.mean()),
+                'p95_ms': float(np.percentile(latencies, 95)),
+                'size_mb': size_mb,
+                'build_s': build_seconds
+            })
+
+    return report
+
+
+def print_report(report, k):
+    print(f"\n{'index':<10} {'params':<16} {'recall@' + str(k):>9} {'mean ms':>9} {'p95 ms':>9} {'size MB':>9} {'build s':>8}")
+    print("-" * 76)
+    for row in report:
+        params = ", ".join(f"{key}={value}" for key, value in row['params'].items()) or "-"
+        print(f"{row['index_type']:<10} {params:<16} {row['recall_at_k']:>9.3f} {row['mean_ms']:>9.3f} "
+              f"{row['p95_ms']:>9.3f} {row['size_mb']:>9.1f} {row['build_s']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall-vs-latency report for FAISS index types")
+    parser.add_argument('--benchmark', action='store_true', help="Run the report against the built index")
+    parser.add_argument('--index-path', default=os.getenv('FAISS_INDEX_PATH', './data/faiss_index'))
+    parser.add_argument('--queries', type=int, default=200, help="Number of query vectors")
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    index_file = Path(args.index_path) / 'index.faiss'
+    if not index_file.exists():
+        print(f"❌ No index at {index_file}. Run python core/ingest.py first.")
+        sys.exit(1)
+
+    index = faiss.read_index(str(index_file))
+    if index_type_of(index) != 'flat':
+        print("❌ The benchmark needs a flat index to reconstruct corpus vectors "
+              "(build one with FAISS_INDEX_TYPE=flat).")
+        sys.exit(1)
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+
+    # Queries: perturbed corpus vectors, so they are realistic but not exact self-matches
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    queries = vectors[picks] + rng.normal(0, 0.05, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"📊 Benchmarking {len(vectors)} vectors (dim {vectors.shape[1]}), {len(queries)} queries, k={args.k}")
+    report = evaluate_index_types(vectors, queries, k=args.k)
+    print_report(report, args.k)
+
+
+if __name__ == "__main__":
+    main()
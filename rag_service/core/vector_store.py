@@ -0,0 +1,226 @@
+"""
+On-Disk Vector Store
+
+Storage format (inside FAISS_INDEX_PATH):
+- index.faiss:          FAISS index (row i = chunk i)
+- docstore.jsonl:       one JSON object per chunk: id, page_content, metadata
+- docstore.offsets.npy: int64 byte offsets into docstore.jsonl (n + 1 entries)
+
+At service startup the index is opened with mmap and the offsets with
+np.load(mmap_mode='r'); chunk texts are only read for the top-k hits.
+Startup is near-instant, workers share page-cache memory, and nothing
+is unpickled.
+
+Ingestion uses load_vector_store()/save_vector_store() to edit the
+store as a regular LangChain FAISS object.
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+
+INDEX_FILENAME = 'index.faiss'
+DOCSTORE_FILENAME = 'docstore.jsonl'
+OFFSETS_FILENAME = 'docstore.offsets.npy'
+LEGACY_PICKLE_FILENAME = 'index.pkl'
+# Oldest faiss whose IO_FLAG_MMAP reads of IVF indexes are trusted (see requirements.txt)
+FAISS_MMAP_MIN_VERSION = (1, 7, 4)
+
+
+def has_vector_store(index_path):
+    """
+    Whether index_path holds a store in the on-disk format
+    """
+    path = Path(index_path)
+    return all((path / name).exists() for name in (INDEX_FILENAME, DOCSTORE_FILENAME, OFFSETS_FILENAME))
+
+
+def has_legacy_store(index_path):
+    """
+    Whether index_path holds a LangChain save_local() store (pickled docstore)
+    """
+    path = Path(index_path)
+    return (path / INDEX_FILENAME).exists() and (path / LEGACY_PICKLE_FILENAME).exists()
+
+
+def _faiss_version():
+    try:
+        return tuple(int(part) for part in faiss.__version__.split('.')[:3])
+    except (AttributeError, ValueError):
+        return (0,)
+
+
+def _read_index_mmap(index_file):
+    """
+    Opens a FAISS index read-only with its data memory-mapped
+
+    IO_FLAG_MMAP maps IVF inverted lists; flat and HNSW codes are only
+    mapped by builds that have IO_FLAG_MMAP_IFC. On faiss builds older than
+    FAISS_MMAP_MIN_VERSION or without the flags, the index is read into
+    memory as usual.
+    """
+    mmap = getattr(faiss, 'IO_FLAG_MMAP', None)
+    read_only = getattr(faiss, 'IO_FLAG_READ_ONLY', 0)
+    if mmap is None or _faiss_version() < FAISS_MMAP_MIN_VERSION:
+        print(f"   ⚠️ faiss {getattr(faiss, '__version__', '?')} has no trusted mmap reads; loading index into memory")
+        return faiss.read_index(str(index_file))
+    mmap_ifc = getattr(faiss, 'IO_FLAG_MMAP_IFC', 0)  # flat/HNSW codes (newer builds)
+    for flags in (mmap | mmap_ifc | read_only, mmap | read_only):
+        try:
+            return faiss.read_index(str(index_file), flags)
+        except RuntimeError:
+            continue
+    # Index types without mmap support are read into memory
+    return faiss.read_index(str(index_file))
+
+
+def save_vector_store(vectorstore, index_path):
+    """
+    Writes a LangChain FAISS store in the on-disk format
+
+    Files are written next to the old ones and swapped in with os.replace,
+    so a running service never sees a half-written store.
+    """
+    path = Path(index_path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    ntotal = vectorstore.index.ntotal
+    offsets = np.zeros(ntotal + 1, dtype=np.int64)
+
+    docstore_tmp = path / (DOCSTORE_FILENAME + '.tmp')
+    with open(docstore_tmp, 'wb') as f:
+        for position in range(ntotal):
+            doc_id = vectorstore.index_to_docstore_id[position]
+            doc = vectorstore.docstore.search(doc_id)
+            line = json.dumps({
+                'id': doc_id,
+                'page_content': doc.page_content,
+                'metadata': doc.metadata
+            }, ensure_ascii=False).encode('utf-8') + b'\n'
+            f.write(line)
+            offsets[position + 1] = offsets[position] + len(line)
+
+    offsets_tmp = path / (OFFSETS_FILENAME + '.tmp.npy')
+    np.save(offsets_tmp, offsets)
+
+    index_tmp = path / (INDEX_FILENAME + '.tmp')
+    faiss.write_index(vectorstore.index, str(index_tmp))
+
+    os.replace(index_tmp, path / INDEX_FILENAME)
+    os.replace(docstore_tmp, path / DOCSTORE_FILENAME)
+    os.replace(offsets_tmp, path / OFFSETS_FILENAME)
+
+    # A leftover pickled docstore would no longer match the index
+    legacy = path / LEGACY_PICKLE_FILENAME
+    if legacy.exists():
+        legacy.unlink()
+
+
+def load_vector_store(index_path, embeddings):
+    """
+    Loads the store fully into memory as an editable LangChain FAISS object
+
+    Falls back to the legacy pickled format so existing indexes can be
+    migrated by re-saving them.
+    """
+    path = Path(index_path)
+
+    if not has_vector_store(path):
+        if has_legacy_store(path):
+            print("   ℹ️ Loading legacy pickled index (it will be re-saved in the on-disk format)")
+            return FAISS.load_local(str(path), embeddings, allow_dangerous_deserialization=True)
+        raise FileNotFoundError(f"No vector store found at {index_path}")
+
+    index = faiss.read_index(str(path / INDEX_FILENAME))
+    docs = {}
+    index_to_docstore_id = {}
+    with open(path / DOCSTORE_FILENAME, 'r', encoding='utf-8') as f:
+        for position, line in enumerate(f):
+            record = json.loads(line)
+            docs[record['id']] = Document(page_content=record['page_content'], metadata=record['metadata'])
+            index_to_docstore_id[position] = record['id']
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(docs),
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+
+class MmapVectorStore:
+    """
+    Read-only store for serving: mmapped index, lazily read chunk texts
+
+    Exposes the subset of the LangChain FAISS API used by RAGPipeline.
+    """
+
+    def __init__(self, index_path, embeddings):
+        path = Path(index_path)
+        self.embeddings = embeddings
+        self.index = _read_index_mmap(path / INDEX_FILENAME)
+        self.offsets = np.load(path / OFFSETS_FILENAME, mmap_mode='r')
+
+        if len(self.offsets) != self.index.ntotal + 1:
+            raise ValueError(f"Docstore has {len(self.offsets) - 1} entries but index has {self.index.ntotal}")
+
+        self._docstore = open(path / DOCSTORE_FILENAME, 'rb')
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def _read_record(self, position):
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        with self._lock:
+            self._docstore.seek(start)
+            data = self._docstore.read(end - start)
+        return json.loads(data)
+
+    def get_documents(self, positions):
+        """
+        Reads chunks by index position (only these bytes are touched)
+        """
+        documents = []
+        for position in positions:
+            record = self._read_record(int(position))
+            documents.append(Document(page_content=record['page_content'], metadata=record['metadata']))
+        return documents
+
+    def get_ids(self, positions):
+        return [self._read_record(int(position))['id'] for position in positions]
+
+    def search_vectors(self, vectors, k):
+        """
+        Batched k-NN search
+
+        Returns:
+            tuple: (distances, positions), each of shape (len(vectors), k);
+                   missing hits have position -1
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        return self.index.search(vectors, k)
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4):
+        distances, positions = self.search_vectors(embedding, k)
+        hits = [(p, d) for p, d in zip(positions[0], distances[0]) if p != -1]
+        documents = self.get_documents([p for p, _ in hits])
+        return [(doc, float(d)) for doc, (_, d) in zip(documents, hits)]
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search(self, query, k=4):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def close(self):
+        self._docstore.close()
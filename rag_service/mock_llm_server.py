@@ -0,0 +1,311 @@
+"""
+Mock LLM Server
+
+Local OpenAI-compatible stand-in for offline load tests and profiling.
+No tokens are paid for and nothing leaves the machine.
+
+- POST /v1/chat/completions (plain or stream=True, with usage blocks)
+- GET /v1/models, GET /health
+- Latency: log-normal time to first token (median + sigma), then
+  completion tokens paced at a fixed tokens/sec
+- Errors: a share of requests fail with 429 (with Retry-After) or 503
+- Content: deterministic per prompt; the conference prompts (LLM
+  fallback list, date and impact enrichment) and the project-rating
+  prompt get canned answers in the shape their parsers expect
+
+Usage:
+    python mock_llm_server.py --port 8089 --latency-ms 400 --tokens-per-sec 150 --error-rate 0.02
+
+Then point the service at it:
+    LLM_PROVIDER=mock  MOCK_LLM_URL=http://127.0.0.1:8089/v1
+    FASTROUTER_CHAT_URL=http://127.0.0.1:8089/v1/chat/completions  FASTROUTER_API_KEY=mock
+    RECOMMENDATIONS_CHAT_URL=http://127.0.0.1:8089/v1/chat/completions
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+# Configuration (command-line flags override these)
+MOCK_LLM_HOST = os.getenv('MOCK_LLM_HOST', '127.0.0.1')
+MOCK_LLM_PORT = int(os.getenv('MOCK_LLM_PORT', 8089))
+MOCK_LLM_LATENCY_MS = float(os.getenv('MOCK_LLM_LATENCY_MS', 300))         # Median time to first token
+MOCK_LLM_LATENCY_SIGMA = float(os.getenv('MOCK_LLM_LATENCY_SIGMA', 0.5))   # Log-normal spread (0 = fixed)
+MOCK_LLM_TOKENS_PER_SEC = float(os.getenv('MOCK_LLM_TOKENS_PER_SEC', 200))  # 0 = instant
+MOCK_LLM_ERROR_RATE = float(os.getenv('MOCK_LLM_ERROR_RATE', 0))
+MOCK_LLM_SEED = int(os.getenv('MOCK_LLM_SEED', 42))
+
+WORDS = ("the proposed method retrieval model results dataset baseline accuracy performance "
+         "approach evaluation learning framework analysis system network training features "
+         "significant improvement experiments demonstrate robust efficient novel task").split()
+
+CANNED_CONFERENCES = [
+    ("ICML", "International Conference on Machine Learning", "July 12-18", "Vienna, Austria", 32.5, "ICML"),
+    ("NeurIPS", "Conference on Neural Information Processing Systems", "December 6-12", "Vancouver, Canada", 38.2, "NeurIPS"),
+    ("CVPR", "IEEE/CVF Conference on Computer Vision and Pattern Recognition", "June 14-20", "Seattle, USA", 45.17, "IEEE/CVF"),
+    ("ACL", "Annual Meeting of the Association for Computational Linguistics", "August 3-8", "Bangkok, Thailand", 15.4, "ACL"),
+    ("KDD", "ACM SIGKDD Conference on Knowledge Discovery and Data Mining", "August 24-28", "Toronto, Canada", 12.8, "ACM"),
+    ("AAAI", "AAAI Conference on Artificial Intelligence", "February 20-27", "Philadelphia, USA", 11.6, "AAAI"),
+    ("ICRA", "IEEE International Conference on Robotics and Automation", "May 19-23", "Atlanta, USA", 9.3, "IEEE"),
+    ("WWW", "The ACM Web Conference", "April 28 - May 2", "Sydney, Australia", 8.7, "ACM"),
+]
+
+
+def count_tokens(text):
+    """
+    Rough token count (~4 characters per token)
+    """
+    return (len(text) + 3) // 4
+
+
+class MockBehaviour:
+    """
+    Latency, throughput and error settings, with a seeded random source
+    so a run can be replayed
+    """
+
+    def __init__(self, latency_ms=MOCK_LLM_LATENCY_MS, latency_sigma=MOCK_LLM_LATENCY_SIGMA,
+                 tokens_per_sec=MOCK_LLM_TOKENS_PER_SEC, error_rate=MOCK_LLM_ERROR_RATE, seed=MOCK_LLM_SEED):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def sample(self):
+        """
+        Draws one request's fate
+
+        Returns:
+            tuple: (first_token_seconds, error_status or None)
+        """
+        with self._lock:
+            self.requests += 1
+            latency = self.latency_ms
+            if self.latency_sigma > 0:
+                latency = self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms
+            error = None
+            if self._random.random() < self.error_rate:
+                error = 429 if self._random.random() < 0.5 else 503
+                self.errors += 1
+        return latency / 1000, error
+
+    def token_seconds(self, tokens):
+        return tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+
+def _prompt_random(messages):
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def _canned_conference_list(rng):
+    year = time.localtime().tm_year + 1
+    conferences = []
+    for acronym, name, dates, location, impact, index in rng.sample(CANNED_CONFERENCES, 6):
+        conferences.append({
+            "acronym": f"{acronym} {year}",
+            "name": name,
+            "dates": f"{dates}, {year}",
+            "location": location,
+            "deadline": f"January 15, {year}",
+            "impact_factor": impact,
+            "index": index,
+            "website": f"https://{acronym.lower()}.example.org/"
+        })
+    return json.dumps(conferences, indent=2)
+
+
+def _listed_keys(prompt):
+    """
+    Item numbers from the enrichment prompt's "[N] Name (Acronym: X)" lines
+    """
+    return re.findall(r"^\s*\[(\d+)\]\s*.+\(Acronym:.*\)\s*$", prompt, re.MULTILINE)
+
+
+def build_reply(messages, max_tokens):
+    """
+    Deterministic reply text for a chat request
+    """
+    prompt = messages[-1].get('content', '') if messages else ''
+    rng = _prompt_random(messages)
+    year = time.localtime().tm_year + 1
+
+    if 'academic conference database' in prompt:
+        return _canned_conference_list(rng)
+    if 'estimate the NEXT likely conference' in prompt:
+        return json.dumps({key: {"dates": f"June {rng.randint(1, 20)}-{rng.randint(21, 28)}, {year}",
+                                 "location": rng.choice(CANNED_CONFERENCES)[3],
+                                 "deadline": f"January {rng.randint(1, 28)}, {year}"}
+                           for key in _listed_keys(prompt)})
+    if 'estimate Impact Factor' in prompt:
+        return json.dumps({key: {"impact": round(rng.uniform(1, 15), 1),
+                                 "index": rng.choice(["IEEE", "Scopus", "ACM", "Web of Science"])}
+                           for key in _listed_keys(prompt)})
+    if 'RATING:' in prompt:
+        return (f"RATING: {rng.randint(5, 9)}\n"
+                "ANALYSIS: The idea is clearly scoped and feasible. Its impact depends on the evaluation.")
+
+    # Generic section text: 60-90% of max_tokens
+    target_chars = int((max_tokens or 256) * rng.uniform(0.6, 0.9)) * 4
+    words, length = [], 0
+    while length < target_chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + "."
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible request handler (behaviour is set on the server)
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # One line per request would dominate load-test output
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        behaviour = self.server.behaviour
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'mock-llama-3-8b', 'object': 'model'}]})
+        elif self.path.rstrip('/') in ('', '/health'):
+            self._send_json(200, {'status': 'healthy', 'requests': behaviour.requests, 'errors': behaviour.errors})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON'}})
+            return
+
+        behaviour = self.server.behaviour
+        first_token_seconds, error = behaviour.sample()
+        time.sleep(first_token_seconds)
+        if error:
+            headers = {'Retry-After': '1'} if error == 429 else {}
+            self._send_json(error, {'error': {'message': f'Mock error {error}', 'type': 'mock_error'}}, headers)
+            return
+
+        messages = request.get('messages', [])
+        text = build_reply(messages, request.get('max_tokens'))
+        usage = {
+            'prompt_tokens': sum(count_tokens(m.get('content', '')) for m in messages),
+            'completion_tokens': count_tokens(text)
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        model = request.get('model', 'mock-llama-3-8b')
+
+        if request.get('stream'):
+            include_usage = (request.get('stream_options') or {}).get('include_usage', False)
+            self._stream(text, model, usage if include_usage else None)
+            return
+
+        time.sleep(behaviour.token_seconds(usage['completion_tokens']))
+        self._send_json(200, {
+            'id': f'chatcmpl-mock-{behaviour.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': usage
+        })
+
+    def _stream(self, text, model, usage):
+        """
+        Server-sent events, one word per chunk, paced at tokens/sec
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        created = int(time.time())
+
+        def send(choices, extra=None):
+            chunk = {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': created,
+                     'model': model, 'choices': choices}
+            chunk.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        for word in re.findall(r"\S+\s*", text):
+            time.sleep(self.server.behaviour.token_seconds(count_tokens(word)))
+            send([{'index': 0, 'delta': {'content': word}, 'finish_reason': None}])
+        send([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+        if usage:
+            send([], {'usage': usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def create_server(host=MOCK_LLM_HOST, port=MOCK_LLM_PORT, behaviour=None):
+    """
+    Builds (but does not start) a mock server; port 0 picks a free port
+
+    Returns:
+        ThreadingHTTPServer: call serve_forever(), e.g. on a daemon thread
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.behaviour = behaviour or MockBehaviour()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OpenAI-compatible LLM server for offline benchmarks')
+    parser.add_argument('--host', default=MOCK_LLM_HOST)
+    parser.add_argument('--port', type=int, default=MOCK_LLM_PORT)
+    parser.add_argument('--latency-ms', type=float, default=MOCK_LLM_LATENCY_MS, help='Median time to first token')
+    parser.add_argument('--latency-sigma', type=float, default=MOCK_LLM_LATENCY_SIGMA, help='Log-normal spread (0 = fixed)')
+    parser.add_argument('--tokens-per-sec', type=float, default=MOCK_LLM_TOKENS_PER_SEC, help='0 = instant')
+    parser.add_argument('--error-rate', type=float, default=MOCK_LLM_ERROR_RATE, help='Share of 429/503 replies')
+    parser.add_argument('--seed', type=int, default=MOCK_LLM_SEED)
+    args = parser.parse_args()
+
+    behaviour = MockBehaviour(args.latency_ms, args.latency_sigma, args.tokens_per_sec, args.error_rate, args.seed)
+    server = create_server(args.host, args.port, behaviour)
+    print(f"🧪 Mock LLM server on http://{args.host}:{server.server_address[1]}/v1 "
+          f"(p50 {args.latency_ms:.0f}ms, {args.tokens_per_sec:.0f} tok/s, {args.error_rate:.0%} errors)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
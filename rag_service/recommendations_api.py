@@ -2,10 +2,14 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
-import requests
+
+from core import http_transport
 
 load_dotenv()
 
+# OpenAI-compatible endpoint for project ratings (point at mock_llm_server.py for offline runs)
+RECOMMENDATIONS_CHAT_URL = os.getenv('RECOMMENDATIONS_CHAT_URL', 'https://api.fastrouter.io/v1/chat/completions')
+
 app = Flask(__name__)
 CORS(app)
 
@@ -73,8 +77,8 @@ ANALYSIS: [your analysis]
 """
     
     try:
-        response = requests.post(
-            'https://api.fastrouter.io/v1/chat/completions',
+        response = http_transport.post(
+            RECOMMENDATIONS_CHAT_URL,
             headers={
                 'Authorization': f'Bearer {api_key}',
                 'Content-Type': 'application/json'